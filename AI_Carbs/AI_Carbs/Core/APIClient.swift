@@ -19,6 +19,26 @@ struct APIClient {
         try await perform(method: method, path: path, body: Optional<String>.none, baseURL: baseURL, token: token)
     }
 
+    // Sends several GETs through /api/v1/batch in one round trip and returns each item's raw JSON
+    // body in request order, so callers decode them with their usual envelope types.
+    func batchGet(paths: [String], baseURL: String, token: String?) async throws -> [Data] {
+        let body = BatchRequestBody(requests: paths.enumerated().map { BatchRequestItem(id: String($0.offset), method: "GET", path: $0.element) })
+        let data = try await send(method: "POST", path: "/api/v1/batch", body: body, baseURL: baseURL, token: token)
+        guard let raw = try JSONSerialization.jsonObject(with: data) as? [String: Any],
+              let items = raw["responses"] as? [[String: Any]], items.count == paths.count else {
+            throw APIError(message: "Malformed batch response", statusCode: nil)
+        }
+        return try items.map { item in
+            let status = item["status"] as? Int ?? 500
+            let itemBody = item["body"] ?? NSNull()
+            if !(200...299).contains(status) {
+                let detail = (itemBody as? [String: Any])?["detail"] as? String
+                throw APIError(message: detail ?? "Request failed (\(status))", statusCode: status)
+            }
+            return try JSONSerialization.data(withJSONObject: itemBody, options: [.fragmentsAllowed])
+        }
+    }
+
     private func perform<T: Decodable, B: Encodable>(
         method: String,
         path: String,
@@ -26,6 +46,22 @@ struct APIClient {
         baseURL: String,
         token: String?
     ) async throws -> T {
+        let data = try await send(method: method, path: path, body: body, baseURL: baseURL, token: token)
+
+        if T.self == SimpleOK.self, data.isEmpty {
+            return SimpleOK(ok: true) as! T
+        }
+
+        return try JSONDecoder().decode(T.self, from: data)
+    }
+
+    private func send<B: Encodable>(
+        method: String,
+        path: String,
+        body: B?,
+        baseURL: String,
+        token: String?
+    ) async throws -> Data {
         guard let url = URL(string: baseURL.trimmingCharacters(in: .whitespacesAndNewlines) + path) else {
             throw APIError(message: "Invalid API URL", statusCode: nil)
         }
@@ -50,13 +86,18 @@ struct APIClient {
             }
             throw APIError(message: "Request failed (\(http.statusCode))", statusCode: http.statusCode)
         }
+        return data
+    }
+}
 
-        if T.self == SimpleOK.self, data.isEmpty {
-            return SimpleOK(ok: true) as! T
-        }
+private struct BatchRequestItem: Encodable {
+    let id: String
+    let method: String
+    let path: String
+}
 
-        return try JSONDecoder().decode(T.self, from: data)
-    }
+private struct BatchRequestBody: Encodable {
+    let requests: [BatchRequestItem]
 }
 
 struct APIError: Error {
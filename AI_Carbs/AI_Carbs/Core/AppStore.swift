@@ -10,6 +10,7 @@ final class AppStore: ObservableObject {
     @Published var isLoading = false
     @Published var errorMessage = ""
     @Published var serverStatus = ""
+    @Published var syncStatus = ""
     @Published var isServerReachable = true
 
     @Published var prediction: PredictionResponse?
@@ -165,10 +166,29 @@ final class AppStore: ObservableObject {
     }
 
     func loadAll() async {
-        await loadFoods()
-        await loadWorkouts()
-        await loadIntegrations()
-        await loadAnalytics()
+        guard isAuthenticated else { return }
+        await runRequest {
+            let bodies = try await client.batchGet(
+                paths: [
+                    "/api/v1/foods?scope=all",
+                    "/api/v1/workouts?limit=120",
+                    "/api/v1/integrations",
+                    "/api/v1/analytics/summary?days=30",
+                    "/api/v1/analytics/charts?days=30",
+                ],
+                baseURL: baseURL,
+                token: token
+            )
+            let decoder = JSONDecoder()
+            foods = try decoder.decode(FoodsEnvelope.self, from: bodies[0]).items
+            workouts = try decoder.decode(WorkoutsEnvelope.self, from: bodies[1]).items
+            if selectedWorkoutId == nil {
+                selectedWorkoutId = workouts.first?.id
+            }
+            integrations = try decoder.decode(IntegrationsEnvelope.self, from: bodies[2]).items
+            analyticsSummary = try decoder.decode(AnalyticsSummaryEnvelope.self, from: bodies[3]).summary
+            analyticsCharts = try decoder.decode(AnalyticsChartsEnvelope.self, from: bodies[4]).charts
+        }
     }
 
     func loadFoods() async {
@@ -338,13 +358,31 @@ final class AppStore: ObservableObject {
     func sync(provider: String, kind: String) async {
         guard isAuthenticated else { return }
         await runRequest {
-            let path = "/api/v1/integrations/\(provider)/sync?kind=\(kind)&limit=80"
-            let _: SyncEnvelope = try await client.request(
+            // The server queues a background job (202) and coalesces repeated taps into it; poll it
+            // until it finishes before reloading, like the web client does.
+            let started: SyncEnvelope = try await client.request(
                 method: "POST",
-                path: path,
+                path: "/api/v1/integrations/\(provider)/sync?kind=\(kind)",
                 baseURL: baseURL,
                 token: token
             )
+            var job = started.job
+            while job.isActive {
+                syncStatus = "Syncing \(provider) \(kind) workouts... \(job.synced)/\(job.fetched)"
+                try await Task.sleep(nanoseconds: 1_500_000_000)
+                let polled: SyncJobEnvelope = try await client.request(
+                    method: "GET",
+                    path: "/api/v1/integrations/sync/jobs/\(job.id)",
+                    baseURL: baseURL,
+                    token: token
+                )
+                job = polled.job
+            }
+            if job.status == "failed" {
+                syncStatus = ""
+                throw APIError(message: "Integration sync failed: \(job.error ?? "unknown error")", statusCode: nil)
+            }
+            syncStatus = "Synced \(job.synced) \(provider) \(kind) workouts."
             await loadWorkouts()
             await loadIntegrations()
         }
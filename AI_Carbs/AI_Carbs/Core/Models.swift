@@ -59,8 +59,25 @@ struct OAuthStartEnvelope: Codable {
     }
 }
 
-struct SyncEnvelope: Codable {
+struct SyncJob: Codable {
+    let id: Int
+    let provider: String
+    let kind: String
+    let status: String
+    let fetched: Int
     let synced: Int
+    let error: String?
+
+    var isActive: Bool { status == "queued" || status == "running" }
+}
+
+struct SyncEnvelope: Codable {
+    let job: SyncJob
+    let coalesced: Bool
+}
+
+struct SyncJobEnvelope: Codable {
+    let job: SyncJob
 }
 
 struct WorkoutsEnvelope: Codable {
@@ -185,6 +185,11 @@ struct IntegrationRow: View {
                 }
                 .buttonStyle(.bordered)
             }
+            if !store.syncStatus.isEmpty {
+                Text(store.syncStatus)
+                    .font(.footnote)
+                    .foregroundStyle(.secondary)
+            }
         }
         .sheet(item: $oauthURL, onDismiss: {
             Task {
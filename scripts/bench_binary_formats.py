@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Payload size and encode/decode cost of JSON vs MessagePack vs CBOR for the iOS client's heaviest
+# responses (a 120-workout list, a prediction with its schedule, a simulation). Bodies are fetched
+# from the real routes with the matching Accept header, so sizes are what goes over the wire.
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic_core import from_json, to_json  # noqa: E402
+
+from src.api.main import app  # noqa: E402
+from src.api.negotiation import CBOR, JSON, MSGPACK, binary_media_types  # noqa: E402
+
+PREDICT = {
+    "profile": {"body_mass_kg": 71, "vo2max": 58, "sweat_rate_l_h": 1.1, "bike_ftp_w": 280},
+    "session": {"sport": "cycling", "duration_minutes": 300, "intensity_rpe": 6.5, "avg_power_watts": 210},
+    "environment": {"temperature_c": 27, "humidity_pct": 60, "altitude_m": 300},
+}
+
+
+def _codecs() -> Dict[str, Dict[str, Callable[..., Any]]]:
+    codecs: Dict[str, Dict[str, Callable[..., Any]]] = {JSON: {"encode": to_json, "decode": from_json}}
+    if MSGPACK in binary_media_types():
+        import msgpack
+
+        codecs[MSGPACK] = {"encode": lambda o: msgpack.packb(o, use_bin_type=True), "decode": lambda b: msgpack.unpackb(b, raw=False)}
+    if CBOR in binary_media_types():
+        import cbor2
+
+        codecs[CBOR] = {"encode": cbor2.dumps, "decode": cbor2.loads}
+    return codecs
+
+
+def _per_call_us(fn: Callable[[], Any], runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON, MessagePack and CBOR response bodies")
+    parser.add_argument("--workouts", type=int, default=120)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    codecs = _codecs()
+    if len(codecs) == 1:
+        print("msgpack/cbor2 not installed; only JSON is available")
+    results: List[Dict[str, Any]] = []
+    with TestClient(app) as client:
+        token = client.post("/api/v1/auth/register", json={"email": "bench@example.com", "password": "benchmark-pass"}).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        for i in range(args.workouts):
+            client.post(
+                "/api/v1/workouts",
+                headers=auth,
+                json={
+                    "sport": "cycling" if i % 3 else "running",
+                    "start_time": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T06:30:00+00:00",
+                    "duration_minutes": 45 + i % 180,
+                    "intensity_rpe": 4 + i % 6,
+                    "avg_heart_rate_bpm": 128 + i % 30,
+                    "avg_power_watts": 180 + i % 90,
+                    "distance_km": 20.5 + i,
+                    "completed_carbs_g": 60 + i % 80,
+                    "notes": "endurance block",
+                },
+            )
+        cases = [
+            (f"GET /workouts?limit={args.workouts}", "GET", f"/api/v1/workouts?limit={args.workouts}", None),
+            ("POST /predict", "POST", "/api/v1/predict", PREDICT),
+            ("POST /simulate", "POST", "/api/v1/simulate", {"base_request": PREDICT, "hotter_by_c": 6, "longer_by_minutes": 60}),
+        ]
+        for label, method, path, body in cases:
+            for media, codec in codecs.items():
+                resp = client.request(method, path, headers={**auth, "Accept": media}, json=body)
+                resp.raise_for_status()
+                assert resp.headers["content-type"].startswith(media), resp.headers["content-type"]
+                raw = resp.content
+                obj = codec["decode"](raw)
+                results.append(
+                    {
+                        "payload": label,
+                        "format": media.split("/")[1],
+                        "bytes": len(raw),
+                        "gzip_bytes": len(gzip.compress(raw, 6)),
+                        "encode_us": round(_per_call_us(lambda: codec["encode"](obj), args.runs), 1),
+                        "decode_us": round(_per_call_us(lambda: codec["decode"](raw), args.runs), 1),
+                    }
+                )
+
+    baseline = {r["payload"]: r["bytes"] for r in results if r["format"] == "json"}
+    for r in results:
+        r["vs_json"] = round(r["bytes"] / baseline[r["payload"]], 3)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib import request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Season-archive import benchmark: writes synthetic FIT/GPX/TCX files (1 Hz, HR/power/cadence/
+# altitude/GPS), uploads them in batches to /api/v1/workouts/import on an in-process API and
+# reports files/sec. `--keep DIR` leaves the generated files around for manual testing.
+
+FIT_EPOCH = datetime(1989, 12, 31, tzinfo=timezone.utc)
+
+
+def _samples(seconds: int, seed: int) -> Iterator[Tuple[int, int, int, int, float, float, float, float]]:
+    rng = random.Random(seed)
+    lat, lon, alt, dist, hr = 46.5, 6.6, 400.0, 0.0, 110.0
+    for t in range(seconds):
+        watts = max(0, int(210 + 50 * math.sin(t / 500.0) + rng.gauss(0, 20)))
+        speed = 7.0 + watts / 100.0
+        hr += (100 + watts * 0.28 - hr) / 45.0
+        alt += math.sin(t / 900.0) * 0.3
+        dist += speed
+        lat += speed / 111_000.0
+        yield t, int(hr), watts, 85 + rng.randint(-5, 5), alt, speed, dist, lat, lon
+
+
+def write_fit(path: str, start: datetime, seconds: int, seed: int) -> None:
+    ts0 = int((start - FIT_EPOCH).total_seconds())
+    body = bytearray()
+    # Definition (local 0): record — timestamp, lat, lon, heart_rate, cadence, distance, power,
+    # enhanced_speed, enhanced_altitude.
+    fields = [(253, 4, 0x86), (0, 4, 0x85), (1, 4, 0x85), (3, 1, 0x02), (4, 1, 0x02), (5, 4, 0x86), (7, 2, 0x84), (73, 4, 0x86), (78, 4, 0x86)]
+    body += struct.pack("<BBBHB", 0x40, 0, 0, 20, len(fields)) + b"".join(struct.pack("<BBB", *f) for f in fields)
+    record = struct.Struct("<BIiiBBIHII")
+    for t, hr, watts, cad, alt, speed, dist, lat, lon in _samples(seconds, seed):
+        body += record.pack(
+            0,
+            ts0 + t,
+            int(lat / (180.0 / 2**31)),
+            int(lon / (180.0 / 2**31)),
+            hr,
+            cad,
+            int(dist * 100),
+            watts,
+            int(speed * 1000),
+            int((alt + 500) * 5),
+        )
+    # Definition (local 1): session — sport, total_timer_time.
+    body += struct.pack("<BBBHB", 0x41, 0, 0, 18, 2) + struct.pack("<BBBBBB", 5, 1, 0x00, 7, 4, 0x86)
+    body += struct.pack("<BBI", 1, 2, seconds * 1000)
+    header = struct.pack("<BBHI4sH", 14, 0x20, 2132, len(body), b".FIT", 0)
+    with open(path, "wb") as fh:
+        fh.write(header + bytes(body) + b"\x00\x00")
+
+
+def write_gpx(path: str, start: datetime, seconds: int, seed: int) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") if path.endswith(".gz") else open(path, "w", encoding="utf-8") as fh:
+        fh.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n<gpx version="1.1" creator="bench" '
+            'xmlns="http://www.topografix.com/GPX/1/1" '
+            'xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">\n'
+            "<trk><type>cycling</type><trkseg>\n"
+        )
+        for t, hr, watts, cad, alt, _, _, lat, lon in _samples(seconds, seed):
+            stamp = (start + timedelta(seconds=t)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            fh.write(
+                f'<trkpt lat="{lat:.6f}" lon="{lon:.6f}"><ele>{alt:.1f}</ele><time>{stamp}</time>'
+                f"<extensions><power>{watts}</power><gpxtpx:TrackPointExtension><gpxtpx:hr>{hr}</gpxtpx:hr>"
+                f"<gpxtpx:cad>{cad}</gpxtpx:cad></gpxtpx:TrackPointExtension></extensions></trkpt>\n"
+            )
+        fh.write("</trkseg></trk></gpx>\n")
+
+
+def write_tcx(path: str, start: datetime, seconds: int, seed: int) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2" '
+            'xmlns:ns3="http://www.garmin.com/xmlschemas/ActivityExtension/v2">\n'
+            f'<Activities><Activity Sport="Biking"><Id>{start.isoformat()}</Id><Lap><Track>\n'
+        )
+        for t, hr, watts, cad, alt, speed, dist, lat, lon in _samples(seconds, seed):
+            stamp = (start + timedelta(seconds=t)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            fh.write(
+                f"<Trackpoint><Time>{stamp}</Time><Position><LatitudeDegrees>{lat:.6f}</LatitudeDegrees>"
+                f"<LongitudeDegrees>{lon:.6f}</LongitudeDegrees></Position><AltitudeMeters>{alt:.1f}</AltitudeMeters>"
+                f"<DistanceMeters>{dist:.1f}</DistanceMeters><HeartRateBpm><Value>{hr}</Value></HeartRateBpm>"
+                f"<Cadence>{cad}</Cadence><Extensions><ns3:TPX><ns3:Speed>{speed:.2f}</ns3:Speed>"
+                f"<ns3:Watts>{watts}</ns3:Watts></ns3:TPX></Extensions></Trackpoint>\n"
+            )
+        fh.write("</Track></Lap></Activity></Activities></TrainingCenterDatabase>\n")
+
+
+WRITERS = {".fit": write_fit, ".gpx.gz": write_gpx, ".tcx": write_tcx}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _call(base: str, path: str, payload: Dict[str, Any], token: str = "") -> Any:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = request.Request(base + path, data=json.dumps(payload).encode("utf-8"), method="POST", headers=headers)
+    with request.urlopen(req, timeout=600) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _upload(base: str, token: str, paths: List[str]) -> Any:
+    boundary = uuid.uuid4().hex
+    parts: List[bytes] = []
+    for path in paths:
+        with open(path, "rb") as fh:
+            content = fh.read()
+        parts.append(
+            (
+                f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; "
+                f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/octet-stream\r\n\r\n"
+            ).encode("utf-8")
+            + content
+            + b"\r\n"
+        )
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode("utf-8")
+    req = request.Request(
+        base + "/api/v1/workouts/import",
+        data=body,
+        method="POST",
+        headers={"Authorization": f"Bearer {token}", "Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    with request.urlopen(req, timeout=600) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark FIT/GPX/TCX archive import")
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--hours", type=float, default=2.0, help="duration of each activity")
+    parser.add_argument("--batch", type=int, default=20, help="files per upload request")
+    parser.add_argument("--workers", type=int, default=4, help="WORKOUT_IMPORT_WORKERS")
+    parser.add_argument("--keep", default="", help="write the generated files to this directory")
+    args = parser.parse_args()
+
+    out_dir = args.keep or tempfile.mkdtemp(prefix="activity-files-")
+    os.makedirs(out_dir, exist_ok=True)
+    season = datetime(2024, 3, 1, 7, 0, tzinfo=timezone.utc)
+    paths = []
+    suffixes = list(WRITERS)
+    for i in range(args.files):
+        suffix = suffixes[i % len(suffixes)]
+        path = os.path.join(out_dir, f"activity-{i:04d}{suffix}")
+        WRITERS[suffix](path, season + timedelta(days=i), int(args.hours * 3600), i)
+        paths.append(path)
+    total_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+    print(f"generated {len(paths)} files ({total_mb:.1f} MB) in {out_dir}")
+
+    os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+    os.environ["WORKOUT_IMPORT_WORKERS"] = str(args.workers)
+    import uvicorn
+
+    from src.api.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    base = f"http://127.0.0.1:{port}"
+    while not server.started:
+        time.sleep(0.05)
+    token = _call(base, "/api/v1/auth/register", {"email": "bench@example.com", "password": "benchmark-pass"})["access_token"]
+
+    started = time.perf_counter()
+    imported = failed = 0
+    for i in range(0, len(paths), args.batch):
+        result = _upload(base, token, paths[i : i + args.batch])
+        imported += result["imported"] + result["updated"]
+        failed += result["failed"]
+        for item in result["items"]:
+            if item["status"] == "failed":
+                print(f"  {item['filename']}: {item['error']}")
+    elapsed = time.perf_counter() - started
+    server.should_exit = True
+    print(
+        json.dumps(
+            {
+                "files": len(paths),
+                "imported": imported,
+                "failed": failed,
+                "samples_per_file": int(args.hours * 3600),
+                "elapsed_s": round(elapsed, 2),
+                "files_per_sec": round(len(paths) / elapsed, 2) if elapsed > 0 else None,
+                "workers": args.workers,
+            },
+            indent=2,
+        )
+    )
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
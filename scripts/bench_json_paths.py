@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Per-endpoint cost of the HTTP layer: the fast path (model_validate_json + pydantic-core encoded
+# FastJSONResponse) against the previous handler shape (default body parsing, model_dump() dicts
+# re-validated and encoded by FastAPI). Requests go straight into the ASGI app with the user
+# preset in scope state, so sockets and token checks are not part of the numbers.
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+
+from fastapi import Depends, FastAPI, Query  # noqa: E402
+
+from src.api.auth import require_user  # noqa: E402
+from src.api.batch import BATCH_USER_STATE  # noqa: E402
+from src.api.main import WorkoutCreate, app, startup  # noqa: E402
+from src.core.engine import predict, simulate  # noqa: E402
+from src.core.models import FoodItem, PredictionRequest, SimulationRequest  # noqa: E402
+from src.storage.audit import read_audit, write_audit  # noqa: E402
+from src.storage.auth import create_user  # noqa: E402
+from src.storage.foods import resolve_foods_for_plan  # noqa: E402
+from src.storage.workouts import add_workout, list_workouts  # noqa: E402
+
+PREDICT = {
+    "profile": {"body_mass_kg": 71, "vo2max": 58, "sweat_rate_l_h": 1.1, "bike_ftp_w": 280},
+    "session": {"sport": "cycling", "duration_minutes": 240, "intensity_rpe": 6.5, "avg_power_watts": 210},
+    "environment": {"temperature_c": 27, "humidity_pct": 60, "altitude_m": 300},
+}
+WORKOUT = {"sport": "cycling", "status": "completed", "duration_minutes": 95, "avg_power_watts": 205, "notes": "tempo"}
+
+legacy = FastAPI()
+
+
+@legacy.post("/api/v1/predict")
+def legacy_predict(req: PredictionRequest, current_user: dict = Depends(require_user)) -> dict:
+    foods = [FoodItem(**f) for f in resolve_foods_for_plan(current_user["id"], req.selected_food_ids)]
+    res = predict(req, foods=foods)
+    write_audit(res.recommendation_id, current_user["id"], current_user["email"], {"request": req.model_dump(), "response": res.model_dump()})
+    return res.model_dump()
+
+
+@legacy.post("/api/v1/simulate")
+def legacy_simulate(req: SimulationRequest, current_user: dict = Depends(require_user)) -> dict:
+    foods = [FoodItem(**f) for f in resolve_foods_for_plan(current_user["id"], req.base_request.selected_food_ids)]
+    res = simulate(req, foods=foods)
+    write_audit(
+        res.simulated.recommendation_id,
+        current_user["id"],
+        current_user["email"],
+        {"simulation_request": req.model_dump(), "simulation_response": res.model_dump()},
+    )
+    return res.model_dump()
+
+
+@legacy.post("/api/v1/workouts")
+def legacy_workout_create(payload: WorkoutCreate, current_user: dict = Depends(require_user)) -> dict:
+    return {"item": add_workout(current_user["id"], payload.model_dump())}
+
+
+@legacy.get("/api/v1/workouts")
+def legacy_workouts(limit: int = Query(default=100), current_user: dict = Depends(require_user)) -> dict:
+    return {"items": list_workouts(current_user["id"], limit=limit)}
+
+
+@legacy.get("/api/v1/audit")
+def legacy_audit(limit: int = Query(default=20), current_user: dict = Depends(require_user)) -> dict:
+    return {"items": read_audit(user_id=current_user["id"], limit=limit), "user": current_user["email"]}
+
+
+async def _call(asgi: Any, user: Dict[str, Any], method: str, path: str, body: bytes) -> Tuple[int, int]:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "state": {BATCH_USER_STATE: user},
+    }
+    sent = False
+    status = 0
+    size = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await asgi(scope, receive, send)
+    return status, size
+
+
+async def _bench(asgi: Any, user: Dict[str, Any], method: str, path: str, body: bytes, iterations: int) -> Tuple[float, int]:
+    samples: List[float] = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        status, size = await _call(asgi, user, method, path, body)
+        samples.append(time.perf_counter() - started)
+        if status != 200:
+            raise SystemExit(f"{method} {path} returned {status}")
+    return statistics.median(samples) * 1e6, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fast JSON request/response path")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--workouts", type=int, default=100, help="rows returned by GET /workouts")
+    parser.add_argument("--audit", type=int, default=50, help="rows returned by GET /audit")
+    args = parser.parse_args()
+
+    startup()
+    user = create_user("bench@example.com", "benchmark-pass")
+    for i in range(args.workouts):
+        add_workout(user["id"], {**WORKOUT, "start_time": f"2024-05-{1 + i % 28:02d}T07:{i % 60:02d}:00+00:00"})
+    predict_body = json.dumps(PREDICT).encode()
+    for _ in range(args.audit):
+        asyncio.run(_call(app, user, "POST", "/api/v1/predict", predict_body))
+
+    cases = [
+        ("POST", "/api/v1/predict", predict_body),
+        ("POST", "/api/v1/simulate", json.dumps({"base_request": PREDICT, "hotter_by_c": 6, "longer_by_minutes": 60}).encode()),
+        ("POST", "/api/v1/workouts", json.dumps(WORKOUT).encode()),
+        ("GET", f"/api/v1/workouts?limit={args.workouts}", b""),
+        ("GET", f"/api/v1/audit?limit={args.audit}", b""),
+    ]
+    results = []
+    for method, path, body in cases:
+        before, _ = asyncio.run(_bench(legacy, user, method, path, body, args.iterations))
+        after, size = asyncio.run(_bench(app, user, method, path, body, args.iterations))
+        results.append(
+            {
+                "endpoint": f"{method} {path.split('?')[0]}",
+                "response_bytes": size,
+                "default_us": round(before),
+                "fast_us": round(after),
+                "speedup": round(before / after, 2),
+            }
+        )
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Derived-metric benchmark for long 1 Hz files: compares the NumPy pipeline against a plain-Python
+# reference on synthetic streams, then times the full path (compressed chunk read + compute + write
+# back) against a scratch SQLite database.
+
+
+def _synthetic_streams(seconds: int, seed: int) -> Dict[str, List[float]]:
+    rng = random.Random(seed)
+    power: List[float] = []
+    heart_rate: List[float] = []
+    cadence: List[float] = []
+    hr = 110.0
+    for t in range(seconds):
+        target = 210 + 60 * math.sin(t / 600.0) + rng.gauss(0, 25)
+        watts = 0.0 if rng.random() < 0.04 else max(0.0, target)
+        # A five-minute stop every hour plus scattered dropouts, both recorded as NaN.
+        paused = t % 3600 >= 3300 or rng.random() < 0.002
+        power.append(math.nan if paused else watts)
+        hr += (100 + watts * 0.28 - hr) / 45.0
+        heart_rate.append(hr + rng.gauss(0, 1.5))
+        cadence.append(0.0 if watts == 0 else 85 + rng.gauss(0, 4))
+    return {"power": power, "heart_rate": heart_rate, "cadence": cadence}
+
+
+def _python_reference(streams: Dict[str, Sequence[float]], ftp: float, lt1: float, lt2: float) -> Dict[str, float]:
+    # Same semantics as normalized_power: NaN is a pause, only windows of 30 recorded samples count,
+    # and TSS is scaled by recorded seconds.
+    power = streams["power"]
+    rolling = []
+    window_sum = 0.0
+    gaps = 0
+    for i, w in enumerate(power):
+        if math.isnan(w):
+            gaps += 1
+        else:
+            window_sum += w
+        if i >= 30:
+            dropped = power[i - 30]
+            if math.isnan(dropped):
+                gaps -= 1
+            else:
+                window_sum -= dropped
+        if i >= 29 and gaps == 0:
+            rolling.append(window_sum / 30)
+    np_w = (sum(r**4 for r in rolling) / len(rolling)) ** 0.25
+    intensity = np_w / ftp
+    recorded_s = sum(1 for w in power if not math.isnan(w))
+    zones = [0, 0, 0]
+    for hr in streams["heart_rate"]:
+        if not math.isnan(hr):
+            zones[0 if hr < lt1 else 1 if hr < lt2 else 2] += 1
+    return {
+        "normalized_power_watts": round(np_w, 1),
+        "intensity_factor": round(intensity, 3),
+        "tss": round(recorded_s * np_w * intensity / (ftp * 3600.0) * 100.0, 1),
+    }
+
+
+def _time(fn: Callable[[], object], runs: int) -> List[float]:
+    out = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - started) * 1000)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark stream-derived workout metrics")
+    parser.add_argument("--hours", type=float, default=10.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+    from src.core.stream_metrics import compute_stream_metrics
+    from src.integrations.streams import compute_workout_metrics
+    from src.storage.profile import DEFAULT_PROFILE, init_profile_db
+    from src.storage.streams import init_streams_db, save_streams
+    from src.storage.versions import init_versions_db
+    from src.storage.workouts import add_workout, init_workout_db
+
+    seconds = int(args.hours * 3600)
+    streams = _synthetic_streams(seconds, args.seed)
+    profile = dict(DEFAULT_PROFILE)
+
+    # The pipeline hands compute_stream_metrics float32 arrays straight from storage.
+    stored = {k: array("f", v) for k, v in streams.items()}
+    numpy_ms = _time(lambda: compute_stream_metrics(stored, "cycling", profile), args.runs)
+    python_ms = _time(
+        lambda: _python_reference(streams, profile["bike_ftp_w"], profile["bike_lt1_hr_bpm"], profile["bike_lt2_hr_bpm"]),
+        args.runs,
+    )
+    computed = compute_stream_metrics(stored, "cycling", profile)
+    reference = _python_reference(streams, profile["bike_ftp_w"], profile["bike_lt1_hr_bpm"], profile["bike_lt2_hr_bpm"])
+
+    init_versions_db()
+    init_workout_db()
+    init_profile_db()
+    init_streams_db()
+    workout = add_workout(1, {"sport": "cycling", "duration_minutes": seconds / 60.0})
+    save_streams(1, workout["id"], streams)
+    pipeline_ms = _time(lambda: compute_workout_metrics(1, workout["id"]), args.runs)
+
+    print(
+        json.dumps(
+            {
+                "samples": seconds,
+                "numpy_compute_ms_median": round(statistics.median(numpy_ms), 2),
+                "python_compute_ms_median": round(statistics.median(python_ms), 2),
+                "speedup": round(statistics.median(python_ms) / statistics.median(numpy_ms), 1),
+                "pipeline_ms_median": round(statistics.median(pipeline_ms), 2),
+                "metrics": computed,
+                "reference": reference,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib import request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_provider import FakeProviderConfig, start_fake_provider  # noqa: E402
+
+# End-to-end sync benchmark: fake provider -> API (uvicorn, in-process) -> SQLite.
+# Each run enqueues a sync through /api/v1/integrations/{provider}/sync and polls the job
+# until it finishes, reporting activities/sec and enqueue/end-to-end latency.
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _call(base: str, method: str, path: str, payload: Optional[Dict[str, Any]] = None, token: str = "") -> Any:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = request.Request(base + path, data=data, method=method, headers=headers)
+    with request.urlopen(req, timeout=120) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark provider sync throughput")
+    parser.add_argument("--provider", choices=["strava", "garmin_connect"], default="strava")
+    parser.add_argument("--kind", choices=["completed", "planned"], default="completed")
+    parser.add_argument("--activities", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-15min", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=4, help="STRAVA_SYNC_CONCURRENCY")
+    args = parser.parse_args()
+
+    fake, fake_state = start_fake_provider(
+        FakeProviderConfig(
+            activities=args.activities,
+            planned=args.activities,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            rate_limit_15min=args.rate_limit_15min,
+        )
+    )
+    fake_url = f"http://127.0.0.1:{fake.server_port}"
+    os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+    os.environ["STRAVA_API_URL"] = f"{fake_url}/api/v3"
+    os.environ["GARMIN_PROXY_URL"] = f"{fake_url}/garmin"
+    os.environ["STRAVA_SYNC_CONCURRENCY"] = str(args.concurrency)
+
+    import uvicorn
+
+    from src.api.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    base = f"http://127.0.0.1:{port}"
+    while not server.started:
+        time.sleep(0.05)
+
+    auth = _call(base, "POST", "/api/v1/auth/register", {"email": "bench@example.com", "password": "benchmark-pass"})
+    token = auth["access_token"]
+    _call(base, "POST", f"/api/v1/integrations/{args.provider}/token", {"access_token": "fake"}, token)
+
+    throughput: List[float] = []
+    enqueue_ms: List[float] = []
+    total_ms: List[float] = []
+    for run in range(args.runs):
+        started = time.perf_counter()
+        job = _call(base, "POST", f"/api/v1/integrations/{args.provider}/sync?kind={args.kind}&full=true", {}, token)["job"]
+        enqueue_ms.append((time.perf_counter() - started) * 1000)
+        while job["status"] in {"queued", "running"}:
+            time.sleep(0.02)
+            job = _call(base, "GET", f"/api/v1/integrations/sync/jobs/{job['id']}", token=token)["job"]
+        elapsed = time.perf_counter() - started
+        total_ms.append(elapsed * 1000)
+        if job["status"] != "done":
+            print(f"run {run + 1}: job {job['status']}: {job['error']}")
+            continue
+        throughput.append(job["synced"] / elapsed if elapsed > 0 else 0.0)
+        print(f"run {run + 1}: {job['synced']} activities in {elapsed:.2f}s ({throughput[-1]:.0f}/s)")
+
+    server.should_exit = True
+    fake.shutdown()
+    if not throughput:
+        return 1
+    print(
+        json.dumps(
+            {
+                "provider": args.provider,
+                "activities": args.activities,
+                "runs": len(throughput),
+                "activities_per_sec_mean": round(statistics.mean(throughput), 1),
+                "enqueue_ms_p50": round(_percentile(enqueue_ms, 50), 1),
+                "end_to_end_ms_p50": round(_percentile(total_ms, 50), 1),
+                "end_to_end_ms_p95": round(_percentile(total_ms, 95), 1),
+                "provider_requests": fake_state.stats(),
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
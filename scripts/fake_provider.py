@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import parse
+
+# Local stand-in for the Strava activities API, the OAuth token endpoint and the
+# GARMIN_PROXY_URL `/workouts` contract. Point the app at it with:
+#   STRAVA_API_URL=http://127.0.0.1:8765/api/v3
+#   STRAVA_OAUTH_AUTH_URL=http://127.0.0.1:8765/oauth/authorize
+#   STRAVA_OAUTH_TOKEN_URL=http://127.0.0.1:8765/oauth/token
+#   GARMIN_PROXY_URL=http://127.0.0.1:8765/garmin
+
+EPOCH_START = datetime(2023, 1, 1, 6, 0, tzinfo=timezone.utc)
+SPORTS = ["Ride", "Run", "Swim", "VirtualRide", "TrailRun"]
+
+
+@dataclass
+class FakeProviderConfig:
+    activities: int = 500
+    planned: int = 200
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_15min: int = 0
+    rate_limit_daily: int = 0
+    athlete_id: int = 134815
+    seed: int = 7
+
+
+def _activity(idx: int) -> Dict[str, Any]:
+    rng = random.Random(idx)
+    start = EPOCH_START + timedelta(hours=18 * idx)
+    moving = rng.randint(1800, 14400)
+    sport = SPORTS[idx % len(SPORTS)]
+    return {
+        "id": 10_000_000_000 + idx,
+        "name": f"{sport} #{idx}",
+        "type": sport,
+        "sport_type": sport,
+        "start_date": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "moving_time": moving,
+        "elapsed_time": moving + rng.randint(0, 600),
+        "distance": round(moving * rng.uniform(2.5, 9.0), 1),
+        "total_elevation_gain": round(rng.uniform(0, 1500), 1),
+        "average_heartrate": round(rng.uniform(120, 165), 1),
+        "max_heartrate": round(rng.uniform(170, 195), 1),
+        "average_watts": round(rng.uniform(150, 260), 1) if "Ride" in sport else None,
+        "weighted_average_watts": rng.randint(160, 280) if "Ride" in sport else None,
+        "average_cadence": round(rng.uniform(75, 95), 1),
+    }
+
+
+def _garmin_workout(idx: int, kind: str) -> Dict[str, Any]:
+    rng = random.Random(10_000 + idx)
+    start = EPOCH_START + timedelta(days=idx)
+    return {
+        "external_id": f"g-{kind}-{idx}",
+        "sport": ["cycling", "running", "swimming"][idx % 3],
+        "start_time": start.isoformat(),
+        "duration_minutes": rng.randint(30, 300),
+        "distance_km": round(rng.uniform(5, 120), 2),
+        "elevation_gain_m": round(rng.uniform(0, 1500), 1),
+        "avg_heart_rate_bpm": round(rng.uniform(120, 165), 1),
+        "max_heart_rate_bpm": round(rng.uniform(170, 195), 1),
+        "avg_power_watts": round(rng.uniform(150, 260), 1),
+        "normalized_power_watts": round(rng.uniform(160, 280), 1),
+        "avg_cadence": round(rng.uniform(75, 95), 1),
+        "notes": f"{kind} workout {idx}",
+    }
+
+
+def _streams(idx: int) -> Dict[str, Any]:
+    # Smart-recording style: irregular 1-3 s spacing with the odd pause.
+    rng = random.Random(20_000 + idx)
+    activity = _activity(idx)
+    times: List[int] = []
+    t = 0
+    while t < activity["elapsed_time"]:
+        times.append(t)
+        t += rng.choice((1, 1, 1, 2, 3)) if rng.random() > 0.002 else rng.randint(20, 120)
+    hr = [round(130 + 25 * rng.random()) for _ in times]
+    out = {
+        "time": {"data": times, "series_type": "time", "resolution": "high"},
+        "heartrate": {"data": hr, "series_type": "time", "resolution": "high"},
+        "cadence": {"data": [rng.randint(70, 100) for _ in times], "series_type": "time", "resolution": "high"},
+        "altitude": {"data": [round(100 + 50 * rng.random(), 1) for _ in times], "series_type": "time", "resolution": "high"},
+    }
+    if "Ride" in activity["type"]:
+        out["watts"] = {"data": [rng.randint(120, 320) for _ in times], "series_type": "time", "resolution": "high"}
+    return out
+
+
+class FakeProviderState:
+    def __init__(self, config: FakeProviderConfig) -> None:
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.window_15min = (0, 0)
+        self.window_daily = (0, 0)
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def _count(self, window: Tuple[int, int], period: int, now: float) -> Tuple[int, int]:
+        start = int(now // period) * period
+        return (start, window[1] + 1) if window[0] == start else (start, 1)
+
+    def admit(self) -> Tuple[Optional[int], Dict[str, str]]:
+        cfg = self.config
+        with self.lock:
+            self.requests += 1
+            now = time.time()
+            self.window_15min = self._count(self.window_15min, 900, now)
+            self.window_daily = self._count(self.window_daily, 86400, now)
+            headers: Dict[str, str] = {}
+            if cfg.rate_limit_15min or cfg.rate_limit_daily:
+                headers["X-RateLimit-Limit"] = f"{cfg.rate_limit_15min or 100000},{cfg.rate_limit_daily or 1000000}"
+                headers["X-RateLimit-Usage"] = f"{self.window_15min[1]},{self.window_daily[1]}"
+                if cfg.rate_limit_15min and self.window_15min[1] > cfg.rate_limit_15min:
+                    self.throttled += 1
+                    headers["Retry-After"] = str(int(self.window_15min[0] + 900 - now) + 1)
+                    return 429, headers
+                if cfg.rate_limit_daily and self.window_daily[1] > cfg.rate_limit_daily:
+                    self.throttled += 1
+                    headers["Retry-After"] = str(int(self.window_daily[0] + 86400 - now) + 1)
+                    return 429, headers
+            if cfg.error_rate and self.rng.random() < cfg.error_rate:
+                self.errors += 1
+                return 503, headers
+            delay = cfg.latency_ms + (self.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return None, headers
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"requests": self.requests, "throttled": self.throttled, "errors": self.errors}
+
+
+def make_handler(state: FakeProviderState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def do_GET(self) -> None:
+            url = parse.urlsplit(self.path)
+            query = dict(parse.parse_qsl(url.query))
+            if url.path == "/oauth/authorize":
+                target = query.get("redirect_uri", "/")
+                sep = "&" if "?" in target else "?"
+                location = f"{target}{sep}code=fake-code&state={parse.quote(query.get('state', ''))}"
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if url.path == "/_stats":
+                self._send(200, state.stats())
+                return
+
+            status, headers = state.admit()
+            if status is not None:
+                self._send(status, {"message": "Rate Limit Exceeded" if status == 429 else "Service Unavailable"}, headers)
+                return
+
+            cfg = state.config
+            if url.path == "/api/v3/athlete/activities":
+                page = max(1, int(query.get("page", 1)))
+                per_page = min(200, max(1, int(query.get("per_page", 30))))
+                after = int(query["after"]) if "after" in query else None
+                items = [_activity(i) for i in range(cfg.activities)]
+                if after is not None:
+                    items = [a for a in items if _epoch(a["start_date"]) > after]
+                else:
+                    items.reverse()
+                self._send(200, items[(page - 1) * per_page : page * per_page], headers)
+                return
+            if url.path.startswith("/api/v3/activities/"):
+                parts = url.path[len("/api/v3/activities/") :].split("/")
+                try:
+                    idx = int(parts[0]) - 10_000_000_000
+                except ValueError:
+                    idx = -1
+                if 0 <= idx < cfg.activities and parts[1:] == ["streams"]:
+                    self._send(200, _streams(idx), headers)
+                elif 0 <= idx < cfg.activities and len(parts) == 1:
+                    self._send(200, _activity(idx), headers)
+                else:
+                    self._send(404, {"message": "Record Not Found"}, headers)
+                return
+            if url.path == "/garmin/workouts":
+                kind = query.get("kind", "completed")
+                count = cfg.planned if kind == "planned" else cfg.activities
+                self._send(200, [_garmin_workout(i, kind) for i in range(count)], headers)
+                return
+            self._send(404, {"message": "Not Found"}, headers)
+
+        def do_POST(self) -> None:
+            url = parse.urlsplit(self.path)
+            self._read_body()
+            if url.path != "/oauth/token":
+                self._send(404, {"message": "Not Found"})
+                return
+            status, headers = state.admit()
+            if status is not None:
+                self._send(status, {"message": "unavailable"}, headers)
+                return
+            now = int(time.time())
+            self._send(
+                200,
+                {
+                    "token_type": "Bearer",
+                    "access_token": f"fake-access-{now}-{state.rng.randint(0, 1_000_000)}",
+                    "refresh_token": "fake-refresh",
+                    "expires_at": now + 6 * 3600,
+                    "expires_in": 6 * 3600,
+                    "athlete": {"id": state.config.athlete_id},
+                },
+                headers,
+            )
+
+    return Handler
+
+
+def _epoch(iso: str) -> int:
+    return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+
+
+def start_fake_provider(config: FakeProviderConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, FakeProviderState]:
+    state = FakeProviderState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-provider", daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Strava/Garmin provider stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--activities", type=int, default=500)
+    parser.add_argument("--planned", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-15min", type=int, default=0)
+    parser.add_argument("--rate-limit-daily", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeProviderConfig(
+        activities=args.activities,
+        planned=args.planned,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_15min=args.rate_limit_15min,
+        rate_limit_daily=args.rate_limit_daily,
+    )
+    server, _ = start_fake_provider(config, args.host, args.port)
+    print(f"fake provider listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib import request
+from urllib.error import HTTPError
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Load test for the engine process pool: a uvicorn server is started once with the engine in the
+# request threadpool (ENGINE_WORKERS=0) and once on the process pool. Cheap reads (GET /profile)
+# are timed alone and then while clients hammer POST /predict with long, distinct plans.
+
+PREDICT = {
+    "profile": {"body_mass_kg": 71, "vo2max": 58, "sweat_rate_l_h": 1.1, "bike_ftp_w": 280},
+    "session": {"sport": "cycling", "duration_minutes": 1200, "intensity_rpe": 6.5, "avg_power_watts": 210},
+    "environment": {"temperature_c": 27, "humidity_pct": 60, "altitude_m": 300},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _call(base: str, method: str, path: str, payload: Optional[Dict[str, Any]] = None, token: str = "") -> int:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = request.Request(base + path, data=data, method=method, headers=headers)
+    try:
+        with request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            return resp.status
+    except HTTPError as exc:
+        return exc.code
+
+
+def _login(base: str) -> str:
+    creds = {"email": "load@example.com", "password": "load-test-pass"}
+    _call(base, "POST", "/api/v1/auth/register", creds)
+    req = request.Request(
+        base + "/api/v1/auth/login",
+        data=json.dumps(creds).encode("utf-8"),
+        method="POST",
+        headers={"Content-Type": "application/json"},
+    )
+    with request.urlopen(req, timeout=30) as resp:
+        return str(json.loads(resp.read())["access_token"])
+
+
+def _start_server(workers: int, queue: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DB_PATH": str(Path(tempfile.mkdtemp()) / "load.sqlite3"),
+        "ENGINE_WORKERS": str(workers),
+        "ENGINE_MAX_QUEUE": str(queue),
+        "PYTHONPATH": str(ROOT),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            if _call(base, "GET", "/api/v1/health") == 200:
+                return proc, base
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000
+
+
+def _cheap_loop(base: str, token: str, stop: threading.Event, samples: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        _call(base, "GET", "/api/v1/profile", token=token)
+        samples.append(time.perf_counter() - started)
+        time.sleep(0.01)
+
+
+def _heavy_loop(base: str, token: str, stop: threading.Event, seed: int, counts: Dict[str, int]) -> None:
+    i = 0
+    while not stop.is_set():
+        # Distinct body masses keep single-flight coalescing out of the picture.
+        body = {**PREDICT, "profile": {**PREDICT["profile"], "body_mass_kg": 50 + (seed * 997 + i) % 80}}
+        status = _call(base, "POST", "/api/v1/predict", body, token=token)
+        counts[str(status)] = counts.get(str(status), 0) + 1
+        i += 1
+
+
+def _phase(base: str, token: str, seconds: float, cheap: int, heavy: int) -> Dict[str, Any]:
+    stop = threading.Event()
+    samples: List[float] = []
+    counts: Dict[str, int] = {}
+    threads = [threading.Thread(target=_cheap_loop, args=(base, token, stop, samples)) for _ in range(cheap)]
+    threads += [threading.Thread(target=_heavy_loop, args=(base, token, stop, n, counts)) for n in range(heavy)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "cheap_requests": len(samples),
+        "cheap_p50_ms": round(_percentile(samples, 0.50), 1),
+        "cheap_p99_ms": round(_percentile(samples, 0.99), 1),
+        "predicts_per_s": round(sum(counts.values()) / seconds, 1),
+        "predict_statuses": counts,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cheap-endpoint latency with heavy predicts, threadpool vs process pool")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--cheap", type=int, default=4, help="concurrent GET /profile clients")
+    parser.add_argument("--heavy", type=int, default=16, help="concurrent POST /predict clients")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 1) - 1)))
+    parser.add_argument("--queue", type=int, default=64)
+    args = parser.parse_args()
+
+    results = []
+    for workers in (0, args.workers):
+        proc, base = _start_server(workers, args.queue)
+        try:
+            token = _login(base)
+            time.sleep(1)  # let pool workers finish warming
+            idle = _phase(base, token, args.seconds / 2, args.cheap, 0)
+            loaded = _phase(base, token, args.seconds, args.cheap, args.heavy)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+        results.append(
+            {
+                "engine": "threadpool" if workers == 0 else f"process pool x{workers}",
+                "idle_cheap_p99_ms": idle["cheap_p99_ms"],
+                "loaded_cheap_p50_ms": loaded["cheap_p50_ms"],
+                "loaded_cheap_p99_ms": loaded["cheap_p99_ms"],
+                "predicts_per_s": loaded["predicts_per_s"],
+                "predict_statuses": loaded["predict_statuses"],
+            }
+        )
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
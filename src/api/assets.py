@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from src.api.compression import accepted_encodings, brotli, compress
+from src.api.conditional import etag_matches
+from src.observability.metrics import counter
+
+ASSET_PREFIX = "/assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+_STATIC_REF = re.compile(r"/static/([A-Za-z0-9_.\-]+)(\?[^\"']*)?")
+
+_CACHE = counter("cache_requests_total", "Cache lookups by cache and outcome", ("cache", "outcome"))
+
+
+class _Asset:
+    def __init__(self, content: bytes, media_type: str) -> None:
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        self.variants: Dict[Optional[str], bytes] = {None: content}
+        for encoding in ("br", "gzip"):
+            if encoding == "br" and brotli is None:
+                continue
+            packed = compress(content, encoding, static=True)
+            if len(packed) < len(content):
+                self.variants[encoding] = packed
+
+
+class StaticAssets:
+    # Web assets are hashed and precompressed once at startup. index.html is rewritten to point at
+    # /assets/<name>.<hash><ext>, which never changes content and can be cached forever; only the
+    # small index page is revalidated on each visit.
+    def __init__(self, directory: Path, index: str = "index.html") -> None:
+        self.directory = directory
+        self.index_name = index
+        self._assets: Dict[str, _Asset] = {}
+        self._hashed: Dict[str, str] = {}
+        self._index: Optional[_Asset] = None
+
+    def build(self) -> None:
+        assets: Dict[str, _Asset] = {}
+        hashed: Dict[str, str] = {}
+        for path in sorted(self.directory.iterdir()):
+            if not path.is_file() or path.name == self.index_name:
+                continue
+            content = path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()[:10]
+            name = f"{path.stem}.{digest}{path.suffix}"
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            assets[name] = _Asset(content, media_type)
+            hashed[path.name] = name
+        html = (self.directory / self.index_name).read_text(encoding="utf-8")
+        html = _STATIC_REF.sub(lambda m: ASSET_PREFIX + hashed[m.group(1)] if m.group(1) in hashed else m.group(0), html)
+        self._assets, self._hashed = assets, hashed
+        self._index = _Asset(html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def url_for(self, filename: str) -> str:
+        return ASSET_PREFIX + self._hashed[filename]
+
+    def index_response(self, request: Request) -> Response:
+        if self._index is None:
+            self.build()
+        return _serve(request, self._index, "no-cache")
+
+    def asset_response(self, request: Request, name: str) -> Optional[Response]:
+        asset = self._assets.get(name)
+        return _serve(request, asset, IMMUTABLE) if asset is not None else None
+
+
+def _serve(request: Request, asset: _Asset, cache_control: str) -> Response:
+    encoding = next((e for e in accepted_encodings(request.headers.get("accept-encoding")) if e in asset.variants), None)
+    etag = asset.etag if encoding is None else f"W/{asset.etag}"
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    inm = request.headers.get("if-none-match")
+    if inm and etag_matches(inm, asset.etag):
+        _CACHE.inc(cache="static", outcome="hit")
+        return Response(status_code=304, headers=headers)
+    _CACHE.inc(cache="static", outcome="miss" if inm else "uncached")
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
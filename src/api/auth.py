@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+import os
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, EmailStr, Field
 
@@ -15,6 +17,9 @@ from src.storage.auth import (
 
 http_bearer = HTTPBearer(auto_error=False)
 
+# Comma-separated accounts allowed on /api/v1/admin/*; empty disables the admin endpoints.
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
 
 class AuthRequest(BaseModel):
     email: EmailStr
@@ -68,7 +73,12 @@ def login_user(payload: AuthRequest) -> AuthResponse:
     return AuthResponse(access_token=token, user=user)
 
 
-def require_user(credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer)) -> dict:
+def require_user(request: Request, credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer)) -> dict:
+    # Sub-requests of /api/v1/batch carry the user the batch itself authenticated.
+    batch_user = request.scope.get("state", {}).get("batch_user")
+    if batch_user is not None:
+        return batch_user
+
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
@@ -86,3 +96,13 @@ def require_user(credentials: HTTPAuthorizationCredentials | None = Depends(http
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
     return user
+
+
+def is_admin(user: dict) -> bool:
+    return str(user["email"]).lower() in ADMIN_EMAILS
+
+
+def require_admin(current_user: dict = Depends(require_user)) -> dict:
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from starlette.types import ASGIApp, Message, Scope
+
+BATCH_USER_STATE = "batch_user"
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_METHODS = "^(GET|POST|PUT|PATCH|DELETE)$"
+
+# Sub-request headers a client may set per item; auth comes from the outer request only.
+_ALLOWED_ITEM_HEADERS = {"if-none-match", "if-match", "accept-language", "x-request-id"}
+_RETURNED_HEADERS = {"content-type", "etag", "cache-control", "location", "retry-after", "last-modified"}
+
+
+class BatchItem(BaseModel):
+    id: str | None = Field(default=None, max_length=64)
+    method: str = Field(default="GET", pattern=BATCH_METHODS)
+    path: str = Field(min_length=1, max_length=2048)
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(min_length=1)
+
+
+def invalid_batch_path(path: str) -> Optional[str]:
+    if not path.startswith("/api/v1/") or "://" in path:
+        return "Sub-request paths must be absolute /api/v1/ paths"
+    if path.split("?", 1)[0].rstrip("/") == "/api/v1/batch":
+        return "Batches cannot be nested"
+    if path.split("?", 1)[0].rstrip("/").endswith("/live"):
+        return "Live session streams cannot be batched"
+    return None
+
+
+async def _dispatch(app: ASGIApp, parent: Scope, item: BatchItem, user: Dict[str, Any]) -> Dict[str, Any]:
+    path, _, query = item.path.partition("?")
+    body = b"" if item.body is None else json.dumps(item.body).encode("utf-8")
+    headers = [(b"accept", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    for key, value in item.headers.items():
+        if key.lower() in _ALLOWED_ITEM_HEADERS:
+            headers.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+    scope: Dict[str, Any] = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "headers": headers,
+        # require_user trusts this instead of re-validating the bearer token per item.
+        "state": {BATCH_USER_STATE: user},
+    }
+
+    done = asyncio.Event()
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = int(message["status"])
+            for key, value in message.get("headers", []):
+                name = key.decode("latin-1").lower()
+                if name in _RETURNED_HEADERS:
+                    response_headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+
+    raw = b"".join(chunks)
+    parsed: Any = None
+    if raw:
+        if "json" in response_headers.get("content-type", ""):
+            parsed = json.loads(raw)
+        else:
+            parsed = raw.decode("utf-8", errors="replace")
+    return {"id": item.id, "status": status, "headers": response_headers, "body": parsed}
+
+
+async def run_batch(app: ASGIApp, parent: Scope, items: List[BatchItem], user: Dict[str, Any]) -> Dict[str, Any]:
+    # Consecutive reads run concurrently (sync handlers land on the threadpool); a write is a
+    # barrier so reads after it see its effect, and writes keep their submitted order.
+    started = time.perf_counter()
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    pending: List[int] = []
+
+    async def flush() -> None:
+        results = await asyncio.gather(*(_dispatch(app, parent, items[i], user) for i in pending))
+        for i, result in zip(pending, results):
+            responses[i] = result
+        pending.clear()
+
+    for idx, item in enumerate(items):
+        if item.id is None:
+            item.id = str(idx)
+        error = invalid_batch_path(item.path)
+        if error is not None:
+            responses[idx] = {"id": item.id, "status": 400, "headers": {}, "body": {"detail": error}}
+            continue
+        if item.method == "GET":
+            pending.append(idx)
+            continue
+        await flush()
+        responses[idx] = await _dispatch(app, parent, item, user)
+    await flush()
+    return {"responses": responses, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
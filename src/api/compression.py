@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import gzip
+import os
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli  # same process()/finish() API
+    except ImportError:
+        brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+# Dynamic bodies favour speed; static assets are precompressed once at the maximum quality.
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+# Already-compressed formats, and event streams that must not be buffered.
+_SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    # Encodings this server can produce that the client accepts, most preferred first.
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        key, _, value = params.strip().partition("=")
+        if key == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    return [name for name in supported if offered.get(name, 0) > 0]
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    return accepted[0] if accepted else None
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if static else COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _stream_compressor(encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    deflate = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return deflate.compress, deflate.flush
+
+
+class CompressionMiddleware:
+    # Compresses any response at or above COMPRESS_MIN_BYTES for clients that accept br or gzip.
+    # Responses that already carry a Content-Encoding (precompressed static assets) pass through.
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _compressing_send(send, encoding, self.minimum_size))
+
+
+def _compressing_send(send: Send, encoding: str, minimum_size: int) -> Send:
+    start: Optional[Message] = None
+    stream: Optional[Tuple[Callable[[bytes], bytes], Callable[[], bytes]]] = None
+    passthrough = False
+
+    async def wrapped(message: Message) -> None:
+        nonlocal start, stream, passthrough
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message.get("headers", []))
+            content_type = headers.get("content-type", "")
+            passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or content_type.startswith(_SKIP_TYPES)
+            )
+            if passthrough:
+                await send(message)
+            else:
+                start = message
+            return
+        if passthrough or message["type"] != "http.response.body":
+            await send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if start is not None:
+            pending, start = start, None
+            headers = MutableHeaders(scope=pending)
+            if not more and len(body) < minimum_size:
+                passthrough = True
+                await send(pending)
+                await send(message)
+                return
+            headers["content-encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"
+            if not more:
+                body = compress(body, encoding)
+                headers["content-length"] = str(len(body))
+                await send(pending)
+                await send({"type": "http.response.body", "body": body})
+                return
+            # Streamed bodies (FileResponse chunks) are compressed incrementally.
+            del headers["content-length"]
+            stream = _stream_compressor(encoding)
+            await send(pending)
+
+        if stream is None:
+            await send(message)
+            return
+        process, finish = stream
+        chunk = process(body)
+        if not more:
+            chunk += finish()
+        await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+    return wrapped
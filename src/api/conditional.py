@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+from src.api.negotiation import response_media
+from src.observability.metrics import counter
+from src.storage.versions import get_versions
+
+# Folded into every tag so a restart (new code, changed OAuth env) never answers 304 for a body
+# the previous process rendered.
+_BOOT_ID = uuid.uuid4().hex
+CACHE_CONTROL = "private, no-cache"
+
+_CACHE = counter("cache_requests_total", "Cache lookups by cache and outcome", ("cache", "outcome"))
+
+
+def resource_etag(user_id: int, resources: Iterable[str], *variant: object) -> str:
+    # The browser cache is keyed on the URL, not the bearer token, so the user id is part of the tag.
+    # So is the negotiated media type: JSON, MessagePack and CBOR bodies are different representations,
+    # and a tag held for one must not earn a 304 for another.
+    versions = get_versions(user_id, resources)
+    key = "|".join(
+        [_BOOT_ID, str(user_id), response_media(), *(f"{k}={v}" for k, v in versions.items()), *map(str, variant)]
+    )
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def daily_variant() -> str:
+    # Analytics windows are relative to now, so their tags also roll over once a day.
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison.
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+
+def conditional(request: Request, response: Response, etag: str) -> Optional[Response]:
+    header = request.headers.get("if-none-match")
+    if header and etag_matches(header, etag):
+        _CACHE.inc(cache="etag", outcome="hit")
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"})
+    _CACHE.inc(cache="etag", outcome="miss" if header else "uncached")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+    return None
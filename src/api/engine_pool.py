@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from src.core.engine import predict, simulate, stage_timings
+from src.core.models import FoodItem, PredictionRequest, PredictionResponse, SimulationRequest, SimulationResponse
+from src.observability.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_QUEUED = gauge("engine_pool_queued", "Engine evaluations submitted and not yet finished")
+_REJECTED = counter("engine_pool_rejected_total", "Engine evaluations refused because the queue was full")
+_SECONDS = histogram("engine_pool_seconds", "Engine evaluation latency including queueing", ("task",))
+_STAGE_SECONDS = histogram(
+    "engine_stage_seconds",
+    "Time spent in each prediction engine stage",
+    ("task", "stage"),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+Timings = List[Tuple[str, float]]
+
+
+class EngineBusy(Exception):
+    pass
+
+
+def _warm() -> None:
+    # Runs once per worker so the first real request does not pay for imports and model building.
+    predict(
+        PredictionRequest.model_validate(
+            {
+                "profile": {"body_mass_kg": 70},
+                "session": {"sport": "cycling", "duration_minutes": 60, "intensity_rpe": 6},
+                "environment": {"temperature_c": 20, "humidity_pct": 50, "altitude_m": 0},
+            }
+        )
+    )
+
+
+# Stage timings are collected where the engine runs and returned with the result, since metrics
+# recorded inside a pool worker would never reach this process's registry.
+def _predict(req: PredictionRequest, foods: List[FoodItem]) -> Tuple[PredictionResponse, Timings]:
+    with stage_timings() as timings:
+        return predict(req, foods=foods), timings
+
+
+def _simulate(req: SimulationRequest, foods: List[FoodItem]) -> Tuple[SimulationResponse, Timings]:
+    with stage_timings() as timings:
+        return simulate(req, foods=foods), timings
+
+
+def _observe(task: str, timings: Timings) -> None:
+    for stage, seconds in timings:
+        _STAGE_SECONDS.observe(seconds, task=task, stage=stage)
+
+
+class EnginePool:
+    # predict/simulate are pure CPU. On the process pool they stop competing with request threads
+    # for the GIL, so cheap reads keep their latency while heavy plans are computed. With
+    # max_workers=0 the engine runs in the request threadpool as before.
+    def __init__(self, max_workers: int = 2, max_queue: int = 64) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process runs several background threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm,
+                )
+            return self._executor
+
+    def start(self) -> None:
+        if self.max_workers <= 0:
+            return
+        pool = self._pool()
+        # Workers are spawned on demand; one no-op per worker starts them all now.
+        for _ in range(self.max_workers):
+            pool.submit(int)
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Evaluations take milliseconds; waiting lets every worker exit with the server.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, task: str, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._queued >= self.max_queue:
+                _REJECTED.inc()
+                raise EngineBusy(f"Engine queue is full ({self.max_queue} pending)")
+            self._queued += 1
+            _QUEUED.set(self._queued)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if self.max_workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            pool = self._pool()
+            try:
+                return await asyncio.wrap_future(pool.submit(fn, *args))
+            except BrokenProcessPool:
+                logger.warning("Engine worker crashed; restarting the pool")
+                self._reset(pool)
+                return await asyncio.wrap_future(self._pool().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._queued -= 1
+                _QUEUED.set(self._queued)
+            _SECONDS.observe(loop.time() - started, task=task)
+
+    async def predict(self, req: PredictionRequest, foods: List[FoodItem]) -> PredictionResponse:
+        res, timings = await self.run("predict", _predict, req, foods)
+        _observe("predict", timings)
+        return res
+
+    async def simulate(self, req: SimulationRequest, foods: List[FoodItem]) -> SimulationResponse:
+        res, timings = await self.run("simulate", _simulate, req, foods)
+        _observe("simulate", timings)
+        return res
+
+
+# Opt-in: os.cpu_count() reports host CPUs, not the container's quota, and on a fractional or single
+# core the pool only adds pickling, context switches and a Python process per worker. Set it to at
+# most the cores actually available minus one for the event loop.
+engine_pool = EnginePool(
+    max_workers=max(0, int(os.getenv("ENGINE_WORKERS", "0"))),
+    max_queue=max(1, int(os.getenv("ENGINE_MAX_QUEUE", "64"))),
+)
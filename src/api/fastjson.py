@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict, Type, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
+
+from src.api.negotiation import JSON, encode, response_media
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class FastJSONResponse(Response):
+    # pydantic-core's Rust encoder serializes models, dicts, enums and datetimes straight to bytes,
+    # skipping FastAPI's model_dump -> response-field validation -> jsonable_encoder -> json.dumps.
+    # When the request negotiated MessagePack/CBOR the body is encoded in that format directly.
+    media_type = JSON
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        media = response_media()
+        if media != JSON:
+            self.media_type = media
+            return encode(media, content)
+        return to_json(content, inf_nan_mode="null")
+
+
+def json_body(model: Type[M]) -> Callable[[Request], Awaitable[M]]:
+    # Validates the raw request bytes in one pass instead of json.loads followed by model validation.
+    async def dependency(request: Request) -> M:
+        raw = await request.body()
+        try:
+            return model.model_validate_json(raw)
+        except ValidationError as exc:
+            errors = [{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)]
+            raise RequestValidationError(errors, body=raw)
+
+    return dependency
+
+
+_REF_TEMPLATE = "#/components/schemas/{model}"
+_body_schemas: Dict[str, Any] = {}
+
+
+def body_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    # `openapi_extra` for a route reading its body through json_body: FastAPI sees no body parameter
+    # there, so the requestBody is declared here. Nested models are added by add_body_schemas().
+    schema = model.model_json_schema(ref_template=_REF_TEMPLATE)
+    _body_schemas.update(schema.pop("$defs", {}))
+    _body_schemas[model.__name__] = schema
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": _REF_TEMPLATE.format(model=model.__name__)}}},
+        }
+    }
+
+
+def add_body_schemas(openapi: Dict[str, Any]) -> Dict[str, Any]:
+    schemas = openapi.setdefault("components", {}).setdefault("schemas", {})
+    for name, schema in _body_schemas.items():
+        schemas.setdefault(name, schema)
+    return openapi
+
+
+def splice_raw(obj: Dict[str, Any], key: str, raw: str | bytes) -> bytes:
+    # Appends already-encoded JSON (a stored *_json column) as `key` without decoding it first.
+    head = to_json(obj, inf_nan_mode="null")
+    sep = b"," if obj else b""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    return head[:-1] + sep + to_json(key) + b":" + raw + b"}"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hmac
+import os
+import time
+from typing import Optional
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.observability.metrics import gauge, histogram
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+
+_REQUEST_SECONDS = histogram(
+    "http_request_seconds",
+    "Request latency by method, route template and status",
+    ("method", "route", "status"),
+)
+_IN_PROGRESS = gauge("http_requests_in_progress", "Requests currently being handled")
+
+
+def metrics_authorized(request: Request) -> Optional[bool]:
+    # None when the endpoint is disabled (no METRICS_TOKEN), so it can answer 404 instead of 401.
+    if not METRICS_TOKEN:
+        return None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip(), METRICS_TOKEN)
+
+
+class RequestMetricsMiddleware:
+    # Outermost, so shed requests and compression are part of the measured latency. Routes are
+    # labelled by their template (/api/v1/workouts/{workout_id}), never the raw path.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def observed_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, observed_send)
+        finally:
+            _IN_PROGRESS.dec()
+            route = scope.get("route")
+            _REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                # Unrouted: 404s and requests shed before routing (see admission_shed_total).
+                route=getattr(route, "path", None) or "unmatched",
+                status=status,
+            )
+
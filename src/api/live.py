@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic_core import to_json
+from starlette.concurrency import run_in_threadpool
+
+from src.core.engine import predict, replan_fueling_slots
+from src.core.models import FoodItem, FuelingAction, PredictionRequest, StrategyType
+from src.observability.metrics import counter, gauge, histogram
+from src.storage.foods import resolve_foods_for_plan
+from src.storage.live import delete_live_session, get_live_session, save_live_session
+from src.storage.versions import WORKOUTS, get_resource_versions, get_versions
+from src.storage.workouts import list_workout_fueling_events
+
+LIVE_MAX_STREAMS = int(os.getenv("LIVE_MAX_STREAMS", "500"))
+LIVE_POLL_S = float(os.getenv("LIVE_POLL_S", "5"))
+LIVE_SLOT_LEAD_S = float(os.getenv("LIVE_SLOT_LEAD_S", "30"))
+LIVE_HEARTBEAT_S = 15.0
+
+_STREAMS = gauge("live_session_streams", "Open live-session event streams")
+_REPLANS = counter("live_session_replans_total", "Remaining-slot re-plans by trigger", ("trigger",))
+_CACHE = counter("cache_requests_total", "Cache lookups by cache and outcome", ("cache", "outcome"))
+_REPLAN_SECONDS = histogram("live_session_replan_seconds", "Intake reload + remaining-slot re-plan latency")
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + to_json(data) + b"\n\n"
+
+
+class LiveSession:
+    def __init__(self, user_id: int, workout_id: int, req: PredictionRequest, foods: List[FoodItem], started_epoch: float) -> None:
+        self.user_id = user_id
+        self.workout_id = workout_id
+        self.req = req
+        self.foods = foods
+        self.started_epoch = started_epoch
+        # The strategy and the initial plan are computed once; intake only re-targets what is left.
+        plan = predict(req, foods=foods)
+        self.balanced = next(s for s in plan.strategies if s.strategy == StrategyType.balanced)
+        self.remaining: List[FuelingAction] = [a for a in plan.fueling_schedule if a.minute_offset > 0]
+        self.consumed = {"carbs_g": 0.0, "fluid_ml": 0.0, "sodium_mg": 0.0, "caffeine_mg": 0.0}
+        self.intake_version = -1
+        self.subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+    @property
+    def duration_s(self) -> float:
+        return self.req.session.duration_minutes * 60.0
+
+    def due_epoch(self, action: FuelingAction) -> float:
+        return self.started_epoch + action.minute_offset * 60.0
+
+    def apply_intake(self, events: List[Dict[str, Any]], version: int, now: float) -> bool:
+        # Minute-0 entries are the pre-start meal, which the in-session targets do not include.
+        intake = [e for e in events if e["minute_offset"] > 0]
+        consumed = {key: round(sum(float(e.get(key) or 0) for e in intake), 1) for key in self.consumed}
+        last_food = next((e["food_name"] for e in reversed(intake) if e.get("food_name")), None)
+        elapsed_min = int(max(0.0, now - self.started_epoch) // 60)
+        after = max([elapsed_min] + [int(e["minute_offset"]) for e in intake])
+        remaining = replan_fueling_slots(
+            self.req,
+            self.balanced,
+            self.foods,
+            after_minute=after,
+            consumed_carbs_g=consumed["carbs_g"],
+            consumed_fluid_ml=consumed["fluid_ml"],
+            consumed_sodium_mg=consumed["sodium_mg"],
+            consumed_caffeine_mg=consumed["caffeine_mg"],
+            last_food_name=last_food,
+        )
+        self.intake_version = version
+        changed = consumed != self.consumed or remaining != self.remaining
+        self.consumed, self.remaining = consumed, remaining
+        return changed
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        return {
+            "workout_id": self.workout_id,
+            "started_at": datetime.fromtimestamp(self.started_epoch, timezone.utc).isoformat(),
+            "elapsed_min": round(max(0.0, now - self.started_epoch) / 60.0, 1),
+            "duration_min": self.req.session.duration_minutes,
+            "strategy": self.balanced,
+            "consumed": self.consumed,
+            "remaining": self.remaining,
+        }
+
+
+class LiveSessionHub:
+    # Sessions live in the database; each worker caches the ones it is streaming. Streams are
+    # coroutines on the event loop (no thread per client). Intake logged through this worker wakes
+    # its streams immediately; intake that lands on another worker is picked up by a single poller
+    # that checks the workouts version counter of every streaming user in one query.
+    def __init__(self) -> None:
+        self._sessions: Dict[Tuple[int, int], LiveSession] = {}
+        self._lock = threading.Lock()
+        self._poller: Optional[asyncio.Task] = None
+        self.open_streams = 0
+
+    def start(self, user_id: int, workout_id: int, req: PredictionRequest, foods: List[FoodItem], started_epoch: float) -> LiveSession:
+        session = LiveSession(user_id, workout_id, req, foods, started_epoch)
+        save_live_session(user_id, workout_id, req.model_dump_json(), started_epoch)
+        with self._lock:
+            previous = self._sessions.get((user_id, workout_id))
+            self._sessions[(user_id, workout_id)] = session
+        if previous is not None:
+            session.subscribers = previous.subscribers
+            self._post(previous, "restart")
+        return session
+
+    def end(self, user_id: int, workout_id: int) -> bool:
+        with self._lock:
+            session = self._sessions.pop((user_id, workout_id), None)
+        if session is not None:
+            self._post(session, "end")
+        return delete_live_session(user_id, workout_id) or session is not None
+
+    def notify_intake(self, user_id: int, workout_id: int) -> None:
+        session = self._sessions.get((user_id, workout_id))
+        if session is not None:
+            self._post(session, "intake")
+
+    def _post(self, session: LiveSession, message: str) -> None:
+        # Called from request threads; queues belong to the event loop.
+        for loop, queue in list(session.subscribers):
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    def _load(self, user_id: int, workout_id: int) -> Optional[LiveSession]:
+        row = get_live_session(user_id, workout_id)
+        if row is None:
+            return None
+        req = PredictionRequest.model_validate_json(row["request_json"])
+        foods = [FoodItem(**f) for f in resolve_foods_for_plan(user_id, req.selected_food_ids)]
+        return LiveSession(user_id, workout_id, req, foods, float(row["started_epoch"]))
+
+    async def open(self, user_id: int, workout_id: int) -> Optional[LiveSession]:
+        session = self._sessions.get((user_id, workout_id))
+        _CACHE.inc(cache="live_session", outcome="miss" if session is None else "hit")
+        if session is None:
+            loaded = await run_in_threadpool(self._load, user_id, workout_id)
+            if loaded is None:
+                return None
+            with self._lock:
+                session = self._sessions.setdefault((user_id, workout_id), loaded)
+        return session
+
+    async def _poll(self) -> None:
+        while self.open_streams:
+            await asyncio.sleep(LIVE_POLL_S)
+            sessions = [s for s in list(self._sessions.values()) if s.subscribers]
+            versions = await run_in_threadpool(get_resource_versions, [s.user_id for s in sessions], WORKOUTS)
+            for session in sessions:
+                if versions.get(session.user_id, session.intake_version) != session.intake_version:
+                    for _, queue in list(session.subscribers):
+                        queue.put_nowait("poll")
+        self._poller = None
+
+    def _reload(self, session: LiveSession) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        version = get_versions(session.user_id, (WORKOUTS,))[WORKOUTS]
+        if version == session.intake_version:
+            return None
+        return version, list_workout_fueling_events(session.user_id, session.workout_id)
+
+    async def _refresh(self, session: LiveSession, trigger: str) -> bool:
+        started = time.perf_counter()
+        reloaded = await run_in_threadpool(self._reload, session)
+        if reloaded is None:
+            return False
+        changed = session.apply_intake(reloaded[1], reloaded[0], time.time())
+        _REPLANS.inc(trigger=trigger)
+        _REPLAN_SECONDS.observe(time.perf_counter() - started)
+        return changed
+
+    async def events(self, session: LiveSession) -> AsyncIterator[bytes]:
+        key = (session.user_id, session.workout_id)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (loop, queue)
+        session.subscribers.add(subscriber)
+        self.open_streams += 1
+        _STREAMS.set(self.open_streams)
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            await self._refresh(session, "connect")
+            yield _sse("plan", session.snapshot())
+            now = time.time()
+            announced = {a.minute_offset for a in session.remaining if session.due_epoch(a) < now}
+            last_sent = now
+            while True:
+                now = time.time()
+                upcoming = [a for a in session.remaining if a.minute_offset not in announced]
+                wake = last_sent + LIVE_HEARTBEAT_S
+                if upcoming:
+                    wake = min(wake, session.due_epoch(upcoming[0]) - LIVE_SLOT_LEAD_S)
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=max(0.0, wake - now))
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message == "end":
+                    yield _sse("end", {"workout_id": session.workout_id, "reason": "ended"})
+                    return
+                if message == "restart":
+                    session.subscribers.discard(subscriber)
+                    session = self._sessions.get(key, session)
+                    session.subscribers.add(subscriber)
+                    announced = set()
+                    await self._refresh(session, "restart")
+                    yield _sse("plan", session.snapshot())
+                    last_sent = time.time()
+                    continue
+
+                if message in ("intake", "poll"):
+                    if await self._refresh(session, message):
+                        yield _sse("plan", session.snapshot())
+                        last_sent = time.time()
+
+                now = time.time()
+                for action in session.remaining:
+                    if action.minute_offset not in announced and session.due_epoch(action) - LIVE_SLOT_LEAD_S <= now:
+                        announced.add(action.minute_offset)
+                        yield _sse("slot", {"due_at": datetime.fromtimestamp(session.due_epoch(action), timezone.utc).isoformat(), **action.model_dump()})
+                        last_sent = now
+
+                if now >= session.started_epoch + session.duration_s and all(a.minute_offset in announced for a in session.remaining):
+                    yield _sse("end", {"workout_id": session.workout_id, "reason": "finished"})
+                    return
+                if now - last_sent >= LIVE_HEARTBEAT_S:
+                    yield b": keep-alive\n\n"
+                    last_sent = now
+        finally:
+            session.subscribers.discard(subscriber)
+            self.open_streams -= 1
+            _STREAMS.set(self.open_streams)
+            with self._lock:
+                if not session.subscribers and self._sessions.get(key) is session:
+                    del self._sessions[key]
+
+
+live_hub = LiveSessionHub()
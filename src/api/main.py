@@ -1,28 +1,82 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import csv
+import hashlib
+import io
+import json
 import os
 from pathlib import Path
-from typing import Any, Optional
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
 from urllib.parse import quote
 
-from fastapi import Depends, FastAPI, HTTPException, Query, Request
-from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-
-from src.api.auth import AuthRequest, RegisterRequest, login_user, register_user, require_user
-from src.core.engine import predict, simulate
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from src.api.assets import StaticAssets
+from src.api.auth import AuthRequest, RegisterRequest, is_admin, login_user, register_user, require_admin, require_user
+from src.api.batch import BATCH_MAX_REQUESTS, BatchRequest, run_batch
+from src.api.compression import CompressionMiddleware
+from src.api.conditional import conditional, daily_variant, resource_etag
+from src.api.engine_pool import EngineBusy, engine_pool
+from src.api.fastjson import FastJSONResponse, add_body_schemas, body_schema, json_body, splice_raw
+from src.api.instrumentation import RequestMetricsMiddleware, metrics_authorized
+from src.api.live import LIVE_MAX_STREAMS, live_hub
+from src.api.negotiation import ContentNegotiationMiddleware
+from src.api.ratelimit import AdmissionMiddleware, rate_limited
+from src.api.singleflight import coalesced_predict
+from src.core.activity_files import activity_file_format
+from src.core.dedupe import epoch_range
+from src.core.engine import predict
+from src.core.jsonstream import iter_json_array
 from src.core.models import FoodItem, PredictionRequest, SimulationRequest
-from src.integrations.connectors import integration_status, pull_workouts
-from src.integrations.oauth import OAuthError, build_authorize_url, exchange_code, missing_env_for_provider, oauth_ready
+from src.core.streams import MAX_STREAM_SECONDS, STREAM_TYPES, downsample
+from src.integrations.connectors import integration_status
+from src.integrations.jobs import job_runner
+from src.integrations.oauth import (
+    OAuthError,
+    build_authorize_url,
+    exchange_code,
+    missing_env_for_provider,
+    oauth_ready,
+    token_expiry_iso,
+)
 from src.integrations.providers import IntegrationError
-from src.storage.audit import init_db, read_audit, write_audit
+from src.integrations.streams import (
+    compute_workout_metrics,
+    import_strava_streams,
+    ingest_streams,
+    stream_metrics_worker,
+)
+from src.integrations.sync import PROVIDER_SYNC_JOB, WORKOUT_DEDUPE_JOB, provider_sync_job, workout_dedupe_job
+from src.integrations.tokens import token_refresher
+from src.integrations.uploads import activity_file_importer
+from src.integrations.webhooks import strava_webhook_processor
+from src.observability.metrics import render_prometheus
+from src.observability.profiler import ProfilerBusy, collapse, profiles, sample_stacks, trace_call
+from src.storage.audit import init_db, read_audit_rows, write_audit
 from src.storage.auth import init_auth_db
-from src.storage.foods import add_custom_food, delete_custom_food, init_food_db, list_foods, resolve_foods_for_plan
+from src.storage.foods import (
+    add_custom_food,
+    delete_custom_food,
+    import_custom_foods,
+    init_food_db,
+    list_foods,
+    resolve_foods_for_plan,
+)
 from src.storage.integrations import get_token, init_integrations_db, upsert_token
+from src.storage.jobs import enqueue_job, get_job, init_jobs_db, list_jobs
+from src.storage.live import init_live_db
 from src.storage.oauth_state import consume_state, create_state, init_oauth_state_db
 from src.storage.profile import get_profile, init_profile_db, upsert_profile
+from src.storage.streams import init_streams_db, read_stream_window, stream_summary
+from src.storage.tracing import tracer
+from src.storage.versions import FOODS, INTEGRATIONS, PROFILE, WORKOUTS, init_versions_db
+from src.storage.webhooks import enqueue_webhook_event, init_webhooks_db
 from src.storage.workouts import (
     add_workout,
     add_workout_fueling_event,
@@ -37,8 +91,28 @@ from src.storage.workouts import (
 )
 
 app = FastAPI(title="Endurance Fuel AI", version="0.5.0")
+app.add_middleware(ContentNegotiationMiddleware)
+# Middleware added later wraps earlier ones: RequestMetrics is outermost, then Admission, then
+# Compression, which wraps ContentNegotiation and so compresses the negotiated (JSON or binary) body.
+app.add_middleware(CompressionMiddleware)
+# Shed expensive requests before any body is read or decoded.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+_default_openapi = app.openapi
+
+
+def _openapi() -> Dict[str, Any]:
+    return add_body_schemas(_default_openapi())
+
+
+app.openapi = _openapi  # type: ignore[method-assign]
 
 WEB_DIR = Path(__file__).resolve().parent.parent / "web"
+static_assets = StaticAssets(WEB_DIR)
+FOOD_IMPORT_MAX_ERRORS = 100
+FOOD_IMPORT_CHUNK_SIZE = 1000
+WORKOUT_IMPORT_MAX_FILES = int(os.getenv("WORKOUT_IMPORT_MAX_FILES", "500"))
+WORKOUT_IMPORT_MAX_BYTES = int(os.getenv("WORKOUT_IMPORT_MAX_MB", "50")) * 1024 * 1024
 
 
 def _app_base_url(request: Request) -> str:
@@ -145,15 +219,40 @@ class FuelingEventCreate(BaseModel):
     carbs_g: float = Field(default=0, ge=0, le=300)
     fluid_ml: float = Field(default=0, ge=0, le=2000)
     sodium_mg: float = Field(default=0, ge=0, le=6000)
+    caffeine_mg: float = Field(default=0, ge=0, le=500)
     notes: str | None = None
 
 
+class LiveSessionStart(BaseModel):
+    request: PredictionRequest
+    started_at: str | None = None
+
+
 class IntegrationTokenIn(BaseModel):
     access_token: str
     refresh_token: str | None = None
     expires_at: str | None = None
 
 
+class StravaWebhookEvent(BaseModel):
+    object_type: str
+    object_id: int
+    aspect_type: str
+    owner_id: int
+    subscription_id: int | None = None
+    event_time: int | None = None
+    updates: dict = Field(default_factory=dict)
+
+
+class WorkoutStreamsIn(BaseModel):
+    time: List[float] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+    heart_rate: List[float | None] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+    power: List[float | None] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+    cadence: List[float | None] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+    altitude: List[float | None] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+    speed: List[float | None] | None = Field(default=None, max_length=MAX_STREAM_SECONDS)
+
+
 class FoodCreate(BaseModel):
     name: str = Field(min_length=2, max_length=80)
     category: str = Field(min_length=2, max_length=30)
@@ -167,22 +266,100 @@ class FoodCreate(BaseModel):
 @app.on_event("startup")
 def startup() -> None:
     init_db()
+    init_versions_db()
     init_auth_db()
     init_profile_db()
     init_workout_db()
     init_integrations_db()
     init_food_db()
     init_oauth_state_db()
+    init_jobs_db()
+    job_runner.register(PROVIDER_SYNC_JOB, provider_sync_job)
+    job_runner.register(WORKOUT_DEDUPE_JOB, workout_dedupe_job)
+    init_webhooks_db()
+    init_streams_db()
+    init_live_db()
+    static_assets.build()
+    engine_pool.start()
+    job_runner.start()
+    stream_metrics_worker.start()
+    token_refresher.start()
+    strava_webhook_processor.start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    strava_webhook_processor.stop()
+    token_refresher.stop()
+    stream_metrics_worker.shutdown()
+    activity_file_importer.shutdown()
+    engine_pool.shutdown()
+    job_runner.shutdown()
 
 
 @app.get("/", include_in_schema=False)
-def root() -> FileResponse:
-    return FileResponse(WEB_DIR / "index.html")
+def root(request: Request) -> Response:
+    return static_assets.index_response(request)
+
 
+@app.get("/assets/{name}", include_in_schema=False)
+def asset(name: str, request: Request) -> Response:
+    response = static_assets.asset_response(request, name)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return response
 
+
+# Unhashed paths stay available for pages rendered before a deploy.
 app.mount("/static", StaticFiles(directory=WEB_DIR), name="static")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    authorized = metrics_authorized(request)
+    if authorized is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorized:
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/v1/admin/slow-queries")
+def admin_slow_queries(
+    limit: int = Query(default=20, ge=1, le=200),
+    current_user: dict = Depends(require_admin),
+) -> dict:
+    # Per-process: each API worker traces its own statements.
+    return {
+        "threshold_ms": tracer.threshold_s * 1000,
+        "slowest": tracer.slowest(limit),
+        "top_fingerprints": tracer.top_fingerprints(limit),
+    }
+
+
+@app.post("/api/v1/admin/profile", response_class=PlainTextResponse)
+async def admin_profile(
+    seconds: float = Query(default=10, gt=0, le=60),
+    interval_ms: float = Query(default=10, ge=1, le=1000),
+    idle: bool = Query(default=False),
+    current_user: dict = Depends(require_admin),
+) -> PlainTextResponse:
+    # Samples this worker only; with several API workers, repeat the call until each has answered.
+    try:
+        stacks = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000.0, idle)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return PlainTextResponse(collapse(stacks))
+
+
+@app.get("/api/v1/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def admin_request_profile(profile_id: str, current_user: dict = Depends(require_admin)) -> PlainTextResponse:
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["collapsed"])
+
+
 @app.get("/api/v1/health")
 def health() -> dict:
     return {"ok": True, "service": "endurance-fuel-ai", "version": "0.5.0"}
@@ -237,8 +414,18 @@ def me(current_user: dict = Depends(require_user)) -> dict:
     return {"user": current_user, "profile": get_profile(current_user["id"])}
 
 
+@app.post("/api/v1/batch")
+async def batch(payload: BatchRequest, request: Request, current_user: dict = Depends(require_user)) -> dict:
+    if len(payload.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_REQUESTS} sub-requests per batch")
+    return await run_batch(request.app, request.scope, payload.requests, current_user)
+
+
 @app.get("/api/v1/profile")
-def profile_get(current_user: dict = Depends(require_user)) -> dict:
+def profile_get(request: Request, response: Response, current_user: dict = Depends(require_user)) -> Any:
+    cached = conditional(request, response, resource_etag(current_user["id"], (PROFILE,)))
+    if cached is not None:
+        return cached
     return {"profile": get_profile(current_user["id"])}
 
 
@@ -253,9 +440,14 @@ def profile_put(payload: ProfileUpdate, current_user: dict = Depends(require_use
 
 @app.get("/api/v1/foods")
 def foods_get(
+    request: Request,
+    response: Response,
     scope: str = Query(default="all", pattern="^(all|builtin|custom)$"),
     current_user: dict = Depends(require_user),
-) -> dict:
+) -> Any:
+    cached = conditional(request, response, resource_etag(current_user["id"], (FOODS,), scope))
+    if cached is not None:
+        return cached
     return {"items": list_foods(current_user["id"], scope=scope)}
 
 
@@ -264,6 +456,75 @@ def foods_create(payload: FoodCreate, current_user: dict = Depends(require_user)
     return {"item": add_custom_food(current_user["id"], payload.model_dump())}
 
 
+def _food_import_rows(upload: UploadFile) -> Iterator[Any]:
+    filename = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if filename.endswith(".csv") or "csv" in content_type:
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            for row in csv.DictReader(text):
+                yield {k.strip(): v.strip() for k, v in row.items() if k and isinstance(v, str) and v.strip()}
+        finally:
+            text.detach()
+    elif filename.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type:
+        for line in upload.file:
+            if line.strip():
+                yield json.loads(line)
+    elif filename.endswith(".json") or "json" in content_type:
+        yield from iter_json_array(iter(lambda: upload.file.read(64 * 1024), b""))
+    else:
+        raise HTTPException(status_code=415, detail="Upload a .csv, .json or .jsonl file")
+
+
+@app.post("/api/v1/foods/import")
+def foods_import(file: UploadFile = File(...), current_user: dict = Depends(require_user)) -> dict:
+    started = time.perf_counter()
+    counts = {"received": 0, "invalid": 0}
+    errors: List[Dict[str, Any]] = []
+    aborted: str | None = None
+
+    def valid_rows() -> Iterator[Dict[str, Any]]:
+        nonlocal aborted
+        rows = _food_import_rows(file)
+        while True:
+            try:
+                raw = next(rows)
+            except StopIteration:
+                return
+            except (ValueError, csv.Error) as exc:
+                aborted = f"Row {counts['received'] + 1}: {exc}"
+                return
+            counts["received"] += 1
+            try:
+                yield FoodCreate.model_validate(raw).model_dump()
+            except ValidationError as exc:
+                counts["invalid"] += 1
+                if len(errors) < FOOD_IMPORT_MAX_ERRORS:
+                    errors.append(
+                        {
+                            "row": counts["received"],
+                            "errors": [
+                                {"field": ".".join(str(p) for p in e["loc"]) or "row", "message": e["msg"]}
+                                for e in exc.errors()
+                            ],
+                        }
+                    )
+
+    stats = import_custom_foods(current_user["id"], valid_rows(), chunk_size=FOOD_IMPORT_CHUNK_SIZE)
+    elapsed = time.perf_counter() - started
+    return {
+        "received": counts["received"],
+        "inserted": stats["inserted"],
+        "duplicates": stats["duplicates"],
+        "invalid": counts["invalid"],
+        "errors": errors,
+        "errors_truncated": counts["invalid"] > len(errors),
+        "aborted": aborted,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_sec": round(counts["received"] / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
 @app.delete("/api/v1/foods/{food_id}")
 def foods_delete(food_id: int, current_user: dict = Depends(require_user)) -> dict:
     deleted = delete_custom_food(current_user["id"], food_id)
@@ -273,7 +534,10 @@ def foods_delete(food_id: int, current_user: dict = Depends(require_user)) -> di
 
 
 @app.get("/api/v1/integrations")
-def integrations(current_user: dict = Depends(require_user)) -> dict:
+def integrations(request: Request, response: Response, current_user: dict = Depends(require_user)) -> Any:
+    cached = conditional(request, response, resource_etag(current_user["id"], (INTEGRATIONS,)))
+    if cached is not None:
+        return cached
     return {"items": integration_status(current_user["id"]), "user": current_user["email"]}
 
 
@@ -344,26 +608,15 @@ def integration_oauth_callback(
         return RedirectResponse(url=_oauth_result_redirect(provider, "error", "missing_access_token", client), status_code=302)
 
     refresh_token = token_payload.get("refresh_token")
-    raw_exp = token_payload.get("expires_at") or token_payload.get("expires_in")
-    expires_at: str | None = None
-    if isinstance(raw_exp, (int, float)):
-        # Strava returns epoch seconds as `expires_at`, other providers may return `expires_in`.
-        if raw_exp > 2_000_000_000:
-            dt = datetime.fromtimestamp(raw_exp / 1000, tz=timezone.utc)
-        elif raw_exp > 100_000_000:
-            dt = datetime.fromtimestamp(raw_exp, tz=timezone.utc)
-        else:
-            dt = datetime.now(timezone.utc)
-        expires_at = dt.isoformat()
-    elif isinstance(raw_exp, str) and raw_exp:
-        expires_at = raw_exp
-
+    athlete = token_payload.get("athlete")
+    athlete_id = athlete.get("id") if isinstance(athlete, dict) else None
     upsert_token(
         user_id=user_id,
         provider=provider,
         access_token=access_token,
         refresh_token=str(refresh_token) if refresh_token else None,
-        expires_at=expires_at,
+        expires_at=token_expiry_iso(token_payload),
+        external_user_id=str(athlete_id) if athlete_id is not None else None,
     )
     return RedirectResponse(url=_oauth_result_redirect(provider, "connected", client=client), status_code=302)
 
@@ -436,31 +689,123 @@ def set_integration_token(
     return {"ok": True, "provider": provider}
 
 
-@app.post("/api/v1/integrations/{provider}/sync")
+@app.post("/api/v1/integrations/{provider}/sync", status_code=202)
 def sync_provider_workouts(
     provider: str,
     kind: str = Query(default="completed", pattern="^(planned|completed)$"),
-    limit: int = Query(default=50, ge=1, le=200),
-    current_user: dict = Depends(require_user),
+    full: bool = Query(default=False),
+    current_user: dict = Depends(rate_limited("sync")),
 ) -> dict:
-    token = get_token(current_user["id"], provider)
-    if token is None:
+    if provider not in {"strava", "garmin_connect"}:
+        raise HTTPException(status_code=404, detail="Unsupported provider")
+    if get_token(current_user["id"], provider) is None:
         raise HTTPException(status_code=400, detail=f"{provider} is not connected")
 
-    try:
-        pulled = pull_workouts(provider=provider, access_token=token["access_token"], kind=kind)[:limit]
-    except IntegrationError as exc:
-        raise HTTPException(status_code=400, detail=f"Integration sync failed: {exc}") from exc
-    created = []
-    for item in pulled:
-        item["status"] = kind
-        created.append(add_workout(current_user["id"], item))
-    return {"synced": len(created), "items": created}
+    job, created = enqueue_job(current_user["id"], PROVIDER_SYNC_JOB, provider, kind, params={"full": full})
+    if created:
+        job_runner.submit(job["id"])
+    return {"job": job, "coalesced": not created}
+
+
+@app.get("/api/v1/integrations/strava/webhook")
+def strava_webhook_verify(request: Request) -> dict:
+    params = request.query_params
+    verify_token = os.getenv("STRAVA_WEBHOOK_VERIFY_TOKEN", "").strip()
+    if not verify_token or params.get("hub.mode") != "subscribe" or params.get("hub.verify_token") != verify_token:
+        raise HTTPException(status_code=403, detail="Invalid webhook verification")
+    return {"hub.challenge": params.get("hub.challenge", "")}
+
+
+@app.post("/api/v1/integrations/strava/webhook")
+def strava_webhook_event(event: StravaWebhookEvent) -> dict:
+    # Strava expects a 200 within two seconds, so events are only persisted here and applied
+    # in batches by the webhook processor.
+    # The callback is public: without a configured subscription id there is nothing to check
+    # events against, so none are accepted.
+    expected = os.getenv("STRAVA_WEBHOOK_SUBSCRIPTION_ID", "").strip()
+    if not expected or str(event.subscription_id) != expected:
+        raise HTTPException(status_code=403, detail="Unknown subscription")
+    event_id = enqueue_webhook_event("strava", event.model_dump())
+    return {"ok": True, "event_id": event_id}
+
+
+@app.get("/api/v1/integrations/sync/jobs")
+def sync_jobs_get(
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: dict = Depends(require_user),
+) -> dict:
+    return {"items": list_jobs(current_user["id"], limit=limit)}
+
 
+@app.get("/api/v1/integrations/sync/jobs/{job_id}")
+def sync_job_get(job_id: int, current_user: dict = Depends(require_user)) -> dict:
+    job = get_job(current_user["id"], job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job": job}
 
-@app.post("/api/v1/workouts")
-def workout_create(payload: WorkoutCreate, current_user: dict = Depends(require_user)) -> dict:
-    return {"item": add_workout(current_user["id"], payload.model_dump())}
+
+@app.post("/api/v1/workouts", response_class=FastJSONResponse, openapi_extra=body_schema(WorkoutCreate))
+def workout_create(
+    payload: WorkoutCreate = Depends(json_body(WorkoutCreate)),
+    current_user: dict = Depends(require_user),
+) -> FastJSONResponse:
+    return FastJSONResponse({"item": add_workout(current_user["id"], payload.model_dump())})
+
+
+@app.post("/api/v1/workouts/import")
+def workouts_import(
+    files: List[UploadFile] = File(...),
+    sport: str = Query(default="cycling", pattern="^(running|cycling|swimming|hiking|trail_running)$"),
+    current_user: dict = Depends(require_user),
+) -> dict:
+    # `sport` is only a fallback for files that do not declare one.
+    if len(files) > WORKOUT_IMPORT_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Upload at most {WORKOUT_IMPORT_MAX_FILES} files per request")
+    started = time.perf_counter()
+    rejected: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="workout-import-") as tmp:
+        spooled = []
+        for idx, upload in enumerate(files):
+            filename = upload.filename or f"upload-{idx}"
+            if activity_file_format(filename) is None:
+                rejected.append({"filename": filename, "status": "failed", "error": "Unsupported file type"})
+                continue
+            # Copy to a real file in chunks (worker processes open it by path) and hash on the way.
+            digest = hashlib.sha256()
+            path = os.path.join(tmp, f"{idx}-{os.path.basename(filename)}")
+            size = 0
+            with open(path, "wb") as out:
+                for chunk in iter(lambda: upload.file.read(256 * 1024), b""):
+                    size += len(chunk)
+                    if size > WORKOUT_IMPORT_MAX_BYTES:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+            if size > WORKOUT_IMPORT_MAX_BYTES:
+                rejected.append({"filename": filename, "status": "failed", "error": "File too large"})
+                continue
+            spooled.append((path, filename, digest.hexdigest()[:32]))
+        results = activity_file_importer.import_files(current_user["id"], spooled, default_sport=sport)
+    results.extend(rejected)
+    elapsed = time.perf_counter() - started
+    return {
+        "received": len(files),
+        "imported": sum(1 for r in results if r["status"] == "imported"),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "items": results,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+
+@app.post("/api/v1/workouts/dedupe", status_code=202)
+def workouts_dedupe(current_user: dict = Depends(require_user)) -> dict:
+    # Backfill for history ingested before overlap detection; new workouts are checked on insert.
+    job, created = enqueue_job(current_user["id"], WORKOUT_DEDUPE_JOB, "workouts", "completed")
+    if created:
+        job_runner.submit(job["id"])
+    return {"job": job, "coalesced": not created}
 
 
 @app.get("/api/v1/workouts/{workout_id}")
@@ -483,6 +828,75 @@ def workout_put(workout_id: int, payload: WorkoutUpdate, current_user: dict = De
     return {"item": item}
 
 
+@app.put("/api/v1/workouts/{workout_id}/streams")
+def workout_streams_put(
+    workout_id: int,
+    payload: WorkoutStreamsIn,
+    current_user: dict = Depends(require_user),
+) -> dict:
+    if get_workout(current_user["id"], workout_id) is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    try:
+        counts = ingest_streams(current_user["id"], workout_id, payload.model_dump(exclude_none=True))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {"stored": counts, "available": stream_summary(current_user["id"], workout_id)}
+
+
+@app.post("/api/v1/workouts/{workout_id}/streams/import")
+def workout_streams_import(workout_id: int, current_user: dict = Depends(require_user)) -> dict:
+    workout = get_workout(current_user["id"], workout_id)
+    if workout is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    if workout.get("source") != "strava" or not workout.get("external_id"):
+        raise HTTPException(status_code=400, detail="Workout is not linked to a Strava activity")
+    if get_token(current_user["id"], "strava") is None:
+        raise HTTPException(status_code=400, detail="strava is not connected")
+    try:
+        counts = import_strava_streams(current_user["id"], workout)
+    except IntegrationError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    return {"stored": counts, "available": stream_summary(current_user["id"], workout_id)}
+
+
+@app.get("/api/v1/workouts/{workout_id}/streams")
+def workout_streams_get(
+    workout_id: int,
+    types: Optional[str] = None,
+    start: int = Query(default=0, ge=0),
+    end: Optional[int] = Query(default=None, ge=1),
+    points: int = Query(default=1000, ge=0, le=20000),
+    current_user: dict = Depends(require_user),
+) -> dict:
+    if get_workout(current_user["id"], workout_id) is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    requested = [t.strip() for t in types.split(",") if t.strip()] if types else list(STREAM_TYPES)
+    unknown = sorted(set(requested) - set(STREAM_TYPES))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown stream types: {', '.join(unknown)}")
+    if end is not None and end <= start:
+        raise HTTPException(status_code=422, detail="end must be greater than start")
+    window = read_stream_window(current_user["id"], workout_id, requested, start=start, end=end)
+    length = max((len(v) for v in window.values()), default=0)
+    return {
+        "start": start,
+        "end": start + length,
+        "sample_rate_hz": 1,
+        "points": min(length, points) if points else length,
+        "available": stream_summary(current_user["id"], workout_id),
+        "streams": {k: downsample(v, points) for k, v in window.items()},
+    }
+
+
+@app.post("/api/v1/workouts/{workout_id}/metrics")
+def workout_metrics_recompute(workout_id: int, current_user: dict = Depends(require_user)) -> dict:
+    # Synchronous recompute, e.g. after an FTP or threshold change in the profile.
+    metrics = compute_workout_metrics(current_user["id"], workout_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return {"metrics": metrics, "item": get_workout(current_user["id"], workout_id)}
+
+
 @app.get("/api/v1/workouts/{workout_id}/fueling")
 def workout_fueling_get(workout_id: int, current_user: dict = Depends(require_user)) -> dict:
     if get_workout(current_user["id"], workout_id) is None:
@@ -499,6 +913,7 @@ def workout_fueling_add(
     item = add_workout_fueling_event(current_user["id"], workout_id, payload.model_dump())
     if item is None:
         raise HTTPException(status_code=404, detail="Workout not found")
+    live_hub.notify_intake(current_user["id"], workout_id)
     return {"item": item}
 
 
@@ -507,76 +922,179 @@ def workout_fueling_delete(workout_id: int, event_id: int, current_user: dict =
     deleted = delete_workout_fueling_event(current_user["id"], workout_id, event_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Fueling event not found")
+    live_hub.notify_intake(current_user["id"], workout_id)
+    return {"ok": True}
+
+
+@app.post("/api/v1/workouts/{workout_id}/live", response_class=FastJSONResponse, openapi_extra=body_schema(LiveSessionStart))
+def workout_live_start(
+    workout_id: int,
+    payload: LiveSessionStart = Depends(json_body(LiveSessionStart)),
+    current_user: dict = Depends(require_user),
+) -> FastJSONResponse:
+    if get_workout(current_user["id"], workout_id) is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    started_epoch: Optional[float] = time.time()
+    if payload.started_at:
+        started_epoch = epoch_range(payload.started_at, 0)[0]
+        if started_epoch is None:
+            raise HTTPException(status_code=422, detail="started_at must be an ISO 8601 timestamp")
+    foods = [FoodItem(**f) for f in resolve_foods_for_plan(current_user["id"], payload.request.selected_food_ids)]
+    session = live_hub.start(current_user["id"], workout_id, payload.request, foods, started_epoch)
+    return FastJSONResponse({"session": session.snapshot()})
+
+
+@app.get("/api/v1/workouts/{workout_id}/live")
+async def workout_live_stream(workout_id: int, current_user: dict = Depends(require_user)) -> StreamingResponse:
+    # Server-sent events: "plan" on connect and after every re-plan, "slot" LIVE_SLOT_LEAD_S
+    # before each remaining slot is due, and "end" when the session finishes or is stopped.
+    if live_hub.open_streams >= LIVE_MAX_STREAMS:
+        raise HTTPException(status_code=503, detail="Too many live sessions on this worker", headers={"Retry-After": "5"})
+    session = await live_hub.open(current_user["id"], workout_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Live session not found")
+    return StreamingResponse(
+        live_hub.events(session),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.delete("/api/v1/workouts/{workout_id}/live")
+def workout_live_stop(workout_id: int, current_user: dict = Depends(require_user)) -> dict:
+    if not live_hub.end(current_user["id"], workout_id):
+        raise HTTPException(status_code=404, detail="Live session not found")
     return {"ok": True}
 
 
-@app.get("/api/v1/workouts")
+@app.get("/api/v1/workouts", response_class=FastJSONResponse)
 def workouts_get(
+    request: Request,
+    response: Response,
     limit: int = Query(default=100, ge=1, le=500),
     status: Optional[str] = Query(default=None, pattern="^(planned|completed)$"),
     source: Optional[str] = None,
+    include_duplicates: bool = Query(default=False),
     current_user: dict = Depends(require_user),
-) -> dict:
-    return {"items": list_workouts(current_user["id"], limit=limit, status=status, source=source)}
+) -> Any:
+    etag = resource_etag(current_user["id"], (WORKOUTS,), limit, status, source, include_duplicates)
+    cached = conditional(request, response, etag)
+    if cached is not None:
+        return cached
+    items = list_workouts(
+        current_user["id"],
+        limit=limit,
+        status=status,
+        source=source,
+        include_duplicates=include_duplicates,
+    )
+    return FastJSONResponse({"items": items}, headers=dict(response.headers))
 
 
 @app.get("/api/v1/analytics/summary")
 def analytics_summary_get(
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=7, le=365),
     current_user: dict = Depends(require_user),
-) -> dict:
+) -> Any:
+    cached = conditional(request, response, resource_etag(current_user["id"], (WORKOUTS,), days, daily_variant()))
+    if cached is not None:
+        return cached
     return {"summary": analytics_summary(current_user["id"], days=days)}
 
 
 @app.get("/api/v1/analytics/charts")
 def analytics_charts_get(
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=7, le=365),
     current_user: dict = Depends(require_user),
-) -> dict:
+) -> Any:
+    cached = conditional(request, response, resource_etag(current_user["id"], (WORKOUTS,), days, daily_variant()))
+    if cached is not None:
+        return cached
     return {"charts": analytics_chart_series(current_user["id"], days=days)}
 
 
-@app.post("/api/v1/predict")
-def predict_endpoint(req: PredictionRequest, current_user: dict = Depends(require_user)) -> dict:
-    foods_raw = resolve_foods_for_plan(current_user["id"], req.selected_food_ids)
-    foods = [FoodItem(**f) for f in foods_raw]
-    res = predict(req, foods=foods)
-    write_audit(
+async def _evaluate(run: Any) -> Any:
+    try:
+        return await run
+    except EngineBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+
+def _resolve_and_predict(user_id: int, req: PredictionRequest) -> Any:
+    # Profiled predicts run in one thread, outside coalescing and the process pool, so the profile
+    # covers food resolution and the engine as this user's data drives them.
+    foods = [FoodItem(**f) for f in resolve_foods_for_plan(user_id, req.selected_food_ids)]
+    return predict(req, foods=foods)
+
+
+@app.post("/api/v1/predict", response_class=FastJSONResponse, openapi_extra=body_schema(PredictionRequest))
+async def predict_endpoint(
+    request: Request,
+    req: PredictionRequest = Depends(json_body(PredictionRequest)),
+    current_user: dict = Depends(rate_limited("predict")),
+) -> FastJSONResponse:
+    headers = None
+    if request.headers.get("x-profile"):
+        if not is_admin(current_user):
+            raise HTTPException(status_code=403, detail="X-Profile requires admin access")
+        res, stacks = await run_in_threadpool(trace_call, _resolve_and_predict, current_user["id"], req)
+        headers = {"X-Profile-Id": profiles.add("predict", current_user["id"], stacks)}
+    else:
+        # Async path: SQLite calls go to the threadpool, the engine to the process pool, and the
+        # event loop only validates and encodes.
+        foods_raw = await run_in_threadpool(resolve_foods_for_plan, current_user["id"], req.selected_food_ids)
+        foods = [FoodItem(**f) for f in foods_raw]
+        res = await _evaluate(coalesced_predict(req, foods, engine_pool.predict))
+    await run_in_threadpool(
+        write_audit,
         recommendation_id=res.recommendation_id,
         user_id=current_user["id"],
         user_email=current_user["email"],
         payload={
             "user_id": current_user["id"],
             "user_email": current_user["email"],
-            "request": req.model_dump(),
-            "response": res.model_dump(),
+            "request": req,
+            "response": res,
         },
     )
-    return res.model_dump()
+    return FastJSONResponse(res, headers=headers)
 
 
-@app.post("/api/v1/simulate")
-def simulate_endpoint(req: SimulationRequest, current_user: dict = Depends(require_user)) -> dict:
-    foods_raw = resolve_foods_for_plan(current_user["id"], req.base_request.selected_food_ids)
+@app.post("/api/v1/simulate", response_class=FastJSONResponse, openapi_extra=body_schema(SimulationRequest))
+async def simulate_endpoint(
+    req: SimulationRequest = Depends(json_body(SimulationRequest)),
+    current_user: dict = Depends(rate_limited("simulate")),
+) -> FastJSONResponse:
+    foods_raw = await run_in_threadpool(resolve_foods_for_plan, current_user["id"], req.base_request.selected_food_ids)
     foods = [FoodItem(**f) for f in foods_raw]
-    res = simulate(req, foods=foods)
-    write_audit(
+    res = await _evaluate(engine_pool.simulate(req, foods))
+    await run_in_threadpool(
+        write_audit,
         recommendation_id=res.simulated.recommendation_id,
         user_id=current_user["id"],
         user_email=current_user["email"],
         payload={
             "user_id": current_user["id"],
             "user_email": current_user["email"],
-            "simulation_request": req.model_dump(),
-            "simulation_response": res.model_dump(),
+            "simulation_request": req,
+            "simulation_response": res,
         },
     )
-    return res.model_dump()
+    return FastJSONResponse(res)
 
 
-@app.get("/api/v1/audit")
+@app.get("/api/v1/audit", response_class=FastJSONResponse)
 def audit(
     limit: int = Query(default=20, ge=1, le=200),
     current_user: dict = Depends(require_user),
-) -> dict:
-    return {"items": read_audit(user_id=current_user["id"], limit=limit), "user": current_user["email"]}
+) -> FastJSONResponse:
+    # Stored payloads are already JSON; they are spliced in rather than decoded and re-encoded.
+    items = []
+    for row in read_audit_rows(current_user["id"], limit):
+        payload_json = row.pop("payload_json")
+        items.append(splice_raw(row, "payload", payload_json))
+    return FastJSONResponse(splice_raw({"user": current_user["email"]}, "items", b"[" + b",".join(items) + b"]"))
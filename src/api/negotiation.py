@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic_core import from_json, to_json, to_jsonable_python
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import msgpack
+except ImportError:  # binary bodies are simply not offered without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+_CODECS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {}
+if msgpack is not None:
+    _CODECS[MSGPACK] = (lambda obj: msgpack.packb(obj, use_bin_type=True), lambda raw: msgpack.unpackb(raw, raw=False))
+if cbor2 is not None:
+    _CODECS[CBOR] = (cbor2.dumps, cbor2.loads)
+
+# Media type the current request negotiated; FastJSONResponse reads it to encode straight to the
+# binary format instead of going through JSON and being transcoded here.
+_response_media: ContextVar[str] = ContextVar("response_media", default=JSON)
+
+
+def binary_media_types() -> List[str]:
+    return list(_CODECS)
+
+
+def response_media() -> str:
+    return _response_media.get()
+
+
+def encode(media: str, content: Any) -> bytes:
+    return _CODECS[media][0](to_jsonable_python(content, inf_nan_mode="null"))
+
+
+def _canonical(media: str) -> str:
+    base = media.split(";", 1)[0].strip().lower()
+    return _ALIASES.get(base, base)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    # Highest q wins; JSON wins ties and anything unparseable, so existing clients never change.
+    best, best_q = JSON, -1.0
+    for part in (accept or "").split(","):
+        media = _canonical(part)
+        if media not in _CODECS and media != JSON:
+            continue
+        q = 1.0
+        for param in part.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q or (q == best_q and media == JSON):
+            best, best_q = media, q
+    return best if best_q > 0 else JSON
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send_error(send: Send, status: int, detail: str) -> None:
+    body = to_json({"detail": detail})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", JSON.encode()), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class ContentNegotiationMiddleware:
+    # MessagePack/CBOR request bodies are turned into JSON before routing, so handlers and their
+    # validation stay format-agnostic; JSON responses are transcoded when the client asked for a
+    # binary format and the route did not already encode one.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_media = _canonical(headers.get("content-type", ""))
+        if request_media in (MSGPACK, CBOR):
+            if request_media not in _CODECS:
+                await _send_error(send, 415, f"{request_media} bodies are not supported by this server")
+                return
+            try:
+                body = to_json(_CODECS[request_media][1](await _read_body(receive)))
+            except Exception:
+                await _send_error(send, 400, f"Malformed {request_media} body")
+                return
+            rewritten = MutableHeaders(scope=scope)
+            rewritten["content-type"] = JSON
+            rewritten["content-length"] = str(len(body))
+            receive = _replay(body)
+
+        media = negotiate(headers.get("accept"))
+        token = _response_media.set(media)
+        try:
+            await self.app(scope, receive, _negotiated_send(send, media))
+        finally:
+            _response_media.reset(token)
+
+
+def _replay(body: bytes) -> Receive:
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+def _negotiated_send(send: Send, media: str) -> Send:
+    start: Optional[Message] = None
+    chunks: List[bytes] = []
+
+    async def wrapped(message: Message) -> None:
+        nonlocal start
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            headers.add_vary_header("Accept")
+            if media != JSON and _canonical(headers.get("content-type", "")) == JSON:
+                start = message
+                return
+            await send(message)
+            return
+        if start is None or message["type"] != "http.response.body":
+            await send(message)
+            return
+        chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        raw = b"".join(chunks)
+        headers = MutableHeaders(scope=start)
+        if raw:
+            raw = _CODECS[media][0](from_json(raw))
+            headers["content-type"] = media
+        headers["content-length"] = str(len(raw))
+        await send(start)
+        await send({"type": "http.response.body", "body": raw})
+
+    return wrapped
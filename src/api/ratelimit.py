@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.auth import require_user
+from src.observability.metrics import counter, gauge
+
+# Expensive routes, matched on POST. Each has its own per-user budget and shares the admission
+# controller with the others.
+EXPENSIVE_ROUTES: Dict[str, re.Pattern] = {
+    "predict": re.compile(r"^/api/v1/predict/?$"),
+    "simulate": re.compile(r"^/api/v1/simulate/?$"),
+    "sync": re.compile(r"^/api/v1/integrations/[^/]+/sync/?$"),
+}
+DEFAULT_BUDGETS = {"predict": "30/60", "simulate": "30/60", "sync": "6/60"}
+
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "32"))
+ADMISSION_MAX_LATENCY_MS = float(os.getenv("ADMISSION_MAX_LATENCY_MS", "2000"))
+ADMISSION_WINDOW_S = float(os.getenv("ADMISSION_WINDOW_S", "5"))
+ADMISSION_RETRY_AFTER_S = int(os.getenv("ADMISSION_RETRY_AFTER_S", "2"))
+
+_DECISIONS = counter("ratelimit_requests_total", "Expensive-route requests by per-user limiter outcome", ("route", "outcome"))
+_BUCKETS = gauge("ratelimit_buckets", "Per-user buckets tracked in this process", ("route",))
+_EXHAUSTED = gauge("ratelimit_exhausted_buckets", "Per-user buckets with no whole token left", ("route",))
+_INFLIGHT = gauge("admission_inflight", "Expensive-route requests currently running in this process")
+_LATENCY = gauge("admission_window_latency_seconds", "Mean expensive-route latency over the admission window")
+_SHED = counter("admission_shed_total", "Expensive-route requests refused by admission control", ("route", "reason"))
+
+
+def parse_budget(raw: str) -> Optional[Tuple[float, float]]:
+    # "<requests>/<seconds>": a bucket of that many tokens refilled over that many seconds.
+    # "0" (or an empty value) disables the limit for the route.
+    count, _, period = raw.strip().partition("/")
+    if not count or float(count) <= 0:
+        return None
+    return float(count), float(period or 60)
+
+
+class UserRateLimiter:
+    # In-process token buckets keyed by user, one limiter per route. Each API process enforces its
+    # own budget, so the effective limit scales with the worker count.
+    def __init__(self, route: str, capacity: float, period_s: float) -> None:
+        self.route = route
+        self.capacity = capacity
+        self.rate = capacity / period_s
+        self._buckets: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._swept = 0.0
+
+    def take(self, user_id: int) -> float:
+        # Returns 0 when the request may proceed, otherwise the seconds until a token is available.
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(user_id, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            self._buckets[user_id] = (tokens - 1 if wait == 0 else tokens, now)
+            if now - self._swept >= 1.0:
+                self._sweep(now)
+        _DECISIONS.inc(route=self.route, outcome="allowed" if wait == 0 else "limited")
+        return wait
+
+    def _sweep(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping.
+        exhausted = 0
+        for user_id, (tokens, updated) in list(self._buckets.items()):
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= self.capacity:
+                del self._buckets[user_id]
+            elif tokens < 1:
+                exhausted += 1
+        self._swept = now
+        _BUCKETS.set(len(self._buckets), route=self.route)
+        _EXHAUSTED.set(exhausted, route=self.route)
+
+
+_limiters: Dict[str, Optional[UserRateLimiter]] = {}
+for _route, _default in DEFAULT_BUDGETS.items():
+    _budget = parse_budget(os.getenv(f"RATE_LIMIT_{_route.upper()}", _default))
+    _limiters[_route] = UserRateLimiter(_route, *_budget) if _budget else None
+
+
+def rate_limited(route: str) -> Callable[..., dict]:
+    # Drop-in replacement for Depends(require_user) on an expensive route.
+    limiter = _limiters[route]
+
+    def dependency(current_user: dict = Depends(require_user)) -> dict:
+        if limiter is not None:
+            wait = limiter.take(int(current_user["id"]))
+            if wait > 0:
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Too many {route} requests; retry in {math.ceil(wait)}s",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+        return current_user
+
+    return dependency
+
+
+class AdmissionController:
+    def __init__(self, max_inflight: int, max_latency_s: float, window_s: float) -> None:
+        self.max_inflight = max_inflight
+        self.max_latency_s = max_latency_s
+        self.window_s = window_s
+        self.inflight = 0
+        self._latencies: Deque[Tuple[float, float]] = deque()
+        self._lock = threading.Lock()
+
+    def _window_mean(self, now: float) -> float:
+        while self._latencies and self._latencies[0][0] < now - self.window_s:
+            self._latencies.popleft()
+        if not self._latencies:
+            return 0.0
+        return sum(latency for _, latency in self._latencies) / len(self._latencies)
+
+    def admit(self) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            if self.max_inflight > 0 and self.inflight >= self.max_inflight:
+                return "inflight"
+            # Samples age out of the window, so shedding stops by itself once the slow requests
+            # that triggered it are older than ADMISSION_WINDOW_S.
+            if self.max_latency_s > 0 and self._window_mean(now) > self.max_latency_s:
+                return "latency"
+            self.inflight += 1
+            _INFLIGHT.set(self.inflight)
+        return None
+
+    def release(self, latency_s: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.inflight -= 1
+            self._latencies.append((now, latency_s))
+            _INFLIGHT.set(self.inflight)
+            _LATENCY.set(self._window_mean(now))
+
+
+admission = AdmissionController(ADMISSION_MAX_INFLIGHT, ADMISSION_MAX_LATENCY_MS / 1000.0, ADMISSION_WINDOW_S)
+
+
+def expensive_route(scope: Scope) -> Optional[str]:
+    if scope["type"] != "http" or scope["method"] != "POST":
+        return None
+    path = scope["path"]
+    return next((name for name, pattern in EXPENSIVE_ROUTES.items() if pattern.match(path)), None)
+
+
+class AdmissionMiddleware:
+    # Global load shedding for the expensive routes: once too many are running in this process, or
+    # they have recently been slow, new ones get 503 + Retry-After before any work is done.
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = expensive_route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        reason = self.controller.admit()
+        if reason is not None:
+            _SHED.inc(route=route, reason=reason)
+            await _overloaded(send)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.monotonic() - started)
+
+
+async def _overloaded(send: Send) -> None:
+    body = json.dumps({"detail": "Server is busy; retry shortly"}).encode("utf-8")
+    start: Message = {
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(ADMISSION_RETRY_AFTER_S).encode("latin-1")),
+        ],
+    }
+    await send(start)
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Tuple, TypeVar
+
+from pydantic_core import to_json
+
+from src.core.models import FoodItem, PredictionRequest, PredictionResponse
+from src.observability.metrics import counter, gauge, histogram
+
+T = TypeVar("T")
+
+_CALLS = counter("predict_coalesce_calls_total", "Prediction calls by single-flight role", ("role",))
+_INFLIGHT = gauge("predict_coalesce_inflight", "Distinct prediction evaluations currently running")
+_FLIGHT_CALLERS = histogram(
+    "predict_coalesce_callers",
+    "Callers served by one prediction evaluation",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+class AsyncSingleFlight(Generic[T]):
+    # Concurrent calls with the same key share the first caller's evaluation. Nothing is kept once
+    # the flight lands, so this never serves a stale result; it only collapses simultaneous work.
+    # The evaluation runs as its own task, so a caller that disconnects does not cancel the result
+    # the others are waiting for.
+    def __init__(self) -> None:
+        self._flights: Dict[str, Tuple["asyncio.Task[T]", List[int]]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight[1][0] += 1
+            _CALLS.inc(role="follower")
+            return await asyncio.shield(flight[0]), True
+
+        _CALLS.inc(role="leader")
+        task = asyncio.ensure_future(fn())
+        callers = [1]
+        self._flights[key] = (task, callers)
+        _INFLIGHT.set(len(self._flights))
+
+        def _landed(_: "asyncio.Task[T]") -> None:
+            self._flights.pop(key, None)
+            _INFLIGHT.set(len(self._flights))
+            _FLIGHT_CALLERS.observe(callers[0])
+
+        task.add_done_callback(_landed)
+        return await asyncio.shield(task), False
+
+
+def prediction_key(req: PredictionRequest, foods: List[FoodItem]) -> str:
+    # The resolved food rows stand in for the food-set version: two athletes selecting the same
+    # built-in foods share a flight, and an edited custom food changes the key.
+    canonical: Dict[str, Any] = req.model_dump(mode="json")
+    canonical["selected_food_ids"] = sorted(req.selected_food_ids or [])
+    payload = to_json({"request": canonical, "foods": foods})
+    return hashlib.sha256(payload).hexdigest()
+
+
+_predictions: AsyncSingleFlight[PredictionResponse] = AsyncSingleFlight()
+
+
+def _own(res: PredictionResponse, shared: bool) -> PredictionResponse:
+    # Every caller gets its own recommendation (and audit row); the engine output is shared.
+    return res.model_copy(update={"recommendation_id": str(uuid.uuid4())}) if shared else res
+
+
+async def coalesced_predict(
+    req: PredictionRequest,
+    foods: List[FoodItem],
+    evaluate: Callable[[PredictionRequest, List[FoodItem]], Awaitable[PredictionResponse]],
+) -> PredictionResponse:
+    return _own(*await _predictions.do(prediction_key(req, foods), lambda: evaluate(req, foods)))
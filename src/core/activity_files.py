@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import gzip
+import math
+import struct
+from array import array
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Tuple
+from xml.etree.ElementTree import Element, iterparse
+
+ACTIVITY_FILE_FORMATS = ("fit", "gpx", "tcx")
+FIT_EPOCH_OFFSET = 631065600  # 1989-12-31T00:00:00Z
+ELEVATION_GAIN_THRESHOLD_M = 2.0
+
+# (epoch seconds, heart_rate, power, cadence, altitude_m, speed_m_s, distance_m, lat, lon)
+Point = Tuple[float, Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]]
+
+_SPORTS = {
+    "running": "running",
+    "run": "running",
+    "trail_running": "trail_running",
+    "trailrun": "trail_running",
+    "cycling": "cycling",
+    "biking": "cycling",
+    "ride": "cycling",
+    "virtualride": "cycling",
+    "road_biking": "cycling",
+    "mountain_biking": "cycling",
+    "swimming": "swimming",
+    "swim": "swimming",
+    "hiking": "hiking",
+    "hike": "hiking",
+    "walking": "hiking",
+}
+# FIT profile `sport` enum values we map; everything else falls back to the caller's default.
+_FIT_SPORTS = {1: "running", 2: "cycling", 5: "swimming", 17: "hiking", 11: "hiking"}
+
+
+def activity_file_format(filename: str) -> Optional[str]:
+    name = filename.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    ext = name.rsplit(".", 1)[-1] if "." in name else ""
+    return ext if ext in ACTIVITY_FILE_FORMATS else None
+
+
+def _sport(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return _SPORTS.get(value.strip().lower().replace(" ", "_"))
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+
+
+def _float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371000.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+class ActivityFileError(ValueError):
+    pass
+
+
+class _TrackBuilder:
+    # Folds points into typed arrays and running summary totals as they are parsed, so only the
+    # per-second arrays (about 4 bytes per sample per channel) are ever held in memory.
+    def __init__(self) -> None:
+        self.time = array("d")
+        self.heart_rate = array("f")
+        self.power = array("f")
+        self.cadence = array("f")
+        self.altitude = array("f")
+        self.speed = array("f")
+        self.distance_m = 0.0
+        self.gps_distance_m = 0.0
+        self.elevation_gain_m = 0.0
+        self._climb_base: Optional[float] = None
+        self._last_pos: Optional[Tuple[float, float]] = None
+        self._last_t: Optional[float] = None
+        self.sport: Optional[str] = None
+        self.timer_s: Optional[float] = None
+
+    def add(self, point: Point) -> None:
+        t, hr, power, cadence, altitude, speed, distance, lat, lon = point
+        if self._last_t is not None and t < self._last_t:
+            return
+        self._last_t = t
+        nan = math.nan
+        self.time.append(t)
+        self.heart_rate.append(nan if hr is None else hr)
+        self.power.append(nan if power is None else power)
+        self.cadence.append(nan if cadence is None else cadence)
+        self.altitude.append(nan if altitude is None else altitude)
+        self.speed.append(nan if speed is None else speed)
+        if distance is not None and distance > self.distance_m:
+            self.distance_m = distance
+        if lat is not None and lon is not None:
+            if self._last_pos is not None:
+                self.gps_distance_m += _haversine_m(self._last_pos[0], self._last_pos[1], lat, lon)
+            self._last_pos = (lat, lon)
+        if altitude is not None:
+            # Hysteresis keeps barometric/GPS jitter from inflating the climb total.
+            if self._climb_base is None or altitude < self._climb_base:
+                self._climb_base = altitude
+            elif altitude - self._climb_base >= ELEVATION_GAIN_THRESHOLD_M:
+                self.elevation_gain_m += altitude - self._climb_base
+                self._climb_base = altitude
+
+    def finish(self, default_sport: str) -> Dict[str, Any]:
+        if len(self.time) < 2:
+            raise ActivityFileError("File has no timestamped track points")
+        t0 = self.time[0]
+        elapsed_s = self.time[-1] - t0
+        streams: Dict[str, Any] = {"time": array("d", (t - t0 for t in self.time))}
+        for name in ("heart_rate", "power", "cadence", "altitude", "speed"):
+            values = getattr(self, name)
+            if any(not math.isnan(v) for v in values):
+                streams[name] = values
+
+        def _mean(values: array, positive: bool = False) -> Optional[float]:
+            total, count = 0.0, 0
+            for v in values:
+                if not math.isnan(v) and (v > 0 or not positive):
+                    total += v
+                    count += 1
+            return round(total / count, 1) if count else None
+
+        def _max(values: array) -> Optional[float]:
+            present = [v for v in values if not math.isnan(v)]
+            return round(max(present), 1) if present else None
+
+        distance_m = self.distance_m or self.gps_distance_m
+        workout = {
+            "sport": self.sport or default_sport,
+            "status": "completed",
+            "start_time": datetime.fromtimestamp(t0, tz=timezone.utc).isoformat(),
+            "duration_minutes": round((self.timer_s or elapsed_s) / 60.0, 1),
+            "distance_km": round(distance_m / 1000.0, 2) if distance_m else None,
+            "elevation_gain_m": round(self.elevation_gain_m, 1) if "altitude" in streams else None,
+            "avg_heart_rate_bpm": _mean(self.heart_rate),
+            "max_heart_rate_bpm": _max(self.heart_rate),
+            "avg_power_watts": _mean(self.power),
+            "avg_cadence": _mean(self.cadence, positive=True),
+        }
+        return {"workout": workout, "streams": streams}
+
+
+def _xml_points(
+    fh: IO[bytes],
+    point_tag: str,
+    container_tags: Tuple[str, ...],
+    read_point: Callable[[Element], Optional[Point]],
+    on_event: Callable[[str, str, Element], None],
+) -> Iterator[Point]:
+    # iterparse + clearing the enclosing segment keeps memory flat regardless of file length.
+    container: Optional[Element] = None
+    for event, elem in iterparse(fh, events=("start", "end")):
+        tag = _local(elem.tag)
+        if event == "start" and tag in container_tags:
+            container = elem
+        if event == "start" or tag != point_tag:
+            on_event(event, tag, elem)
+            continue
+        point = read_point(elem)
+        if point is not None:
+            yield point
+        if container is not None:
+            container.clear()
+        else:
+            elem.clear()
+
+
+def _gpx_point(elem: Element) -> Optional[Point]:
+    values: Dict[str, Optional[str]] = {}
+    for child in elem.iter():
+        name = _local(child.tag).lower()
+        if child is not elem and child.text:
+            values[name] = child.text
+    if "time" not in values:
+        return None
+    return (
+        _epoch(values["time"]),
+        _float(values.get("hr") or values.get("heartrate")),
+        _float(values.get("power") or values.get("watts")),
+        _float(values.get("cad") or values.get("cadence")),
+        _float(values.get("ele")),
+        _float(values.get("speed")),
+        None,
+        _float(elem.get("lat")),
+        _float(elem.get("lon")),
+    )
+
+
+def _tcx_point(elem: Element) -> Optional[Point]:
+    values: Dict[str, Optional[str]] = {}
+    for child in elem.iter():
+        name = _local(child.tag)
+        if child is elem or not child.text or not child.text.strip():
+            continue
+        # HeartRateBpm wraps its number in <Value>.
+        values["HeartRateBpm" if name == "Value" else name] = child.text
+    if "Time" not in values:
+        return None
+    return (
+        _epoch(values["Time"]),
+        _float(values.get("HeartRateBpm")),
+        _float(values.get("Watts")),
+        _float(values.get("Cadence") or values.get("RunCadence")),
+        _float(values.get("AltitudeMeters")),
+        _float(values.get("Speed")),
+        _float(values.get("DistanceMeters")),
+        _float(values.get("LatitudeDegrees")),
+        _float(values.get("LongitudeDegrees")),
+    )
+
+
+def parse_gpx(fh: IO[bytes], builder: _TrackBuilder) -> None:
+    depth = {"trk": 0}
+
+    def on_event(event: str, tag: str, elem: Element) -> None:
+        if tag == "trk":
+            depth["trk"] += 1 if event == "start" else -1
+        elif tag == "type" and event == "end" and depth["trk"] and builder.sport is None:
+            # <trk><type> is free text ("cycling", "Ride", "running"...) depending on the exporter.
+            builder.sport = _sport(elem.text)
+
+    for point in _xml_points(fh, "trkpt", ("trkseg",), _gpx_point, on_event):
+        builder.add(point)
+
+
+def parse_tcx(fh: IO[bytes], builder: _TrackBuilder) -> None:
+    def on_event(event: str, tag: str, elem: Element) -> None:
+        if tag == "Activity" and event == "start" and builder.sport is None:
+            builder.sport = _sport(elem.get("Sport"))
+
+    for point in _xml_points(fh, "Trackpoint", ("Track",), _tcx_point, on_event):
+        builder.add(point)
+
+
+# --- FIT -------------------------------------------------------------------------------------
+# Minimal decoder for the messages we need: record (20) for samples, session (18) and sport (12)
+# for the sport and timer time. Everything else is skipped byte-for-byte via precompiled structs.
+
+_FIT_RECORD = 20
+_FIT_SESSION = 18
+_FIT_SPORT = 12
+_FIT_WANTED = {
+    _FIT_RECORD: {253: "timestamp", 0: "lat", 1: "lon", 2: "altitude", 3: "heart_rate", 4: "cadence", 5: "distance", 6: "speed", 7: "power", 73: "enhanced_speed", 78: "enhanced_altitude"},
+    _FIT_SESSION: {5: "sport", 7: "total_timer_time"},
+    _FIT_SPORT: {0: "sport"},
+}
+_FIT_SIGNED = {"lat", "lon"}
+_FIT_INVALID = {1: 0xFF, 2: 0xFFFF, 4: 0xFFFFFFFF}
+_SEMICIRCLE_DEG = 180.0 / 2**31
+
+
+class _FitDefinition:
+    __slots__ = ("global_num", "struct", "names", "size")
+
+    def __init__(self, global_num: int, big_endian: bool, fields: list, dev_size: int) -> None:
+        wanted = _FIT_WANTED.get(global_num, {})
+        fmt = [">" if big_endian else "<"]
+        names = []
+        for field_num, size in fields:
+            name = wanted.get(field_num)
+            if name is not None and size in _FIT_INVALID:
+                code = {1: "B", 2: "H", 4: "I"}[size]
+                fmt.append(code.lower() if name in _FIT_SIGNED and size == 4 else code)
+                names.append((name, size))
+            else:
+                fmt.append(f"{size}x")
+        if dev_size:
+            fmt.append(f"{dev_size}x")
+        self.global_num = global_num
+        self.struct = struct.Struct("".join(fmt))
+        self.names = names
+        self.size = self.struct.size
+
+
+def _read_exact(fh: IO[bytes], n: int) -> bytes:
+    data = fh.read(n)
+    if len(data) != n:
+        raise ActivityFileError("Truncated FIT file")
+    return data
+
+
+def parse_fit(fh: IO[bytes], builder: _TrackBuilder) -> None:
+    header = _read_exact(fh, 12)
+    header_size = header[0]
+    if header[8:12] != b".FIT" or header_size < 12:
+        raise ActivityFileError("Not a FIT file")
+    if header_size > 12:
+        _read_exact(fh, header_size - 12)
+    remaining = struct.unpack("<I", header[4:8])[0]
+    definitions: Dict[int, _FitDefinition] = {}
+    last_ts = 0
+
+    while remaining > 0:
+        record_header = _read_exact(fh, 1)[0]
+        remaining -= 1
+        compressed_ts: Optional[int] = None
+        if record_header & 0x80:
+            local = (record_header >> 5) & 0x03
+            offset = record_header & 0x1F
+            compressed_ts = (last_ts & ~0x1F) + offset + (0x20 if offset < (last_ts & 0x1F) else 0)
+        elif record_header & 0x40:
+            local = record_header & 0x0F
+            fixed = _read_exact(fh, 5)
+            big_endian = fixed[1] == 1
+            global_num = struct.unpack(">H" if big_endian else "<H", fixed[2:4])[0]
+            raw = _read_exact(fh, fixed[4] * 3)
+            fields = [(raw[i], raw[i + 1]) for i in range(0, len(raw), 3)]
+            remaining -= 5 + len(raw)
+            dev_size = 0
+            if record_header & 0x20:
+                dev_count = _read_exact(fh, 1)[0]
+                dev_raw = _read_exact(fh, dev_count * 3)
+                dev_size = sum(dev_raw[i + 1] for i in range(0, len(dev_raw), 3))
+                remaining -= 1 + len(dev_raw)
+            definitions[local] = _FitDefinition(global_num, big_endian, fields, dev_size)
+            continue
+        else:
+            local = record_header & 0x0F
+
+        definition = definitions.get(local)
+        if definition is None:
+            raise ActivityFileError(f"FIT data message for undefined local type {local}")
+        data = _read_exact(fh, definition.size)
+        remaining -= definition.size
+        if not definition.names:
+            continue
+        values: Dict[str, float] = {}
+        for (name, size), value in zip(definition.names, definition.struct.unpack(data)):
+            if value == _FIT_INVALID[size] or (name in _FIT_SIGNED and value == 0x7FFFFFFF):
+                continue
+            values[name] = value
+        if "timestamp" in values:
+            last_ts = int(values["timestamp"])
+        elif compressed_ts is not None:
+            last_ts = compressed_ts
+            values["timestamp"] = compressed_ts
+
+        if definition.global_num == _FIT_RECORD and "timestamp" in values:
+            altitude = values.get("enhanced_altitude", values.get("altitude"))
+            speed = values.get("enhanced_speed", values.get("speed"))
+            builder.add(
+                (
+                    values["timestamp"] + FIT_EPOCH_OFFSET,
+                    values.get("heart_rate"),
+                    values.get("power"),
+                    values.get("cadence"),
+                    altitude / 5.0 - 500.0 if altitude is not None else None,
+                    speed / 1000.0 if speed is not None else None,
+                    values["distance"] / 100.0 if "distance" in values else None,
+                    values["lat"] * _SEMICIRCLE_DEG if "lat" in values else None,
+                    values["lon"] * _SEMICIRCLE_DEG if "lon" in values else None,
+                )
+            )
+        elif definition.global_num in (_FIT_SESSION, _FIT_SPORT):
+            if "sport" in values and builder.sport is None:
+                builder.sport = _FIT_SPORTS.get(int(values["sport"]))
+            if "total_timer_time" in values:
+                builder.timer_s = (builder.timer_s or 0.0) + values["total_timer_time"] / 1000.0
+
+
+_PARSERS: Dict[str, Callable[[IO[bytes], _TrackBuilder], None]] = {"fit": parse_fit, "gpx": parse_gpx, "tcx": parse_tcx}
+
+
+def parse_activity_file(path: str, filename: str, default_sport: str = "cycling") -> Dict[str, Any]:
+    fmt = activity_file_format(filename)
+    if fmt is None:
+        raise ActivityFileError(f"Unsupported file type: {filename}")
+    builder = _TrackBuilder()
+    opener = gzip.open if filename.lower().endswith(".gz") else open
+    try:
+        with opener(path, "rb") as fh:
+            _PARSERS[fmt](fh, builder)
+    except (OSError, EOFError, SyntaxError, struct.error) as exc:
+        # ElementTree.ParseError is a SyntaxError; gzip raises OSError/EOFError on bad input.
+        raise ActivityFileError(f"Could not parse {fmt.upper()} file: {exc}") from exc
+    parsed = builder.finish(default_sport)
+    parsed["format"] = fmt
+    return parsed
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from src.core.sports import sport_family
+
+# Longest workout the overlap search has to reach back for. Start times are indexed, so a
+# candidate lookup is a B-tree seek to [start - MAX_WORKOUT_SECONDS, end) rather than a scan.
+MAX_WORKOUT_SECONDS = 48 * 3600
+MIN_OVERLAP_RATIO = 0.5
+ZERO_LENGTH_MATCH_S = 60
+
+RICHNESS_FIELDS = (
+    "duration_minutes",
+    "distance_km",
+    "elevation_gain_m",
+    "avg_heart_rate_bpm",
+    "max_heart_rate_bpm",
+    "avg_power_watts",
+    "normalized_power_watts",
+    "avg_cadence",
+    "tss",
+    "intensity_factor",
+)
+# Columns a canonical record inherits from its duplicates when it has no value of its own.
+MERGE_FIELDS = RICHNESS_FIELDS + (
+    "intensity_rpe",
+    "completed_carbs_g",
+    "completed_fluids_ml",
+    "completed_sodium_mg",
+    "temperature_c",
+    "humidity_pct",
+    "time_in_zones_json",
+    "notes",
+)
+STREAMS_RICHNESS_BONUS = 5
+
+
+def epoch_range(start_time: Optional[str], duration_minutes: Optional[float]) -> Tuple[Optional[int], Optional[int]]:
+    if not start_time:
+        return None, None
+    try:
+        start = datetime.fromisoformat(str(start_time).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None, None
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    start_epoch = int(start.timestamp())
+    seconds = max(0, min(MAX_WORKOUT_SECONDS, int(round(float(duration_minutes or 0) * 60))))
+    return start_epoch, start_epoch + seconds
+
+
+def overlap_ratio(a: Mapping[str, Any], b: Mapping[str, Any]) -> float:
+    # Intersection over the shorter workout, so a 2 h ride recorded as 1:58 moving time still matches.
+    if a.get("start_epoch") is None or b.get("start_epoch") is None:
+        return 0.0
+    inter = min(a["end_epoch"], b["end_epoch"]) - max(a["start_epoch"], b["start_epoch"])
+    shorter = min(a["end_epoch"] - a["start_epoch"], b["end_epoch"] - b["start_epoch"])
+    if shorter <= 0:
+        # Zero-length entries (no duration) match when they start within a minute of each other.
+        return 1.0 if abs(a["start_epoch"] - b["start_epoch"]) <= ZERO_LENGTH_MATCH_S else 0.0
+    return max(0.0, inter / shorter)
+
+
+def is_duplicate(a: Mapping[str, Any], b: Mapping[str, Any], min_ratio: float = MIN_OVERLAP_RATIO) -> bool:
+    return (
+        a.get("status") == "completed"
+        and b.get("status") == "completed"
+        and sport_family(a.get("sport")) == sport_family(b.get("sport"))
+        and overlap_ratio(a, b) >= min_ratio
+    )
+
+
+def richness(row: Mapping[str, Any], has_streams: bool = False) -> int:
+    score = sum(1 for field in RICHNESS_FIELDS if row.get(field) is not None)
+    return score + (STREAMS_RICHNESS_BONUS if has_streams else 0)
+
+
+def pick_canonical(rows: Iterable[Mapping[str, Any]], with_streams: Iterable[int] = ()) -> Mapping[str, Any]:
+    # Richest record wins; ties go to the earliest ingested row so the choice is stable.
+    streams = set(with_streams)
+    return max(rows, key=lambda r: (richness(r, r["id"] in streams), -int(r["id"])))
+
+
+def merged_fields(canonical: Mapping[str, Any], others: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    updates: Dict[str, Any] = {}
+    for row in sorted(others, key=lambda r: -richness(r)):
+        for field in MERGE_FIELDS:
+            if canonical.get(field) is None and field not in updates and row.get(field) is not None:
+                updates[field] = row[field]
+    return updates
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from .models import (
     FoodItem,
@@ -27,6 +30,34 @@ SPORT_MULTIPLIER = {
 }
 
 
+_stage_sink: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("engine_stage_sink", default=None)
+
+
+@contextmanager
+def stage_timings() -> Iterator[List[Tuple[str, float]]]:
+    # Collects (stage, seconds) for engine calls made inside the block. The list is plain data, so
+    # it can travel back from a pool worker with the result.
+    sink: List[Tuple[str, float]] = []
+    token = _stage_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _stage_sink.reset(token)
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    sink = _stage_sink.get()
+    if sink is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sink.append((name, time.perf_counter() - started))
+
+
 def _clamp(value: float, low: float, high: float) -> float:
     return max(low, min(high, value))
 
@@ -424,6 +455,50 @@ def _format_clock(start_iso: Optional[str], offset_min: int) -> str:
     return (start + timedelta(minutes=offset_min)).strftime("%H:%M")
 
 
+def _slot_action(
+    req: PredictionRequest,
+    minute: int,
+    choice: Optional[FoodItem],
+    scale: float,
+    per_slot_carb: float,
+    per_slot_fluid: float,
+    per_slot_sodium: float,
+    caffeine_used_mg: float,
+) -> Tuple[FuelingAction, float]:
+    if not choice:
+        action = FuelingAction(
+            minute_offset=minute,
+            action=_format_clock(req.session.planned_start_iso, minute),
+            food_name="Carb mix + drink",
+            serving="Custom",
+            carbs_g=round(per_slot_carb, 1),
+            sodium_mg=round(per_slot_sodium, 0),
+            fluid_ml=round(per_slot_fluid, 0),
+            notes="No foods selected; using macro slot targets.",
+        )
+        return action, 0.0
+
+    scaled_caffeine = choice.caffeine_mg * scale
+    if choice.serving_desc:
+        if abs(scale - 1.0) <= 0.08:
+            serving = choice.serving_desc
+        else:
+            serving = f"{scale:.2f} x {choice.serving_desc}"
+    else:
+        serving = f"{scale:.2f} serving"
+    action = FuelingAction(
+        minute_offset=minute,
+        action=_format_clock(req.session.planned_start_iso, minute),
+        food_name=choice.name,
+        serving=serving,
+        carbs_g=round(choice.carbs_g * scale, 1),
+        sodium_mg=round(choice.sodium_mg * scale, 0),
+        fluid_ml=round(choice.fluid_ml * scale, 0),
+        notes=f"Slot target {per_slot_carb:.1f} g carbs / {per_slot_fluid:.0f} ml. Caffeine total ~{caffeine_used_mg + scaled_caffeine:.0f} mg.",
+    )
+    return action, scaled_caffeine
+
+
 def build_fueling_schedule(
     req: PredictionRequest,
     balanced: StrategyRecommendation,
@@ -465,56 +540,76 @@ def build_fueling_schedule(
             last_food_name=last_food_name,
             caffeine_used_mg=caffeine_used_mg,
         )
+        action, caffeine = _slot_action(req, m, choice, scale, per_slot_carb, per_slot_fluid, per_slot_sodium, caffeine_used_mg)
+        schedule.append(action)
         if choice:
-            scaled_carbs = choice.carbs_g * scale
-            scaled_sodium = choice.sodium_mg * scale
-            scaled_fluid = choice.fluid_ml * scale
-            scaled_caffeine = choice.caffeine_mg * scale
-            if choice.serving_desc:
-                if abs(scale - 1.0) <= 0.08:
-                    serving = choice.serving_desc
-                else:
-                    serving = f"{scale:.2f} x {choice.serving_desc}"
-            else:
-                serving = f"{scale:.2f} serving"
-            schedule.append(
-                FuelingAction(
-                    minute_offset=m,
-                    action=_format_clock(req.session.planned_start_iso, m),
-                    food_name=choice.name,
-                    serving=serving,
-                    carbs_g=round(scaled_carbs, 1),
-                    sodium_mg=round(scaled_sodium, 0),
-                    fluid_ml=round(scaled_fluid, 0),
-                    notes=f"Slot target {per_slot_carb:.1f} g carbs / {per_slot_fluid:.0f} ml. Caffeine total ~{caffeine_used_mg + scaled_caffeine:.0f} mg.",
-                )
-            )
-            caffeine_used_mg += scaled_caffeine
+            caffeine_used_mg += caffeine
+            last_food_name = choice.name
+    return schedule
+
+
+# Live re-planning never asks for more than this multiple of a nominal slot, however far behind
+# the athlete is: gut absorption, not the plan, is the limit.
+CATCH_UP_CAP = 1.5
+
+
+def replan_fueling_slots(
+    req: PredictionRequest,
+    balanced: StrategyRecommendation,
+    foods: Optional[List[FoodItem]],
+    after_minute: int,
+    consumed_carbs_g: float,
+    consumed_fluid_ml: float,
+    consumed_sodium_mg: float,
+    consumed_caffeine_mg: float,
+    last_food_name: str | None = None,
+) -> List[FuelingAction]:
+    # Re-targets only the slots after `after_minute` so the session still lands on the planned
+    # in-session totals given what was actually taken; earlier slots and the strategy are kept.
+    duration = req.session.duration_minutes
+    slots = [m for m in _slot_times(duration) if m > 0]
+    remaining = [m for m in slots if m > after_minute]
+    if not remaining:
+        return []
+
+    nominal = (balanced.carbs_g_per_hour / 4.0, balanced.hydration_ml_per_hour / 4.0, balanced.sodium_mg_per_hour / 4.0)
+    consumed = (consumed_carbs_g, consumed_fluid_ml, consumed_sodium_mg)
+    per_slot_carb, per_slot_fluid, per_slot_sodium = (
+        _clamp((n * len(slots) - c) / len(remaining), 0.0, n * CATCH_UP_CAP) for n, c in zip(nominal, consumed)
+    )
+    active_foods = foods or []
+    caffeine_used_mg = consumed_caffeine_mg
+    schedule: List[FuelingAction] = []
+    for m in remaining:
+        choice, scale = _food_choice_for_slot(
+            foods=active_foods,
+            target_carbs=per_slot_carb,
+            target_fluid=per_slot_fluid,
+            target_sodium=per_slot_sodium,
+            minute=m,
+            duration=duration,
+            last_food_name=last_food_name,
+            caffeine_used_mg=caffeine_used_mg,
+        )
+        action, caffeine = _slot_action(req, m, choice, scale, per_slot_carb, per_slot_fluid, per_slot_sodium, caffeine_used_mg)
+        schedule.append(action)
+        if choice:
+            caffeine_used_mg += caffeine
             last_food_name = choice.name
-        else:
-            schedule.append(
-                FuelingAction(
-                    minute_offset=m,
-                    action=_format_clock(req.session.planned_start_iso, m),
-                    food_name="Carb mix + drink",
-                    serving="Custom",
-                    carbs_g=round(per_slot_carb, 1),
-                    sodium_mg=round(per_slot_sodium, 0),
-                    fluid_ml=round(per_slot_fluid, 0),
-                    notes="No foods selected; using macro slot targets.",
-                )
-            )
     return schedule
 
 
 def predict(req: PredictionRequest, foods: Optional[List[FoodItem]] = None) -> PredictionResponse:
-    low, high, notes = _confidence_band(req)
-    base_carb_h, load_notes = _base_carbs_per_hour(req)
-    strategies = [
-        _recommendation(req, StrategyType.conservative, base_carb_h),
-        _recommendation(req, StrategyType.balanced, base_carb_h),
-        _recommendation(req, StrategyType.aggressive, base_carb_h),
-    ]
+    with _stage("confidence"):
+        low, high, notes = _confidence_band(req)
+    with _stage("carb_model"):
+        base_carb_h, load_notes = _base_carbs_per_hour(req)
+    with _stage("strategies"):
+        strategies = [
+            _recommendation(req, StrategyType.conservative, base_carb_h),
+            _recommendation(req, StrategyType.balanced, base_carb_h),
+            _recommendation(req, StrategyType.aggressive, base_carb_h),
+        ]
 
     rationale = [
         f"Sport-specific multiplier applied for {req.session.sport.value}.",
@@ -523,7 +618,8 @@ def predict(req: PredictionRequest, foods: Optional[List[FoodItem]] = None) -> P
         "Outputs are shown in conservative/balanced/aggressive strategies.",
     ] + load_notes
     balanced = [s for s in strategies if s.strategy == StrategyType.balanced][0]
-    schedule = build_fueling_schedule(req, balanced, foods=foods)
+    with _stage("schedule"):
+        schedule = build_fueling_schedule(req, balanced, foods=foods)
 
     return PredictionResponse(
         recommendation_id=str(uuid.uuid4()),
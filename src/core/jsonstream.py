@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Union
+
+_WHITESPACE = " \t\r\n"
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+# Yields the elements of a top-level JSON array while reading it chunk by chunk. Only the
+# element being decoded (plus one chunk of look-ahead) is buffered, so peak memory is bounded
+# by the largest element rather than the whole document.
+def iter_json_array(chunks: Iterable[Union[bytes, str]], encoding: str = "utf-8") -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    source = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def _fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        for chunk in source:
+            text = text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                buf = buf[pos:] + text
+                pos = 0
+                return True
+        buf = buf[pos:] + text_decoder.decode(b"", final=True)
+        pos = 0
+        eof = True
+        return False
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            if _fill():
+                continue
+            if not started:
+                raise ValueError("Expected a JSON array")
+            raise ValueError("Unterminated JSON array")
+
+        ch = buf[pos]
+        if not started:
+            if ch != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if ch == "]":
+            return
+        if ch == ",":
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as exc:
+            if _fill():
+                continue
+            raise ValueError(f"Invalid JSON array element: {exc.msg}") from exc
+        if not eof and (end >= len(buf) or (_is_number(value) and _NUMBER_CHARS.issuperset(buf[end:]))):
+            # Numbers may continue in the next chunk: "-0." decodes as -0 until its digits arrive.
+            if _fill():
+                continue
+        pos = end
+        yield value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Optional
+
+# Providers name the same sport differently (Strava "ride"/"virtualride", Garmin "cycling", files
+# "biking"). Stream metrics pick FTP and thresholds by family; duplicates only need to agree on it.
+SPORT_FAMILIES = {
+    "cycling": "cycling",
+    "ride": "cycling",
+    "virtualride": "cycling",
+    "ebikeride": "cycling",
+    "gravelride": "cycling",
+    "mountainbikeride": "cycling",
+    "biking": "cycling",
+    "running": "running",
+    "run": "running",
+    "virtualrun": "running",
+    "trail_running": "running",
+    "trailrun": "running",
+    "swimming": "swimming",
+    "swim": "swimming",
+    "hiking": "hiking",
+    "hike": "hiking",
+    "walk": "hiking",
+}
+
+
+def sport_family(sport: Optional[str]) -> str:
+    key = (sport or "").strip().lower().replace(" ", "_")
+    return SPORT_FAMILIES.get(key, key)
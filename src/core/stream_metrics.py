@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.core.sports import sport_family
+
+NP_WINDOW_S = 30
+HR_ZONES = ("below_lt1", "lt1_to_lt2", "above_lt2")
+
+
+def _as_array(values: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+    if values is None or len(values) == 0:
+        return None
+    # Stored chunks are float32 arrays; np.asarray reads them through the buffer protocol.
+    return np.asarray(values, dtype=np.float64)
+
+
+def normalized_power(power: np.ndarray, window_s: int = NP_WINDOW_S) -> Optional[float]:
+    # Coggan NP: 4th root of the mean of the 4th power of the 30 s rolling average. Coasting is
+    # recorded as 0 W; NaN marks a pause or a gap longer than the fill limit. Only windows lying
+    # entirely inside recorded segments count, so a stop neither pulls NP toward zero nor gets
+    # bridged by one window.
+    if power.size < window_s:
+        return None
+    recorded = ~np.isnan(power)
+    csum = np.cumsum(np.concatenate(([0.0], np.where(recorded, power, 0.0))))
+    ccount = np.cumsum(np.concatenate(([0], recorded.astype(np.int64))))
+    complete = (ccount[window_s:] - ccount[:-window_s]) == window_s
+    if not complete.any():
+        return None
+    rolling = (csum[window_s:] - csum[:-window_s])[complete] / window_s
+    return float(np.mean(rolling**4) ** 0.25)
+
+
+def time_in_zones(heart_rate: np.ndarray, lt1_bpm: float, lt2_bpm: float) -> Dict[str, int]:
+    hr = heart_rate[~np.isnan(heart_rate)]
+    counts = np.bincount(np.digitize(hr, [lt1_bpm, lt2_bpm]), minlength=3)
+    return {zone: int(count) for zone, count in zip(HR_ZONES, counts)}
+
+
+def compute_stream_metrics(
+    streams: Mapping[str, Sequence[float]],
+    sport: str,
+    profile: Mapping[str, Any],
+) -> Dict[str, Any]:
+    # Thresholds are looked up by family, so provider names like Strava's "ride" or "virtualrun" get
+    # the bike/run FTP and LT heart rates. Hyrox uses the bike values.
+    family = sport_family(sport)
+    prefix = "bike" if family in ("cycling", "hyrox") else "run" if family == "running" else None
+    out: Dict[str, Any] = {}
+
+    power = _as_array(streams.get("power"))
+    if power is not None and not np.all(np.isnan(power)):
+        out["avg_power_watts"] = round(float(np.nanmean(power)), 1)
+        np_w = normalized_power(power)
+        if np_w is not None:
+            out["normalized_power_watts"] = round(np_w, 1)
+            ftp = profile.get(f"{prefix}_ftp_w") if prefix else None
+            if ftp:
+                intensity = np_w / float(ftp)
+                out["intensity_factor"] = round(intensity, 3)
+                # Duration is recorded time, not elapsed time including pauses.
+                recorded_s = int(np.count_nonzero(~np.isnan(power)))
+                out["tss"] = round(recorded_s * np_w * intensity / (float(ftp) * 3600.0) * 100.0, 1)
+
+    heart_rate = _as_array(streams.get("heart_rate"))
+    if heart_rate is not None and not np.all(np.isnan(heart_rate)):
+        out["avg_heart_rate_bpm"] = round(float(np.nanmean(heart_rate)), 1)
+        out["max_heart_rate_bpm"] = round(float(np.nanmax(heart_rate)), 1)
+        lt1 = profile.get(f"{prefix or 'bike'}_lt1_hr_bpm")
+        lt2 = profile.get(f"{prefix or 'bike'}_lt2_hr_bpm")
+        if lt1 and lt2:
+            out["time_in_zones_s"] = time_in_zones(heart_rate, float(lt1), float(lt2))
+
+    cadence = _as_array(streams.get("cadence"))
+    if cadence is not None and not np.all(np.isnan(cadence)):
+        moving = cadence[cadence > 0]
+        if moving.size:
+            out["avg_cadence"] = round(float(np.mean(moving)), 1)
+    return out
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+STREAM_TYPES = ("heart_rate", "power", "cadence", "altitude", "speed")
+MAX_STREAM_SECONDS = 48 * 3600
+MAX_GAP_FILL_SECONDS = 5
+
+
+def resample_1hz(
+    times: Sequence[float],
+    values: Sequence[Optional[float]],
+    max_gap_s: int = MAX_GAP_FILL_SECONDS,
+) -> List[float]:
+    # Devices record irregularly (smart recording, pauses). Streams are stored on a 1 Hz grid so a
+    # sample index is also its second offset; short gaps hold the last value, long gaps are NaN.
+    if not times or not values:
+        return []
+    t0 = float(times[0])
+    length = min(MAX_STREAM_SECONDS, int(math.floor(float(times[-1]) - t0)) + 1)
+    out = [math.nan] * max(0, length)
+    last_idx: Optional[int] = None
+    last_val = math.nan
+    for t, v in zip(times, values):
+        if t is None:
+            continue
+        idx = int(round(float(t) - t0))
+        if idx < 0 or idx >= length:
+            continue
+        if last_idx is not None and 1 < idx - last_idx <= max_gap_s and not math.isnan(last_val):
+            for fill in range(last_idx + 1, idx):
+                out[fill] = last_val
+        val = math.nan if v is None else float(v)
+        out[idx] = val
+        last_idx = idx
+        last_val = val
+    return out
+
+
+def downsample(values: Sequence[float], max_points: int) -> List[Optional[float]]:
+    # Bucket means that skip missing samples; returns None for empty buckets so the payload stays
+    # JSON-safe.
+    n = len(values)
+    if max_points <= 0 or n <= max_points:
+        return [None if (v is None or math.isnan(v)) else round(v, 2) for v in values]
+    out: List[Optional[float]] = []
+    step = n / max_points
+    for b in range(max_points):
+        lo = int(b * step)
+        hi = max(lo + 1, int((b + 1) * step))
+        total = 0.0
+        count = 0
+        for v in values[lo:hi]:
+            if v is not None and not math.isnan(v):
+                total += v
+                count += 1
+        out.append(round(total / count, 2) if count else None)
+    return out
+
+
+def has_samples(values: Sequence[float]) -> bool:
+    return any(not math.isnan(v) for v in values)
+
+
+def validate_stream_payload(payload: Dict[str, Sequence[Optional[float]]]) -> Dict[str, Sequence[Optional[float]]]:
+    unknown = sorted(set(payload) - set(STREAM_TYPES) - {"time"})
+    if unknown:
+        raise ValueError(f"Unknown stream types: {', '.join(unknown)}")
+    return {k: v for k, v in payload.items() if k in STREAM_TYPES}
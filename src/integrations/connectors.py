@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from src.integrations.oauth import oauth_ready
-from src.integrations.providers import fetch_garmin_workouts, fetch_strava_workouts
+from src.integrations.providers import AccessToken, fetch_garmin_workouts, fetch_strava_workouts, iter_garmin_workouts
 from src.storage.integrations import list_connections
 
 
@@ -18,9 +18,16 @@ def integration_status(user_id: int) -> List[Dict[str, Any]]:
     return base
 
 
-def pull_workouts(provider: str, access_token: str, kind: str) -> List[Dict[str, Any]]:
+def pull_workouts(provider: str, access_token: AccessToken, kind: str, after: Optional[int] = None) -> List[Dict[str, Any]]:
     if provider == "strava":
-        return fetch_strava_workouts(access_token=access_token, kind=kind)
+        return fetch_strava_workouts(access_token=access_token, kind=kind, after=after)
     if provider == "garmin_connect":
         return fetch_garmin_workouts(access_token=access_token, kind=kind)
     return []
+
+
+def iter_pulled_workouts(provider: str, access_token: AccessToken, kind: str, after: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    if provider == "strava":
+        yield from fetch_strava_workouts(access_token=access_token, kind=kind, after=after)
+    elif provider == "garmin_connect":
+        yield from iter_garmin_workouts(access_token=access_token, kind=kind)
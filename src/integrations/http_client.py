@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import ssl
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib import parse
+
+from src.observability.metrics import counter, histogram
+
+USER_AGENT = "endurance-fuel-ai/0.5"
+
+_REQUEST_SECONDS = histogram(
+    "provider_http_request_seconds",
+    "Outbound provider/OAuth HTTP request latency",
+    ("host", "method", "status"),
+)
+_CONNECTIONS_OPENED = counter(
+    "provider_http_connections_opened_total",
+    "New TCP/TLS connections opened to provider hosts",
+    ("host",),
+)
+_CONNECTIONS_REUSED = counter(
+    "provider_http_connections_reused_total",
+    "Requests served over a pooled keep-alive connection",
+    ("host",),
+)
+
+# Errors that mean a pooled keep-alive connection was closed by the server while idle.
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError, ConnectionResetError)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], body: bytes) -> None:
+        super().__init__(f"HTTP Error {status}: {reason}")
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+@dataclass
+class StreamingResponse:
+    status: int
+    headers: Dict[str, str]
+    _chunks: Iterator[bytes] = field(repr=False)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        return self._chunks
+
+
+class _HostPool:
+    def __init__(self, scheme: str, host: str, port: Optional[int], max_connections: int) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self.lock = threading.Lock()
+
+    def take_idle(self, idle_timeout: float) -> Optional[http.client.HTTPConnection]:
+        now = time.monotonic()
+        with self.lock:
+            while self.idle:
+                conn, last_used = self.idle.pop()
+                if now - last_used <= idle_timeout:
+                    return conn
+                conn.close()
+        return None
+
+    def put_idle(self, conn: http.client.HTTPConnection) -> None:
+        with self.lock:
+            self.idle.append((conn, time.monotonic()))
+
+
+class HttpClient:
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        idle_timeout: float = 60.0,
+        acquire_timeout: float = 30.0,
+    ) -> None:
+        self.max_connections_per_host = max_connections_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._ssl_context = ssl.create_default_context()
+        self._pools: Dict[Tuple[str, str, Optional[int]], _HostPool] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HttpClient":
+        return cls(
+            max_connections_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "8")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "5")),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT_S", "20")),
+            idle_timeout=float(os.getenv("HTTP_IDLE_TIMEOUT_S", "60")),
+        )
+
+    def _pool(self, scheme: str, host: str, port: Optional[int]) -> _HostPool:
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(scheme, host, port, self.max_connections_per_host)
+                self._pools[key] = pool
+            return pool
+
+    def _open(self, pool: _HostPool) -> http.client.HTTPConnection:
+        conn: http.client.HTTPConnection
+        if pool.scheme == "https":
+            conn = http.client.HTTPSConnection(pool.host, pool.port, timeout=self.connect_timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(pool.host, pool.port, timeout=self.connect_timeout)
+        conn.connect()
+        # The connect timeout only bounds the handshake; reads get their own budget.
+        conn.sock.settimeout(self.read_timeout)
+        _CONNECTIONS_OPENED.inc(host=pool.host)
+        return conn
+
+    def _send(
+        self,
+        pool: _HostPool,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        conn = pool.take_idle(self.idle_timeout)
+        if conn is not None:
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                _CONNECTIONS_REUSED.inc(host=pool.host)
+                return conn, resp
+            except _STALE_ERRORS:
+                conn.close()
+        conn = self._open(pool)
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+    ) -> Iterator[StreamingResponse]:
+        parts = parse.urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        pool = self._pool(parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        send_headers = {"Accept-Encoding": "gzip", "User-Agent": USER_AGENT, "Connection": "keep-alive"}
+        send_headers.update(headers or {})
+
+        if not pool.slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No free connection to {parts.hostname} within {self.acquire_timeout}s")
+        started = time.perf_counter()
+        status = "error"
+        conn: Optional[http.client.HTTPConnection] = None
+        reusable = False
+        try:
+            conn, resp = self._send(pool, method, target, send_headers, body)
+            status = str(resp.status)
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            chunks = self._decoded_chunks(resp, resp_headers.get("content-encoding", ""))
+            if resp.status >= 400:
+                raise HttpError(resp.status, resp.reason, resp_headers, b"".join(chunks))
+            yield StreamingResponse(status=resp.status, headers=resp_headers, _chunks=chunks)
+            # Drain whatever the caller left unread so the connection can be reused.
+            for _ in chunks:
+                pass
+            reusable = not resp.will_close
+        finally:
+            if conn is not None:
+                if reusable:
+                    pool.put_idle(conn)
+                else:
+                    conn.close()
+            pool.slots.release()
+            _REQUEST_SECONDS.observe(time.perf_counter() - started, host=parts.hostname, method=method, status=status)
+
+    @staticmethod
+    def _decoded_chunks(resp: http.client.HTTPResponse, encoding: str) -> Iterator[bytes]:
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding.lower() == "gzip" else None
+        while True:
+            chunk = resp.read(64 * 1024)
+            if not chunk:
+                break
+            if inflater is not None:
+                chunk = inflater.decompress(chunk)
+            if chunk:
+                yield chunk
+        if inflater is not None:
+            tail = inflater.flush()
+            if tail:
+                yield tail
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+    ) -> HttpResponse:
+        with self.stream(method, url, headers=headers, body=body) as resp:
+            return HttpResponse(status=resp.status, headers=resp.headers, body=b"".join(resp.iter_bytes()))
+
+    def get_json(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        send_headers = {"Accept": "application/json"}
+        send_headers.update(headers or {})
+        return self.request("GET", url, headers=send_headers).json()
+
+    def post_form(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Any:
+        send_headers = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
+        send_headers.update(headers or {})
+        return self.request("POST", url, headers=send_headers, body=parse.urlencode(data).encode("utf-8")).json()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient.from_env()
+        return _client
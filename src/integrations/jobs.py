@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from src.storage.jobs import claim_job, finish_job, requeue_interrupted_jobs, touch_jobs, update_job_progress
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], Callable[[int, int], None]], Dict[str, Any]]
+
+
+class JobRunner:
+    def __init__(self, max_workers: int = 2, heartbeat_s: float = 15.0, stale_after_s: float = 120.0) -> None:
+        self.max_workers = max_workers
+        self.heartbeat_s = heartbeat_s
+        self.stale_after_s = max(stale_after_s, heartbeat_s * 2)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._running: Set[int] = set()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        self._handlers[job_type] = handler
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sync-job")
+                self._stop.clear()
+                self._heartbeat = threading.Thread(target=self._beat, name="sync-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+        for job_id in requeue_interrupted_jobs(self.stale_after_s):
+            self.submit(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._heartbeat = None
+        self._stop.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _beat(self) -> None:
+        # Keeps updated_at fresh for jobs this process runs, so other workers starting up (or a
+        # chunk stuck behind the rate limiter) do not look interrupted.
+        while not self._stop.wait(self.heartbeat_s):
+            with self._lock:
+                job_ids = sorted(self._running)
+            try:
+                touch_jobs(job_ids)
+            except Exception:
+                logger.exception("Sync job heartbeat failed")
+
+    def submit(self, job_id: int) -> None:
+        with self._lock:
+            if self._executor is None:
+                # Not started (e.g. during tests or scripts): the job stays queued in the table.
+                return
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: int) -> None:
+        job = claim_job(job_id)
+        if job is None:
+            return
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            self._execute(job_id, job)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _execute(self, job_id: int, job: Dict[str, Any]) -> None:
+        handler = self._handlers.get(job["job_type"])
+        if handler is None:
+            finish_job(job_id, "failed", error=f"Unknown job type: {job['job_type']}")
+            return
+
+        def progress(fetched: int, synced: int) -> None:
+            update_job_progress(job_id, fetched, synced)
+
+        try:
+            result = handler(job, progress)
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, job["job_type"])
+            finish_job(job_id, "failed", error=str(exc))
+            return
+        finish_job(job_id, "done", result=result)
+
+
+job_runner = JobRunner(
+    max_workers=max(1, int(os.getenv("SYNC_JOB_WORKERS", "2"))),
+    heartbeat_s=float(os.getenv("SYNC_JOB_HEARTBEAT_S", "15")),
+    stale_after_s=float(os.getenv("SYNC_JOB_STALE_AFTER_S", "120")),
+)
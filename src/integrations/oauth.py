@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import base64
-import json
 import os
 from dataclasses import dataclass
-from typing import Dict
-from urllib import parse, request
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from urllib import parse
+
+from src.integrations.http_client import get_http_client
 
 
 class OAuthError(Exception):
@@ -46,11 +48,9 @@ def missing_env_for_provider(provider: str) -> list[str]:
     return ["unsupported_provider"]
 
 
-def _read_json(req: request.Request) -> Dict[str, object]:
+def _post_token_form(url: str, payload: Dict[str, str], headers: Optional[Dict[str, str]] = None) -> Dict[str, object]:
     try:
-        with request.urlopen(req, timeout=20) as resp:
-            payload = resp.read().decode("utf-8")
-            return json.loads(payload)
+        return get_http_client().post_form(url, payload, headers=headers)
     except Exception as exc:
         raise OAuthError(str(exc)) from exc
 
@@ -66,8 +66,8 @@ def provider_config(provider: str) -> ProviderConfig:
             provider="strava",
             client_id=cid,
             client_secret=secret,
-            auth_url="https://www.strava.com/oauth/authorize",
-            token_url="https://www.strava.com/oauth/token",
+            auth_url=os.getenv("STRAVA_OAUTH_AUTH_URL", "").strip() or "https://www.strava.com/oauth/authorize",
+            token_url=os.getenv("STRAVA_OAUTH_TOKEN_URL", "").strip() or "https://www.strava.com/oauth/token",
             scope=os.getenv("STRAVA_SCOPE", "read,activity:read_all"),
         )
 
@@ -119,58 +119,54 @@ def build_authorize_url(provider: str, redirect_uri: str, state: str) -> str:
     return f"{cfg.auth_url}?{query}"
 
 
-def exchange_code(provider: str, code: str, redirect_uri: str) -> Dict[str, object]:
-    cfg = provider_config(provider)
-
-    if provider == "strava":
-        body = parse.urlencode(
-            {
-                "client_id": cfg.client_id,
-                "client_secret": cfg.client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-            }
-        ).encode("utf-8")
-        req = request.Request(
+def _client_token_request(cfg: ProviderConfig, payload: Dict[str, str]) -> Dict[str, object]:
+    if cfg.provider == "strava":
+        return _post_token_form(
             cfg.token_url,
-            data=body,
-            method="POST",
-            headers={"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"},
+            {**payload, "client_id": cfg.client_id, "client_secret": cfg.client_secret},
         )
-        return _read_json(req)
 
     token_auth_method = os.getenv("GARMIN_TOKEN_AUTH_METHOD", "body").strip().lower()
-    payload = {
-        "grant_type": "authorization_code",
-        "code": code,
-        "redirect_uri": redirect_uri,
-    }
-
     if token_auth_method == "basic":
         basic = base64.b64encode(f"{cfg.client_id}:{cfg.client_secret}".encode("utf-8")).decode("utf-8")
-        body = parse.urlencode(payload).encode("utf-8")
-        req = request.Request(
-            cfg.token_url,
-            data=body,
-            method="POST",
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Accept": "application/json",
-                "Authorization": f"Basic {basic}",
-            },
-        )
-        return _read_json(req)
-
-    payload["client_id"] = cfg.client_id
-    payload["client_secret"] = cfg.client_secret
-    body = parse.urlencode(payload).encode("utf-8")
-    req = request.Request(
-        cfg.token_url,
-        data=body,
-        method="POST",
-        headers={"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"},
+        return _post_token_form(cfg.token_url, payload, headers={"Authorization": f"Basic {basic}"})
+
+    return _post_token_form(cfg.token_url, {**payload, "client_id": cfg.client_id, "client_secret": cfg.client_secret})
+
+
+def exchange_code(provider: str, code: str, redirect_uri: str) -> Dict[str, object]:
+    cfg = provider_config(provider)
+    if provider == "strava":
+        return _client_token_request(cfg, {"code": code, "grant_type": "authorization_code"})
+    return _client_token_request(
+        cfg,
+        {
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": redirect_uri,
+        },
     )
-    return _read_json(req)
+
+
+def refresh_access_token(provider: str, refresh_token: str) -> Dict[str, object]:
+    cfg = provider_config(provider)
+    return _client_token_request(cfg, {"grant_type": "refresh_token", "refresh_token": refresh_token})
+
+
+def token_expiry_iso(token_payload: Dict[str, object]) -> Optional[str]:
+    raw_exp = token_payload.get("expires_at") or token_payload.get("expires_in")
+    if isinstance(raw_exp, (int, float)):
+        # Strava returns epoch seconds as `expires_at`, other providers may return `expires_in`.
+        if raw_exp > 2_000_000_000:
+            dt = datetime.fromtimestamp(raw_exp / 1000, tz=timezone.utc)
+        elif raw_exp > 100_000_000:
+            dt = datetime.fromtimestamp(raw_exp, tz=timezone.utc)
+        else:
+            dt = datetime.now(timezone.utc) + timedelta(seconds=raw_exp)
+        return dt.isoformat()
+    if isinstance(raw_exp, str) and raw_exp:
+        return raw_exp
+    return None
 
 
 def oauth_ready(provider: str) -> bool:
@@ -1,93 +1,286 @@
 from __future__ import annotations
 
-import json
 import os
-from typing import Any, Dict, List
-from urllib import parse, request
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from urllib import parse
+
+from src.core.jsonstream import iter_json_array
+from src.integrations.http_client import HttpError, get_http_client
+from src.integrations.ratelimit import ProviderUnavailable, governor_for
+
+DEFAULT_STRAVA_API_URL = "https://www.strava.com/api/v3"
+STRAVA_MAX_PER_PAGE = 200
+
+# A bearer token, or a callable returning a currently valid one. Long paginated backfills and
+# webhook batches pass the callable so a token expiring mid-run is refreshed between requests.
+AccessToken = Union[str, Callable[[], str]]
 
 
 class IntegrationError(Exception):
-    pass
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        # Provider HTTP status when the failure was an HTTP error response.
+        self.status = status
 
 
-def _get_json(url: str, access_token: str) -> Any:
-    req = request.Request(
-        url,
-        headers={
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json",
-        },
-    )
-    try:
-        with request.urlopen(req, timeout=20) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except Exception as exc:
-        raise IntegrationError(str(exc)) from exc
+def _auth_headers(access_token: AccessToken) -> Dict[str, str]:
+    token = access_token() if callable(access_token) else access_token
+    return {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+
+
+def _get_json(url: str, access_token: AccessToken, provider: str = "strava") -> Any:
+    # Every provider call passes through the shared governor: it queues requests while the
+    # quota is exhausted, waits out Retry-After on 429s and retries transient 5xx responses.
+    governor = governor_for(provider)
+    attempts = max(1, int(os.getenv("PROVIDER_MAX_ATTEMPTS", "3")))
+    for attempt in range(1, attempts + 1):
+        try:
+            governor.acquire()
+        except ProviderUnavailable as exc:
+            raise IntegrationError(str(exc)) from exc
+        # Resolved after the governor wait, which can outlast the token.
+        headers = _auth_headers(access_token)
+        # Every acquired call must end in record() or record_failure(); otherwise a half-open
+        # breaker never learns how its trial call went.
+        try:
+            resp = get_http_client().request("GET", url, headers=headers)
+        except HttpError as exc:
+            governor.record(exc.status, exc.headers)
+            if attempt < attempts and (exc.status == 429 or exc.status >= 500):
+                if exc.status >= 500:
+                    time.sleep(min(8.0, 0.5 * 2 ** (attempt - 1)))
+                continue
+            raise IntegrationError(str(exc), status=exc.status) from exc
+        except BaseException as exc:
+            governor.record_failure()
+            if not isinstance(exc, Exception):
+                raise
+            raise IntegrationError(str(exc)) from exc
+        governor.record(resp.status, resp.headers)
+        try:
+            return resp.json()
+        except ValueError as exc:
+            raise IntegrationError(f"Invalid JSON from {provider}: {exc}") from exc
+    raise IntegrationError(f"{provider} request failed after {attempts} attempts")
+
+
+def _strava_workout(a: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source": "strava",
+        "external_id": str(a.get("id")),
+        "sport": (a.get("sport_type") or a.get("type") or "running").lower().replace(" ", "_"),
+        "status": "completed",
+        "start_time": a.get("start_date"),
+        "duration_minutes": round((a.get("moving_time") or 0) / 60.0, 1),
+        "distance_km": round((a.get("distance") or 0) / 1000.0, 2),
+        "elevation_gain_m": a.get("total_elevation_gain"),
+        "avg_heart_rate_bpm": a.get("average_heartrate"),
+        "max_heart_rate_bpm": a.get("max_heartrate"),
+        "avg_power_watts": a.get("average_watts"),
+        "normalized_power_watts": a.get("weighted_average_watts"),
+        "avg_cadence": a.get("average_cadence"),
+        "notes": a.get("name"),
+    }
+
+
+def _strava_api_url() -> str:
+    return (os.getenv("STRAVA_API_URL", "").strip() or DEFAULT_STRAVA_API_URL).rstrip("/")
 
 
-def fetch_strava_workouts(access_token: str, kind: str = "completed", per_page: int = 50) -> List[Dict[str, Any]]:
+def _strava_sync_concurrency() -> int:
+    return max(1, int(os.getenv("STRAVA_SYNC_CONCURRENCY", "4")))
+
+
+def _strava_max_pages() -> int:
+    return max(1, int(os.getenv("STRAVA_SYNC_MAX_PAGES", "100")))
+
+
+def _strava_activities_page(access_token: AccessToken, page: int, per_page: int, after: Optional[int]) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {"page": page, "per_page": per_page}
+    if after is not None:
+        params["after"] = after
+    data = _get_json(f"{_strava_api_url()}/athlete/activities?" + parse.urlencode(params), access_token)
+    if not isinstance(data, list):
+        raise IntegrationError("Unexpected Strava activities payload")
+    return data
+
+
+def fetch_strava_workouts(
+    access_token: AccessToken,
+    kind: str = "completed",
+    per_page: int = STRAVA_MAX_PER_PAGE,
+    after: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     if kind == "planned":
         return []
 
+    # Pages are requested in waves of `concurrency` so a full-history backfill overlaps round
+    # trips; the first short page marks the end of the history. Incremental syncs usually fit
+    # in one page, so they probe a single page before widening.
+    concurrency = _strava_sync_concurrency()
+    page_limit = max_pages or _strava_max_pages()
+    wave = 1 if after is not None else concurrency
+    activities: List[Dict[str, Any]] = []
+    next_page = 1
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while next_page <= page_limit:
+            pages = list(range(next_page, min(next_page + wave, page_limit + 1)))
+            results = list(pool.map(lambda p: _strava_activities_page(access_token, p, per_page, after), pages))
+            exhausted = False
+            for batch in results:
+                activities.extend(batch)
+                if len(batch) < per_page:
+                    exhausted = True
+                    break
+            if exhausted:
+                break
+            next_page = pages[-1] + 1
+            wave = concurrency
+
+    return [_strava_workout(a) for a in activities]
+
+
+def fetch_strava_activity(access_token: AccessToken, activity_id: str) -> Dict[str, Any]:
+    data = _get_json(f"{_strava_api_url()}/activities/{parse.quote(str(activity_id))}", access_token)
+    if not isinstance(data, dict):
+        raise IntegrationError("Unexpected Strava activity payload")
+    return _strava_workout(data)
+
+
+STRAVA_STREAM_KEYS = {
+    "heartrate": "heart_rate",
+    "watts": "power",
+    "cadence": "cadence",
+    "altitude": "altitude",
+    "velocity_smooth": "speed",
+}
+
+
+def fetch_strava_streams(access_token: AccessToken, activity_id: str) -> Dict[str, List[Optional[float]]]:
+    keys = ",".join(["time", *STRAVA_STREAM_KEYS])
     url = (
-        "https://www.strava.com/api/v3/athlete/activities?"
-        + parse.urlencode({"page": 1, "per_page": per_page})
+        f"{_strava_api_url()}/activities/{parse.quote(str(activity_id))}/streams?"
+        + parse.urlencode({"keys": keys, "key_by_type": "true"})
     )
-    activities = _get_json(url, access_token)
-
-    workouts: List[Dict[str, Any]] = []
-    for a in activities:
-        workouts.append(
-            {
-                "source": "strava",
-                "external_id": str(a.get("id")),
-                "sport": (a.get("sport_type") or a.get("type") or "running").lower().replace(" ", "_"),
-                "status": "completed",
-                "start_time": a.get("start_date"),
-                "duration_minutes": round((a.get("moving_time") or 0) / 60.0, 1),
-                "distance_km": round((a.get("distance") or 0) / 1000.0, 2),
-                "elevation_gain_m": a.get("total_elevation_gain"),
-                "avg_heart_rate_bpm": a.get("average_heartrate"),
-                "max_heart_rate_bpm": a.get("max_heartrate"),
-                "avg_power_watts": a.get("average_watts"),
-                "normalized_power_watts": a.get("weighted_average_watts"),
-                "avg_cadence": a.get("average_cadence"),
-                "notes": a.get("name"),
-            }
-        )
-    return workouts
-
-
-def fetch_garmin_workouts(access_token: str, kind: str = "completed") -> List[Dict[str, Any]]:
+    data = _get_json(url, access_token)
+    if isinstance(data, list):
+        data = {item.get("type"): item for item in data if isinstance(item, dict)}
+    if not isinstance(data, dict):
+        raise IntegrationError("Unexpected Strava streams payload")
+    out: Dict[str, List[Optional[float]]] = {}
+    time_stream = data.get("time")
+    if isinstance(time_stream, dict) and isinstance(time_stream.get("data"), list):
+        out["time"] = time_stream["data"]
+    for strava_key, stream_type in STRAVA_STREAM_KEYS.items():
+        stream = data.get(strava_key)
+        if isinstance(stream, dict) and isinstance(stream.get("data"), list):
+            out[stream_type] = stream["data"]
+    return out
+
+
+def latest_start_epoch(workouts: List[Dict[str, Any]]) -> Optional[int]:
+    latest: Optional[int] = None
+    for w in workouts:
+        raw = w.get("start_time")
+        if not raw:
+            continue
+        try:
+            ts = int(datetime.fromisoformat(str(raw).replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            continue
+        if latest is None or ts > latest:
+            latest = ts
+    return latest
+
+
+def _garmin_workout(w: Any, kind: str) -> Optional[Dict[str, Any]]:
+    if not isinstance(w, dict):
+        return None
+    sport = w.get("sport") or "running"
+    if not isinstance(sport, str):
+        return None
+
+    def _num(key: str) -> Optional[float]:
+        value = w.get(key)
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        "source": "garmin_connect",
+        "external_id": str(w.get("external_id") or ""),
+        "sport": sport.lower(),
+        "status": kind,
+        "start_time": w.get("start_time") if isinstance(w.get("start_time"), str) else None,
+        "duration_minutes": _num("duration_minutes"),
+        "distance_km": _num("distance_km"),
+        "elevation_gain_m": _num("elevation_gain_m"),
+        "avg_heart_rate_bpm": _num("avg_heart_rate_bpm"),
+        "max_heart_rate_bpm": _num("max_heart_rate_bpm"),
+        "avg_power_watts": _num("avg_power_watts"),
+        "normalized_power_watts": _num("normalized_power_watts"),
+        "avg_cadence": _num("avg_cadence"),
+        "notes": w.get("notes") if isinstance(w.get("notes"), str) else None,
+    }
+
+
+def _stream_json_array(url: str, access_token: AccessToken, provider: str) -> Iterator[Any]:
+    governor = governor_for(provider)
+    attempts = max(1, int(os.getenv("PROVIDER_MAX_ATTEMPTS", "3")))
+    for attempt in range(1, attempts + 1):
+        try:
+            governor.acquire()
+        except ProviderUnavailable as exc:
+            raise IntegrationError(str(exc)) from exc
+        # Resolved after the governor wait, which can outlast the token.
+        headers = _auth_headers(access_token)
+        recorded = False
+        try:
+            with get_http_client().stream("GET", url, headers=headers) as resp:
+                governor.record(resp.status, resp.headers)
+                recorded = True
+                yield from iter_json_array(resp.iter_bytes())
+                return
+        except HttpError as exc:
+            # Only raised before the body is read, so retrying cannot duplicate yielded items.
+            governor.record(exc.status, exc.headers)
+            if attempt < attempts and (exc.status == 429 or exc.status >= 500):
+                if exc.status >= 500:
+                    time.sleep(min(8.0, 0.5 * 2 ** (attempt - 1)))
+                continue
+            raise IntegrationError(str(exc), status=exc.status) from exc
+        except BaseException as exc:
+            # Failures after the response started (bad JSON, a reader that stops early) were
+            # already recorded with the response status.
+            if not recorded:
+                governor.record_failure()
+            if not isinstance(exc, Exception):
+                raise
+            raise IntegrationError(str(exc)) from exc
+
+
+def iter_garmin_workouts(access_token: AccessToken, kind: str = "completed") -> Iterator[Dict[str, Any]]:
     # Garmin Connect does not offer a stable public API for direct consumer OAuth.
     # If GARMIN_PROXY_URL is configured, this app can call a partner/proxy endpoint.
     base_url = os.getenv("GARMIN_PROXY_URL", "").strip()
     if not base_url:
-        return []
+        return
+
+    # Planned calendars can be very large: the array is parsed element by element and each
+    # workout is mapped as it arrives, so memory stays flat regardless of response size.
+    url = base_url.rstrip("/") + f"/workouts?kind={parse.quote(kind)}"
+    for raw in _stream_json_array(url, access_token, provider="garmin_connect"):
+        workout = _garmin_workout(raw, kind)
+        if workout is not None:
+            yield workout
 
-    url = base_url.rstrip("/") + f"/workouts?kind={kind}"
-    data = _get_json(url, access_token)
-    if not isinstance(data, list):
-        return []
 
-    workouts: List[Dict[str, Any]] = []
-    for w in data:
-        workouts.append(
-            {
-                "source": "garmin_connect",
-                "external_id": str(w.get("external_id") or ""),
-                "sport": (w.get("sport") or "running").lower(),
-                "status": kind,
-                "start_time": w.get("start_time"),
-                "duration_minutes": w.get("duration_minutes"),
-                "distance_km": w.get("distance_km"),
-                "elevation_gain_m": w.get("elevation_gain_m"),
-                "avg_heart_rate_bpm": w.get("avg_heart_rate_bpm"),
-                "max_heart_rate_bpm": w.get("max_heart_rate_bpm"),
-                "avg_power_watts": w.get("avg_power_watts"),
-                "normalized_power_watts": w.get("normalized_power_watts"),
-                "avg_cadence": w.get("avg_cadence"),
-                "notes": w.get("notes"),
-            }
-        )
-    return workouts
+def fetch_garmin_workouts(access_token: AccessToken, kind: str = "completed") -> List[Dict[str, Any]]:
+    return list(iter_garmin_workouts(access_token, kind))
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from src.observability.metrics import counter, gauge
+
+_QUOTA_LIMIT = gauge("provider_quota_limit", "Provider-reported request quota per window", ("provider", "window"))
+_QUOTA_USAGE = gauge("provider_quota_usage", "Provider-reported requests used in the current window", ("provider", "window"))
+_TOKENS = gauge("provider_ratelimit_tokens", "Tokens left in the local bucket per window", ("provider", "window"))
+_WAIT_SECONDS = counter("provider_ratelimit_wait_seconds_total", "Time provider calls spent queued by the governor", ("provider",))
+_THROTTLED = counter("provider_ratelimit_throttled_total", "Provider responses with status 429", ("provider",))
+_CIRCUIT_OPEN = gauge("provider_circuit_open", "1 while the provider circuit breaker is open", ("provider",))
+
+
+class ProviderUnavailable(Exception):
+    pass
+
+
+@dataclass
+class _Bucket:
+    # Strava quotas are fixed windows aligned to UTC (every quarter hour, midnight for the daily
+    # one), not sliding ones: once a window is used up nothing frees until it rolls over.
+    name: str
+    period_s: float
+    capacity: float
+    tokens: float
+    resets_at: float
+
+    def refill(self, wall: float) -> None:
+        if wall >= self.resets_at:
+            self.tokens = self.capacity
+            self.resets_at = _window_end(wall, self.period_s)
+
+    def wait_time(self, wall: float) -> float:
+        if self.tokens >= 1:
+            return 0.0
+        return max(0.0, self.resets_at - wall)
+
+
+def _window_end(wall: float, period_s: float) -> float:
+    return (wall // period_s + 1) * period_s
+
+
+# Strava's documented defaults (15-minute and daily windows); the live values are taken from the
+# X-RateLimit-* headers as soon as the first response arrives.
+DEFAULT_WINDOWS: Dict[str, List[Tuple[str, float, int]]] = {
+    "strava": [("15min", 900.0, 200), ("daily", 86400.0, 2000)],
+}
+
+
+class ProviderGovernor:
+    def __init__(
+        self,
+        provider: str,
+        windows: List[Tuple[str, float, int]],
+        max_wait_s: float = 60.0,
+        breaker_threshold: int = 5,
+        breaker_cooldown_s: float = 30.0,
+    ) -> None:
+        wall = time.time()
+        self.provider = provider
+        self.max_wait_s = max_wait_s
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown_s = breaker_cooldown_s
+        self._buckets = [
+            _Bucket(name, period, float(limit), float(limit), _window_end(wall, period)) for name, period, limit in windows
+        ]
+        self._cond = threading.Condition()
+        self._blocked_until = 0.0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._half_open_trial = False
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + self.max_wait_s
+        waited = 0.0
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._open_until:
+                    if self._open_until > now:
+                        raise ProviderUnavailable(
+                            f"{self.provider} is failing; retrying after {int(self._open_until - now) + 1}s"
+                        )
+                    if not self._half_open_trial:
+                        # Cooldown elapsed: let a single trial call through before closing the breaker.
+                        self._half_open_trial = True
+                        break
+                    if now >= deadline:
+                        raise ProviderUnavailable(f"{self.provider} is recovering; try again shortly")
+                    self._cond.wait(min(1.0, deadline - now))
+                    waited += time.monotonic() - now
+                    continue
+                wall = time.time()
+                for bucket in self._buckets:
+                    bucket.refill(wall)
+                wait = max([self._blocked_until - now] + [b.wait_time(wall) for b in self._buckets])
+                if wait <= 0:
+                    for bucket in self._buckets:
+                        bucket.tokens -= 1
+                        _TOKENS.set(bucket.tokens, provider=self.provider, window=bucket.name)
+                    break
+                if now + wait > deadline:
+                    raise ProviderUnavailable(
+                        f"{self.provider} rate limit reached; next request allowed in {int(wait) + 1}s"
+                    )
+                self._cond.wait(wait)
+                waited += time.monotonic() - now
+        if waited:
+            _WAIT_SECONDS.inc(waited, provider=self.provider)
+
+    def record(self, status: int, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self._sync_quota(headers, time.time())
+            if status == 429:
+                _THROTTLED.inc(provider=self.provider)
+                self._blocked_until = max(self._blocked_until, now + (retry_after_seconds(headers) or 60.0))
+            if status >= 500:
+                self._failed(now)
+            else:
+                self._consecutive_failures = 0
+                if self._open_until:
+                    self._open_until = 0.0
+                    _CIRCUIT_OPEN.set(0, provider=self.provider)
+            self._half_open_trial = False
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        # A call that produced no response (connection error, timeout, pool exhaustion): counts
+        # toward the breaker like a 5xx and always ends a half-open trial.
+        now = time.monotonic()
+        with self._cond:
+            self._failed(now)
+            self._half_open_trial = False
+            self._cond.notify_all()
+
+    def _failed(self, now: float) -> None:
+        self._consecutive_failures += 1
+        if self._half_open_trial or self._consecutive_failures >= self.breaker_threshold:
+            self._open_until = now + self.breaker_cooldown_s
+            _CIRCUIT_OPEN.set(1, provider=self.provider)
+
+    def _sync_quota(self, headers: Mapping[str, str], wall: float) -> None:
+        limits = _csv_ints(headers.get("x-ratelimit-limit"))
+        usage = _csv_ints(headers.get("x-ratelimit-usage"))
+        for idx, bucket in enumerate(self._buckets):
+            if idx < len(limits) and limits[idx] > 0:
+                bucket.capacity = float(limits[idx])
+                _QUOTA_LIMIT.set(limits[idx], provider=self.provider, window=bucket.name)
+            if idx < len(usage):
+                # The provider's usage counter is authoritative: it includes our other workers. It
+                # counts the current window, so a spent window blocks until its reset boundary.
+                bucket.refill(wall)
+                bucket.tokens = bucket.capacity - usage[idx]
+                _QUOTA_USAGE.set(usage[idx], provider=self.provider, window=bucket.name)
+                _TOKENS.set(bucket.tokens, provider=self.provider, window=bucket.name)
+
+    def state(self) -> Dict[str, object]:
+        now = time.monotonic()
+        wall = time.time()
+        with self._cond:
+            for bucket in self._buckets:
+                bucket.refill(wall)
+            return {
+                "provider": self.provider,
+                "windows": {
+                    b.name: {"capacity": b.capacity, "tokens": round(b.tokens, 2), "resets_in_s": round(b.resets_at - wall, 1)}
+                    for b in self._buckets
+                },
+                "blocked_for_s": round(max(0.0, self._blocked_until - now), 1),
+                "circuit_open": self._open_until > now,
+                "consecutive_failures": self._consecutive_failures,
+            }
+
+
+def _csv_ints(raw: Optional[str]) -> List[int]:
+    if not raw:
+        return []
+    out: List[int] = []
+    for part in raw.split(","):
+        try:
+            out.append(int(part.strip()))
+        except ValueError:
+            return []
+    return out
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(raw).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_governors: Dict[str, ProviderGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def governor_for(provider: str) -> ProviderGovernor:
+    with _governors_lock:
+        gov = _governors.get(provider)
+        if gov is None:
+            gov = ProviderGovernor(
+                provider,
+                DEFAULT_WINDOWS.get(provider, []),
+                max_wait_s=float(os.getenv("PROVIDER_MAX_QUEUE_WAIT_S", "60")),
+                breaker_threshold=int(os.getenv("PROVIDER_BREAKER_THRESHOLD", "5")),
+                breaker_cooldown_s=float(os.getenv("PROVIDER_BREAKER_COOLDOWN_S", "30")),
+            )
+            _governors[provider] = gov
+        return gov
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.core.stream_metrics import compute_stream_metrics
+from src.core.streams import STREAM_TYPES, has_samples, resample_1hz, validate_stream_payload
+from src.integrations.providers import AccessToken, IntegrationError, fetch_strava_streams
+from src.integrations.tokens import valid_access_token
+from src.observability.metrics import counter, histogram
+from src.storage.profile import get_profile
+from src.storage.streams import read_streams, save_streams
+from src.storage.workouts import get_workout, set_workout_stream_metrics
+
+logger = logging.getLogger(__name__)
+
+_METRIC_RUNS = counter("stream_metrics_runs_total", "Stream-derived workout metric computations by outcome", ("outcome",))
+_METRIC_SECONDS = histogram("stream_metrics_seconds", "Time to read streams and compute derived workout metrics")
+
+
+def compute_workout_metrics(user_id: int, workout_id: int) -> Optional[Dict[str, Any]]:
+    workout = get_workout(user_id, workout_id)
+    if workout is None:
+        return None
+    streams = read_streams(user_id, workout_id, STREAM_TYPES)
+    if not streams:
+        return {}
+    metrics = compute_stream_metrics(streams, workout["sport"], get_profile(user_id))
+    set_workout_stream_metrics(user_id, workout_id, metrics)
+    return metrics
+
+
+class StreamMetricsWorker:
+    def __init__(self, max_workers: int = 1) -> None:
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued: Set[Tuple[int, int]] = set()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stream-metrics")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._queued.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, user_id: int, workout_id: int) -> None:
+        key = (user_id, workout_id)
+        with self._lock:
+            if self._executor is not None:
+                # A workout already waiting in the queue will read the newest streams when it runs.
+                if key not in self._queued:
+                    self._queued.add(key)
+                    self._executor.submit(self._run, key)
+                return
+        # Not started (scripts, one-off backfills): compute inline.
+        self._compute(key)
+
+    def _run(self, key: Tuple[int, int]) -> None:
+        with self._lock:
+            self._queued.discard(key)
+        self._compute(key)
+
+    def _compute(self, key: Tuple[int, int]) -> None:
+        started = time.perf_counter()
+        try:
+            compute_workout_metrics(*key)
+        except Exception:
+            logger.exception("Stream metrics for workout %s failed", key[1])
+            _METRIC_RUNS.inc(outcome="error")
+            return
+        _METRIC_SECONDS.observe(time.perf_counter() - started)
+        _METRIC_RUNS.inc(outcome="ok")
+
+
+stream_metrics_worker = StreamMetricsWorker(max_workers=max(1, int(os.getenv("STREAM_METRICS_WORKERS", "1"))))
+
+
+def ingest_streams(user_id: int, workout_id: int, payload: Dict[str, Sequence[Optional[float]]]) -> Dict[str, int]:
+    # `time` (seconds from start) is optional: without it samples are taken to be 1 Hz already.
+    times = payload.get("time")
+    streams = validate_stream_payload(payload)
+    prepared: Dict[str, List[float]] = {}
+    for stream_type, values in streams.items():
+        if times is not None:
+            if len(times) != len(values):
+                raise ValueError(f"Stream {stream_type} has {len(values)} samples but time has {len(times)}")
+            series = resample_1hz(times, values)
+        else:
+            series = [float("nan") if v is None else float(v) for v in values]
+        if has_samples(series):
+            prepared[stream_type] = series
+    if not prepared:
+        return {}
+    counts = save_streams(user_id, workout_id, prepared)
+    stream_metrics_worker.submit(user_id, workout_id)
+    return counts
+
+
+def import_strava_streams(user_id: int, workout: Dict[str, Any], access_token: Optional[AccessToken] = None) -> Dict[str, int]:
+    if workout.get("source") != "strava" or not workout.get("external_id"):
+        raise IntegrationError("Workout is not linked to a Strava activity")
+    token = access_token or valid_access_token(user_id, "strava")
+    raw = fetch_strava_streams(token, str(workout["external_id"]))
+    if "time" not in raw:
+        return {}
+    return ingest_streams(user_id, int(workout["id"]), raw)
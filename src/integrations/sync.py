@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Callable, Dict, Optional
+
+from src.integrations.connectors import iter_pulled_workouts
+from src.integrations.providers import latest_start_epoch
+from src.integrations.tokens import valid_access_token
+from src.storage.integrations import get_sync_cursor, set_sync_cursor
+from src.storage.workouts import add_workouts, dedupe_all_workouts
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def run_provider_sync(
+    user_id: int,
+    provider: str,
+    kind: str,
+    full: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    chunk_size: int = 500,
+) -> Dict[str, Any]:
+    # Fails fast when the provider is not connected; afterwards every page request re-reads the
+    # token, so a backfill outliving the access token refreshes it instead of failing on a 401.
+    valid_access_token(user_id, provider)
+
+    # Without a cursor (first sync or `full=True`) the provider history is backfilled;
+    # afterwards only activities newer than the last imported start time are requested.
+    after = None if full else get_sync_cursor(user_id, provider, kind)
+    pulled = iter_pulled_workouts(
+        provider=provider,
+        access_token=lambda: valid_access_token(user_id, provider),
+        kind=kind,
+        after=after,
+    )
+
+    fetched = 0
+    synced = 0
+    cursor: Optional[int] = None
+    while True:
+        chunk = list(islice(pulled, chunk_size))
+        if not chunk:
+            break
+        fetched += len(chunk)
+        for item in chunk:
+            item["status"] = kind
+        synced += add_workouts(user_id, chunk, chunk_size=chunk_size)
+        latest = latest_start_epoch(chunk)
+        if latest is not None and (cursor is None or latest > cursor):
+            cursor = latest
+        if progress:
+            progress(fetched, synced)
+
+    if provider != "strava":
+        cursor = None
+    if cursor is not None:
+        set_sync_cursor(user_id, provider, kind, cursor)
+    if progress:
+        progress(fetched, synced)
+    return {"fetched": fetched, "synced": synced, "after": after, "cursor": cursor or after}
+
+
+PROVIDER_SYNC_JOB = "provider_sync"
+
+
+def provider_sync_job(job: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    return run_provider_sync(
+        user_id=job["user_id"],
+        provider=job["provider"],
+        kind=job["kind"],
+        full=bool(job["params"].get("full")),
+        progress=progress,
+    )
+
+
+WORKOUT_DEDUPE_JOB = "workout_dedupe"
+
+
+def workout_dedupe_job(job: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    return dedupe_all_workouts(job["user_id"], progress=progress)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from src.integrations.oauth import OAuthError, refresh_access_token, token_expiry_iso
+from src.integrations.providers import IntegrationError
+from src.observability.metrics import counter
+from src.storage.integrations import get_token, list_refreshable_tokens, upsert_token
+
+logger = logging.getLogger(__name__)
+
+_REFRESHES = counter("oauth_token_refresh_total", "OAuth token refreshes by outcome", ("provider", "outcome"))
+
+
+def _refresh_skew() -> timedelta:
+    return timedelta(seconds=float(os.getenv("TOKEN_REFRESH_SKEW_S", "120")))
+
+
+def _expires_at(token: Dict[str, Any]) -> Optional[datetime]:
+    raw = token.get("expires_at")
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _expires_within(token: Dict[str, Any], window: timedelta) -> bool:
+    expires_at = _expires_at(token)
+    return expires_at is not None and expires_at - window <= datetime.now(timezone.utc)
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    access_token: Optional[str] = None
+    error: Optional[Exception] = None
+
+
+_inflight: Dict[Tuple[int, str], _Flight] = {}
+_inflight_lock = threading.Lock()
+
+
+def _refresh(user_id: int, provider: str, window: timedelta) -> str:
+    # Single flight: the first caller for a user/provider performs the refresh, concurrent callers
+    # wait for its result instead of spending the refresh token again.
+    key = (user_id, provider)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            _inflight[key] = flight
+    assert flight is not None
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return str(flight.access_token)
+
+    try:
+        flight.access_token = _refresh_now(user_id, provider, window)
+        return flight.access_token
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+def _refresh_now(user_id: int, provider: str, window: timedelta) -> str:
+    token = get_token(user_id, provider)
+    if token is None:
+        raise IntegrationError(f"{provider} is not connected")
+    # Another worker may have refreshed it while we were waiting.
+    if not _expires_within(token, window):
+        return str(token["access_token"])
+    if not token.get("refresh_token"):
+        raise IntegrationError(f"{provider} token expired; reconnect the integration")
+
+    try:
+        payload = refresh_access_token(provider, str(token["refresh_token"]))
+    except OAuthError as exc:
+        _REFRESHES.inc(provider=provider, outcome="error")
+        raise IntegrationError(f"{provider} token refresh failed: {exc}") from exc
+    access_token = str(payload.get("access_token") or "")
+    if not access_token:
+        _REFRESHES.inc(provider=provider, outcome="error")
+        raise IntegrationError(f"{provider} token refresh returned no access token")
+
+    upsert_token(
+        user_id=user_id,
+        provider=provider,
+        access_token=access_token,
+        refresh_token=str(payload.get("refresh_token") or token["refresh_token"]),
+        expires_at=token_expiry_iso(payload),
+    )
+    _REFRESHES.inc(provider=provider, outcome="ok")
+    return access_token
+
+
+def valid_access_token(user_id: int, provider: str) -> str:
+    token = get_token(user_id, provider)
+    if token is None:
+        raise IntegrationError(f"{provider} is not connected")
+    if not _expires_within(token, _refresh_skew()):
+        return str(token["access_token"])
+    return _refresh(user_id, provider, _refresh_skew())
+
+
+class TokenRefresher:
+    def __init__(self, interval_s: float = 60.0, ahead_s: float = 900.0) -> None:
+        self.interval_s = interval_s
+        self.ahead = timedelta(seconds=ahead_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="token-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def run_once(self) -> int:
+        refreshed = 0
+        for token in list_refreshable_tokens():
+            if not _expires_within(token, self.ahead):
+                continue
+            try:
+                _refresh(int(token["user_id"]), str(token["provider"]), self.ahead)
+                refreshed += 1
+            except IntegrationError as exc:
+                logger.warning("Background refresh failed for user %s/%s: %s", token["user_id"], token["provider"], exc)
+        return refreshed
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Token refresher pass failed")
+
+
+token_refresher = TokenRefresher(
+    interval_s=float(os.getenv("TOKEN_REFRESH_INTERVAL_S", "60")),
+    ahead_s=float(os.getenv("TOKEN_REFRESH_AHEAD_S", "900")),
+)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.activity_files import ActivityFileError, parse_activity_file
+from src.integrations.streams import ingest_streams
+from src.observability.metrics import counter
+from src.storage.workouts import get_workout_by_external_id, upsert_external_workout
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FILE_SOURCE = "file"
+
+_FILES = counter("activity_file_imports_total", "Uploaded activity files by format and outcome", ("format", "outcome"))
+
+
+class ActivityFileImporter:
+    # Parsing is CPU-bound pure Python, so files fan out over a process pool; results come back as
+    # typed arrays (cheap to pickle) and are written to SQLite from the request thread.
+    def __init__(self, max_workers: int = 2) -> None:
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process runs several background threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def import_files(
+        self,
+        user_id: int,
+        files: List[Tuple[str, str, str]],
+        default_sport: str = "cycling",
+    ) -> List[Dict[str, Any]]:
+        # files: (path on disk, original filename, content digest). The digest is the workout's
+        # external id, so re-uploading the same archive updates rather than duplicates.
+        pool = self._pool()
+        futures: Dict[Future, Tuple[int, str, str]] = {}
+        for idx, (path, filename, digest) in enumerate(files):
+            futures[pool.submit(parse_activity_file, path, filename, default_sport)] = (idx, filename, digest)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        for future in as_completed(futures):
+            idx, filename, digest = futures[future]
+            try:
+                parsed = future.result()
+            except BrokenProcessPool:
+                self._reset(pool)
+                results[idx] = {"filename": filename, "status": "failed", "error": "Parser worker crashed"}
+                _FILES.inc(format="unknown", outcome="failed")
+                continue
+            except Exception as exc:
+                if not isinstance(exc, ActivityFileError):
+                    logger.exception("Parsing %s failed", filename)
+                results[idx] = {"filename": filename, "status": "failed", "error": str(exc)}
+                _FILES.inc(format=filename.rsplit(".", 1)[-1].lower(), outcome="failed")
+                continue
+            results[idx] = _store_parsed(user_id, filename, digest, parsed)
+            _FILES.inc(format=parsed["format"], outcome=results[idx]["status"])
+        return [r for r in results if r is not None]
+
+
+def _store_parsed(user_id: int, filename: str, digest: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    existing = get_workout_by_external_id(user_id, ACTIVITY_FILE_SOURCE, digest)
+    payload = {
+        **parsed["workout"],
+        "source": ACTIVITY_FILE_SOURCE,
+        "external_id": digest,
+        "notes": os.path.basename(filename),
+    }
+    workout = upsert_external_workout(user_id, payload)
+    try:
+        counts = ingest_streams(user_id, int(workout["id"]), parsed["streams"])
+    except ValueError as exc:
+        logger.warning("Streams from %s not stored: %s", filename, exc)
+        counts = {}
+    return {
+        "filename": filename,
+        "status": "updated" if existing else "imported",
+        "workout_id": workout["id"],
+        "format": parsed["format"],
+        "samples": max(counts.values(), default=0),
+    }
+
+
+activity_file_importer = ActivityFileImporter(
+    max_workers=max(1, int(os.getenv("WORKOUT_IMPORT_WORKERS", str(min(4, os.cpu_count() or 1)))))
+)
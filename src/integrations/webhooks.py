@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.integrations.providers import IntegrationError, fetch_strava_activity
+from src.integrations.streams import import_strava_streams
+from src.integrations.tokens import valid_access_token
+from src.observability.metrics import counter
+from src.storage.integrations import delete_token, find_user_by_external_id
+from src.storage.webhooks import (
+    claim_webhook_events,
+    complete_webhook_events,
+    release_webhook_events,
+    requeue_processing_webhook_events,
+)
+from src.storage.workouts import delete_external_workout, upsert_external_workout
+
+logger = logging.getLogger(__name__)
+
+_EVENTS = counter("strava_webhook_events_total", "Strava webhook events processed by outcome", ("outcome",))
+_FETCHES = counter("strava_webhook_activity_fetches_total", "Activities fetched for webhook batches")
+
+
+def _streams_on_webhook() -> bool:
+    return os.getenv("STRAVA_STREAMS_ON_WEBHOOK", "1").strip().lower() not in {"0", "false", "no"}
+
+
+def _apply_athlete_events(user_id: int, events: List[Dict[str, Any]]) -> None:
+    for event in events:
+        if event["object_type"] == "athlete" and str(event["updates"].get("authorized", "")).lower() == "false":
+            delete_token(user_id, "strava")
+            return
+
+    # Collapse every event for an activity into its final state, so a create followed by a few
+    # title edits costs one fetch and a create followed by a delete costs one confirming fetch.
+    final: "OrderedDict[str, str]" = OrderedDict()
+    for event in events:
+        if event["object_type"] != "activity":
+            continue
+        previous = final.pop(event["object_id"], None)
+        aspect = event["aspect_type"]
+        if aspect == "update" and previous == "create":
+            aspect = "create"
+        final[event["object_id"]] = aspect
+
+    # The pull-sync cursor is left alone: pushes can arrive before the first (backfilling) sync and
+    # are not guaranteed to cover every activity since the last one.
+    # Re-read per request: a large batch can outlive the access token.
+    def access_token() -> str:
+        return valid_access_token(user_id, "strava")
+
+    for activity_id, aspect in final.items():
+        try:
+            workout = fetch_strava_activity(access_token, activity_id)
+        except IntegrationError as exc:
+            # A pushed delete is only applied once Strava itself no longer has the activity.
+            if aspect == "delete" and exc.status == 404:
+                delete_external_workout(user_id, "strava", activity_id)
+                continue
+            raise
+        _FETCHES.inc()
+        if aspect == "delete":
+            logger.warning("Ignoring Strava delete for activity %s that still exists", activity_id)
+            aspect = "update"
+        stored = upsert_external_workout(user_id, workout)
+        if aspect == "create" and _streams_on_webhook():
+            # Streams are a nice-to-have; a failed fetch must not replay the whole batch.
+            try:
+                import_strava_streams(user_id, stored, access_token=access_token)
+            except (IntegrationError, ValueError) as exc:
+                logger.warning("Strava streams for activity %s not imported: %s", activity_id, exc)
+
+
+class StravaWebhookProcessor:
+    def __init__(
+        self,
+        interval_s: float = 2.0,
+        batch_size: int = 200,
+        max_attempts: int = 5,
+        retry_backoff_s: float = 30.0,
+        retry_max_backoff_s: float = 3600.0,
+    ) -> None:
+        self.interval_s = interval_s
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff_s = retry_backoff_s
+        self.retry_max_backoff_s = retry_max_backoff_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        requeue_processing_webhook_events()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="strava-webhooks", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def run_once(self) -> int:
+        events = claim_webhook_events("strava", limit=self.batch_size)
+        by_owner: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_owner.setdefault(event["owner_id"], []).append(event)
+
+        for owner_id, owner_events in by_owner.items():
+            ids = [e["id"] for e in owner_events]
+            # Any failure is contained to this athlete's events: the rest of the claimed batch must
+            # not be left in `processing` until the next restart.
+            try:
+                user_id = find_user_by_external_id("strava", owner_id)
+                if user_id is None:
+                    complete_webhook_events(ids, status="skipped", error="unknown athlete")
+                    _EVENTS.inc(len(ids), outcome="skipped")
+                    continue
+                _apply_athlete_events(user_id, owner_events)
+            except IntegrationError as exc:
+                self._release(ids, str(exc))
+                continue
+            except Exception as exc:
+                logger.exception("Strava webhook events for athlete %s failed", owner_id)
+                self._release(ids, f"{type(exc).__name__}: {exc}")
+                continue
+            complete_webhook_events(ids)
+            _EVENTS.inc(len(ids), outcome="done")
+        return len(events)
+
+    def _release(self, ids: List[int], error: str) -> None:
+        try:
+            release_webhook_events(
+                ids,
+                error,
+                max_attempts=self.max_attempts,
+                backoff_s=self.retry_backoff_s,
+                max_backoff_s=self.retry_max_backoff_s,
+            )
+        except Exception:
+            # Left in `processing`; start() requeues them after a restart.
+            logger.exception("Could not release Strava webhook events %s", ids)
+            return
+        _EVENTS.inc(len(ids), outcome="retry")
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                # Drain the backlog in consecutive batches before sleeping again.
+                while self.run_once() >= self.batch_size and not self._stop.is_set():
+                    pass
+            except Exception:
+                logger.exception("Strava webhook batch failed")
+
+
+strava_webhook_processor = StravaWebhookProcessor(
+    interval_s=float(os.getenv("STRAVA_WEBHOOK_BATCH_INTERVAL_S", "2")),
+    batch_size=int(os.getenv("STRAVA_WEBHOOK_BATCH_SIZE", "200")),
+    retry_backoff_s=float(os.getenv("STRAVA_WEBHOOK_RETRY_BACKOFF_S", "30")),
+    retry_max_backoff_s=float(os.getenv("STRAVA_WEBHOOK_RETRY_MAX_BACKOFF_S", "3600")),
+)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from types import FrameType, ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+# Leaf frames of threads that are parked rather than working: the event loop waiting on sockets,
+# threadpool workers waiting for a task, background loops sleeping on an Event.
+IDLE_LEAVES = frozenset(
+    {
+        "selectors:EpollSelector.select",
+        "selectors:KqueueSelector.select",
+        "selectors:PollSelector.select",
+        "selectors:SelectSelector.select",
+        "threading:Condition.wait",
+        "threading:Event.wait",
+        "threading:Thread._wait_for_tstate_lock",
+        "queue:Queue.get",
+        "concurrent.futures.thread:_worker",
+    }
+)
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _c_label(fn: Any) -> str:
+    # Builtin functions carry __module__; C methods bound to an instance only carry __self__.
+    module = getattr(fn, "__module__", None)
+    owner = getattr(fn, "__self__", None)
+    if module is None and owner is not None and not isinstance(owner, ModuleType):
+        module = type(owner).__module__
+    return f"{module or 'builtins'}:{getattr(fn, '__qualname__', repr(fn))}"
+
+
+def _stack(frame: Optional[FrameType]) -> Tuple[str, ...]:
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+def collapse(stacks: Counter) -> str:
+    # Brendan Gregg's collapsed format, heaviest first: flamegraph.pl and speedscope read it as is.
+    lines = [f"{';'.join(stack)} {weight}" for stack, weight in stacks.most_common() if weight > 0]
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+_sampling = threading.Lock()
+
+
+def sample_stacks(seconds: float, interval_s: float = 0.01, include_idle: bool = False) -> Counter:
+    # Samples every thread of this process except the caller. Each sample costs one walk of each
+    # thread's frames under the GIL; at the default 100 Hz that stays well under 1% of a core.
+    # Blocks for `seconds`; only one sampler runs at a time.
+    if not _sampling.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being recorded")
+    try:
+        own = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + min(seconds, PROFILE_MAX_SECONDS)
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame)
+                if not include_idle and stack and stack[-1] in IDLE_LEAVES:
+                    continue
+                stacks[(names.get(ident, f"thread-{ident}"),) + stack] += 1
+            time.sleep(interval_s)
+        return stacks
+    finally:
+        _sampling.release()
+
+
+class _CallTimer:
+    # sys.setprofile hook for one thread: attributes the time between consecutive events to the
+    # stack that was current, so weights are exact self-times in microseconds.
+    def __init__(self) -> None:
+        self.stack: list = []
+        self.totals: Counter = Counter()
+        self.last = time.perf_counter_ns()
+
+    def __call__(self, frame: FrameType, event: str, arg: Any) -> None:
+        now = time.perf_counter_ns()
+        if self.stack:
+            self.totals[tuple(self.stack)] += now - self.last
+        if event == "call":
+            self.stack.append(_label(frame))
+        elif event == "c_call":
+            self.stack.append(_c_label(arg))
+        elif self.stack:
+            self.stack.pop()
+        self.last = time.perf_counter_ns()
+
+
+def trace_call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> Tuple[T, Counter]:
+    # Deterministic, so a single short call still yields a full profile. Roughly 2-4x slower than
+    # untraced; meant for one opted-in request, never for the whole worker.
+    timer = _CallTimer()
+    previous = sys.getprofile()
+    sys.setprofile(timer)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        sys.setprofile(previous)
+    micros: Counter = Counter()
+    for stack, nanos in timer.totals.items():
+        micros[stack] += nanos // 1000
+    return result, micros
+
+
+class ProfileStore:
+    # Recent per-request profiles, fetched by id from the admin endpoint.
+    def __init__(self, keep: int = PROFILE_KEEP) -> None:
+        self.keep = max(1, keep)
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, user_id: int, stacks: Counter) -> str:
+        profile_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._profiles[profile_id] = {"kind": kind, "user_id": user_id, "collapsed": collapse(stacks)}
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profiles = ProfileStore()
@@ -5,13 +5,13 @@ import sqlite3
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
-from src.storage.db import get_db_path
+from pydantic_core import to_json
+
+from src.storage.db import connect
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
@@ -50,11 +50,13 @@ def write_audit(recommendation_id: str, user_id: int, user_email: str, payload:
             INSERT INTO recommendation_audit (recommendation_id, user_id, user_email, created_at, payload_json)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (recommendation_id, user_id, user_email, record["timestamp"], json.dumps(record)),
+            # payload may hold pydantic models; to_json encodes them without a model_dump() copy.
+            (recommendation_id, user_id, user_email, record["timestamp"], to_json(record).decode("utf-8")),
         )
 
 
-def read_audit(user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+def read_audit_rows(user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+    # payload_json is left encoded so the API can splice it into the response as-is.
     with _conn() as conn:
         rows = conn.execute(
             """
@@ -66,17 +68,12 @@ def read_audit(user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
             """,
             (user_id, limit),
         ).fetchall()
+    return [dict(row) for row in rows]
+
 
+def read_audit(user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
     output: List[Dict[str, Any]] = []
-    for row in rows:
-        payload = json.loads(row["payload_json"])
-        output.append(
-            {
-                "recommendation_id": row["recommendation_id"],
-                "user_id": row["user_id"],
-                "user_email": row["user_email"],
-                "created_at": row["created_at"],
-                "payload": payload,
-            }
-        )
+    for row in read_audit_rows(user_id, limit):
+        payload = json.loads(row.pop("payload_json"))
+        output.append({**row, "payload": payload})
     return output
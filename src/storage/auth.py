@@ -11,7 +11,7 @@ from typing import Any, Dict, Optional
 
 import jwt
 
-from src.storage.db import get_db_path
+from src.storage.db import connect
 
 JWT_ALG = "HS256"
 JWT_TTL_HOURS = 24 * 14
@@ -22,9 +22,7 @@ def _jwt_secret() -> str:
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def init_auth_db() -> None:
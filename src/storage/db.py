@@ -1,9 +1,124 @@
 from __future__ import annotations
 
 import os
+import sqlite3
+import sys
+import time
 from pathlib import Path
+from typing import Any, List, Optional
+
+from src.observability.metrics import counter, gauge, histogram
+from src.storage.tracing import QueryTrace, tracer
+
+_QUERY_SECONDS = histogram(
+    "sqlite_query_seconds",
+    "SQLite statement execution time by calling storage function",
+    ("function",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+_CONNECTIONS_OPENED = counter("sqlite_connections_opened_total", "SQLite connections opened")
+_CONNECTIONS_OPEN = gauge("sqlite_connections_open", "SQLite connections not yet closed or garbage-collected")
 
 
 def get_db_path() -> Path:
     raw = os.getenv("DB_PATH", "audit.sqlite3").strip()
     return Path(raw)
+
+
+def _caller() -> str:
+    # The storage function that issued the statement, e.g. "workouts.list_workouts".
+    frame = sys._getframe(2)
+    return f"{frame.f_globals.get('__name__', '?').rpartition('.')[2]}.{frame.f_code.co_name}"
+
+
+class TracedCursor(sqlite3.Cursor):
+    # Adds fetch time and fetched rows to the statement's trace, so slow-query tracing sees the
+    # whole cost of a SELECT rather than only its first step.
+    _trace: Optional[QueryTrace] = None
+    _sql = ""
+    _parameters: Any = ()
+
+    def _fetched(self, started: float, rows: int) -> None:
+        if self._trace is not None:
+            self._trace.fetched(self.connection, self._sql, self._parameters, time.perf_counter() - started, rows)
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0)
+            raise
+        self._fetched(started, 1)
+        return row
+
+
+class MeteredConnection(sqlite3.Connection):
+    # Times every statement per calling storage function. For SELECTs the histogram covers the
+    # first step (planning, sorting, first row); the slow-query tracer also counts the fetches.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._open = True
+        _CONNECTIONS_OPENED.inc()
+        _CONNECTIONS_OPEN.inc()
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        cursor = self.cursor(TracedCursor)
+        function = _caller()
+        started = time.perf_counter()
+        try:
+            cursor.execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - started
+            _QUERY_SECONDS.observe(elapsed, function=function)
+        cursor._sql, cursor._parameters = sql, parameters
+        cursor._trace = tracer.begin(self, sql, parameters, function, elapsed, cursor.rowcount)
+        return cursor
+
+    def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+        function = _caller()
+        started = time.perf_counter()
+        try:
+            cursor = super().executemany(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - started
+            _QUERY_SECONDS.observe(elapsed, function=function)
+        # Parameters are an iterator that is now consumed; slow batches are logged without a plan.
+        tracer.begin(self, sql, None, function, elapsed, cursor.rowcount)
+        return cursor
+
+    def close(self) -> None:
+        if self._open:
+            self._open = False
+            _CONNECTIONS_OPEN.dec()
+        super().close()
+
+    def __del__(self) -> None:
+        # Storage modules use `with _conn() as conn:`, which commits but leaves closing to GC.
+        if getattr(self, "_open", False):
+            self._open = False
+            _CONNECTIONS_OPEN.dec()
+
+
+def connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(get_db_path(), factory=MeteredConnection)
+    conn.row_factory = sqlite3.Row
+    return conn
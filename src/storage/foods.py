@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from src.storage.db import get_db_path
+from src.storage.db import connect
+from src.storage.versions import FOODS, bump_version
 
 
 BUILTIN_FOODS: List[Dict[str, Any]] = [
@@ -22,9 +23,7 @@ BUILTIN_FOODS: List[Dict[str, Any]] = [
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def init_food_db() -> None:
@@ -90,14 +89,80 @@ def add_custom_food(user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
             ),
         )
         fid = cursor.lastrowid
+        bump_version(conn, user_id, FOODS)
         row = conn.execute("SELECT * FROM foods WHERE id = ?", (fid,)).fetchone()
     return dict(row)
 
 
+def food_dedupe_key(name: str, serving_desc: str) -> Tuple[str, str]:
+    return " ".join(name.lower().split()), " ".join(serving_desc.lower().split())
+
+
+def _catalog_keys(conn: sqlite3.Connection, user_id: int) -> Set[Tuple[str, str]]:
+    rows = conn.execute(
+        "SELECT name, serving_desc FROM foods WHERE is_builtin = 1 OR user_id = ?",
+        (user_id,),
+    ).fetchall()
+    return {food_dedupe_key(r["name"], r["serving_desc"]) for r in rows}
+
+
+def import_custom_foods(user_id: int, rows: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> Dict[str, int]:
+    # Rows are consumed lazily and written in chunked transactions, so only one chunk plus the
+    # set of catalog keys is held in memory regardless of the import size.
+    inserted = 0
+    duplicates = 0
+    conn = _conn()
+    try:
+        seen = _catalog_keys(conn, user_id)
+        batch: List[Tuple[Any, ...]] = []
+        for payload in rows:
+            key = food_dedupe_key(payload["name"], payload["serving_desc"])
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            batch.append(
+                (
+                    user_id,
+                    payload["name"].strip(),
+                    payload["category"].strip(),
+                    payload["serving_desc"].strip(),
+                    payload["carbs_g"],
+                    payload["sodium_mg"],
+                    payload["fluid_ml"],
+                    payload.get("caffeine_mg", 0),
+                )
+            )
+            if len(batch) >= chunk_size:
+                inserted += _insert_food_chunk(conn, user_id, batch)
+                batch = []
+        if batch:
+            inserted += _insert_food_chunk(conn, user_id, batch)
+    finally:
+        conn.close()
+    return {"inserted": inserted, "duplicates": duplicates}
+
+
+def _insert_food_chunk(conn: sqlite3.Connection, user_id: int, batch: List[Tuple[Any, ...]]) -> int:
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO foods (user_id, name, category, serving_desc, carbs_g, sodium_mg, fluid_ml, caffeine_mg, is_builtin)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            batch,
+        )
+        bump_version(conn, user_id, FOODS)
+    return len(batch)
+
+
 def delete_custom_food(user_id: int, food_id: int) -> bool:
     with _conn() as conn:
         cur = conn.execute("DELETE FROM foods WHERE id = ? AND user_id = ? AND is_builtin = 0", (food_id, user_id))
-        return cur.rowcount > 0
+        if cur.rowcount == 0:
+            return False
+        bump_version(conn, user_id, FOODS)
+        return True
 
 
 def resolve_foods_for_plan(user_id: int, selected_food_ids: Optional[List[int]]) -> List[Dict[str, Any]]:
@@ -4,16 +4,15 @@ import sqlite3
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from src.storage.db import get_db_path
+from src.storage.db import connect
+from src.storage.versions import INTEGRATIONS, bump_version
 
 
 PROVIDERS = ["strava", "garmin_connect"]
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def init_integrations_db() -> None:
@@ -27,10 +26,29 @@ def init_integrations_db() -> None:
                 refresh_token TEXT,
                 expires_at TEXT,
                 updated_at TEXT NOT NULL,
+                external_user_id TEXT,
                 PRIMARY KEY (user_id, provider)
             )
             """
         )
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(integration_tokens)").fetchall()}
+        if "external_user_id" not in cols:
+            conn.execute("ALTER TABLE integration_tokens ADD COLUMN external_user_id TEXT")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_integration_tokens_external ON integration_tokens (provider, external_user_id)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS integration_sync_cursors (
+                user_id INTEGER NOT NULL,
+                provider TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                after_epoch INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, provider, kind)
+            )
+            """
+        )
 
 
 def upsert_token(
@@ -39,21 +57,42 @@ def upsert_token(
     access_token: str,
     refresh_token: Optional[str] = None,
     expires_at: Optional[str] = None,
+    external_user_id: Optional[str] = None,
 ) -> None:
     now = datetime.now(timezone.utc).isoformat()
     with _conn() as conn:
         conn.execute(
             """
-            INSERT INTO integration_tokens (user_id, provider, access_token, refresh_token, expires_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO integration_tokens (user_id, provider, access_token, refresh_token, expires_at, updated_at, external_user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(user_id, provider) DO UPDATE SET
                 access_token=excluded.access_token,
                 refresh_token=excluded.refresh_token,
                 expires_at=excluded.expires_at,
-                updated_at=excluded.updated_at
+                updated_at=excluded.updated_at,
+                external_user_id=COALESCE(excluded.external_user_id, integration_tokens.external_user_id)
             """,
-            (user_id, provider, access_token, refresh_token, expires_at, now),
+            (user_id, provider, access_token, refresh_token, expires_at, now, external_user_id),
         )
+        bump_version(conn, user_id, INTEGRATIONS)
+
+
+def find_user_by_external_id(provider: str, external_user_id: str) -> Optional[int]:
+    with _conn() as conn:
+        row = conn.execute(
+            "SELECT user_id FROM integration_tokens WHERE provider = ? AND external_user_id = ?",
+            (provider, external_user_id),
+        ).fetchone()
+    return int(row["user_id"]) if row else None
+
+
+def delete_token(user_id: int, provider: str) -> bool:
+    with _conn() as conn:
+        cur = conn.execute("DELETE FROM integration_tokens WHERE user_id = ? AND provider = ?", (user_id, provider))
+        if cur.rowcount == 0:
+            return False
+        bump_version(conn, user_id, INTEGRATIONS)
+        return True
 
 
 def get_token(user_id: int, provider: str) -> Optional[Dict[str, Any]]:
@@ -65,6 +104,42 @@ def get_token(user_id: int, provider: str) -> Optional[Dict[str, Any]]:
     return dict(row) if row else None
 
 
+def list_refreshable_tokens() -> List[Dict[str, Any]]:
+    with _conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT user_id, provider, access_token, refresh_token, expires_at, updated_at
+            FROM integration_tokens
+            WHERE refresh_token IS NOT NULL AND expires_at IS NOT NULL
+            """
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_sync_cursor(user_id: int, provider: str, kind: str) -> Optional[int]:
+    with _conn() as conn:
+        row = conn.execute(
+            "SELECT after_epoch FROM integration_sync_cursors WHERE user_id = ? AND provider = ? AND kind = ?",
+            (user_id, provider, kind),
+        ).fetchone()
+    return int(row["after_epoch"]) if row else None
+
+
+def set_sync_cursor(user_id: int, provider: str, kind: str, after_epoch: int) -> None:
+    now = datetime.now(timezone.utc).isoformat()
+    with _conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO integration_sync_cursors (user_id, provider, kind, after_epoch, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, provider, kind) DO UPDATE SET
+                after_epoch=MAX(integration_sync_cursors.after_epoch, excluded.after_epoch),
+                updated_at=excluded.updated_at
+            """,
+            (user_id, provider, kind, after_epoch, now),
+        )
+
+
 def list_connections(user_id: int) -> List[Dict[str, Any]]:
     with _conn() as conn:
         rows = conn.execute(
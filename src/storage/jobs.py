@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.storage.db import connect
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _conn() -> sqlite3.Connection:
+    return connect()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    out = dict(row)
+    out["params"] = json.loads(out.pop("params_json") or "{}")
+    out["result"] = json.loads(out.pop("result_json")) if out.get("result_json") else None
+    return out
+
+
+def init_jobs_db() -> None:
+    with _conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                job_type TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                params_json TEXT,
+                status TEXT NOT NULL,
+                fetched INTEGER NOT NULL DEFAULT 0,
+                synced INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                result_json TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        # At most one active job per user/job type/provider/kind: repeated clicks coalesce.
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_jobs_active
+            ON sync_jobs (user_id, job_type, provider, kind)
+            WHERE status IN ('queued', 'running')
+            """
+        )
+
+
+def enqueue_job(
+    user_id: int,
+    job_type: str,
+    provider: str,
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    now = _now()
+    with _conn() as conn:
+        try:
+            cursor = conn.execute(
+                """
+                INSERT INTO sync_jobs (user_id, job_type, provider, kind, params_json, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)
+                """,
+                (user_id, job_type, provider, kind, json.dumps(params or {}), now, now),
+            )
+            created = True
+            row = conn.execute("SELECT * FROM sync_jobs WHERE id = ?", (cursor.lastrowid,)).fetchone()
+        except sqlite3.IntegrityError:
+            created = False
+            row = conn.execute(
+                """
+                SELECT * FROM sync_jobs
+                WHERE user_id = ? AND job_type = ? AND provider = ? AND kind = ? AND status IN ('queued', 'running')
+                """,
+                (user_id, job_type, provider, kind),
+            ).fetchone()
+    return _job_dict(row), created
+
+
+def get_job(user_id: int, job_id: int) -> Optional[Dict[str, Any]]:
+    with _conn() as conn:
+        row = conn.execute("SELECT * FROM sync_jobs WHERE id = ? AND user_id = ?", (job_id, user_id)).fetchone()
+    return _job_dict(row) if row else None
+
+
+def list_jobs(user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+    with _conn() as conn:
+        rows = conn.execute(
+            "SELECT * FROM sync_jobs WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+    return [_job_dict(r) for r in rows]
+
+
+def claim_job(job_id: int) -> Optional[Dict[str, Any]]:
+    now = _now()
+    with _conn() as conn:
+        cur = conn.execute(
+            "UPDATE sync_jobs SET status = 'running', started_at = ?, updated_at = ? WHERE id = ? AND status = 'queued'",
+            (now, now, job_id),
+        )
+        if cur.rowcount == 0:
+            return None
+        row = conn.execute("SELECT * FROM sync_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row)
+
+
+def update_job_progress(job_id: int, fetched: int, synced: int) -> None:
+    with _conn() as conn:
+        conn.execute(
+            "UPDATE sync_jobs SET fetched = ?, synced = ?, updated_at = ? WHERE id = ?",
+            (fetched, synced, _now(), job_id),
+        )
+
+
+def finish_job(job_id: int, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+    now = _now()
+    with _conn() as conn:
+        conn.execute(
+            """
+            UPDATE sync_jobs
+            SET status = ?, result_json = ?, error = ?, finished_at = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (status, json.dumps(result) if result is not None else None, error, now, now, job_id),
+        )
+
+
+def touch_jobs(job_ids: List[int]) -> None:
+    if not job_ids:
+        return
+    placeholders = ",".join(["?"] * len(job_ids))
+    with _conn() as conn:
+        conn.execute(
+            f"UPDATE sync_jobs SET updated_at = ? WHERE status = 'running' AND id IN ({placeholders})",
+            (_now(), *job_ids),
+        )
+
+
+def requeue_interrupted_jobs(stale_after_s: float = 120.0) -> List[int]:
+    # Running jobs heartbeat through updated_at; only those whose process stopped doing so (a crash
+    # or restart) go back to the queue, never jobs another live worker is still running.
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_s)).isoformat()
+    with _conn() as conn:
+        conn.execute(
+            "UPDATE sync_jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND updated_at < ?",
+            (_now(), cutoff),
+        )
+        rows = conn.execute("SELECT id FROM sync_jobs WHERE status = 'queued' ORDER BY id ASC").fetchall()
+    return [int(r["id"]) for r in rows]
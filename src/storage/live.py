@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from src.storage.db import connect
+
+
+def _conn() -> sqlite3.Connection:
+    return connect()
+
+
+def init_live_db() -> None:
+    with _conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS live_sessions (
+                user_id INTEGER NOT NULL,
+                workout_id INTEGER NOT NULL,
+                request_json TEXT NOT NULL,
+                started_epoch REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, workout_id)
+            )
+            """
+        )
+
+
+def save_live_session(user_id: int, workout_id: int, request_json: str, started_epoch: float) -> None:
+    # One live session per workout; starting again replaces the plan inputs and the clock.
+    with _conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO live_sessions (user_id, workout_id, request_json, started_epoch, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, workout_id) DO UPDATE SET
+                request_json=excluded.request_json,
+                started_epoch=excluded.started_epoch,
+                created_at=excluded.created_at
+            """,
+            (user_id, workout_id, request_json, started_epoch, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+def get_live_session(user_id: int, workout_id: int) -> Optional[Dict[str, Any]]:
+    with _conn() as conn:
+        row = conn.execute(
+            "SELECT * FROM live_sessions WHERE user_id = ? AND workout_id = ?",
+            (user_id, workout_id),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def delete_live_session(user_id: int, workout_id: int) -> bool:
+    with _conn() as conn:
+        cur = conn.execute("DELETE FROM live_sessions WHERE user_id = ? AND workout_id = ?", (user_id, workout_id))
+        return cur.rowcount > 0
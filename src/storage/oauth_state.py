@@ -5,13 +5,11 @@ import sqlite3
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from src.storage.db import get_db_path
+from src.storage.db import connect
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def init_oauth_state_db() -> None:
@@ -4,7 +4,8 @@ import sqlite3
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from src.storage.db import get_db_path
+from src.storage.db import connect
+from src.storage.versions import PROFILE, bump_version
 
 
 DEFAULT_PROFILE: Dict[str, Any] = {
@@ -34,9 +35,7 @@ DEFAULT_PROFILE: Dict[str, Any] = {
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def init_profile_db() -> None:
@@ -154,6 +153,7 @@ def upsert_profile(user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
                 data["gut_training_level"],
             ),
         )
+        bump_version(conn, user_id, PROFILE)
     return get_profile(user_id)
 
 
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import zlib
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.storage.db import connect
+
+STREAM_CHUNK_SAMPLES = 3600
+STREAM_DTYPE = "f"
+
+
+def _conn() -> sqlite3.Connection:
+    return connect()
+
+
+def init_streams_db() -> None:
+    with _conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS workout_streams (
+                workout_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                stream_type TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                start_offset INTEGER NOT NULL,
+                sample_count INTEGER NOT NULL,
+                dtype TEXT NOT NULL,
+                data BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (workout_id, stream_type, chunk_index)
+            )
+            """
+        )
+
+
+def _encode(values: Sequence[float]) -> bytes:
+    # Little-endian float32, zlib-compressed: ~4 bytes/sample before compression instead of a row
+    # per sample.
+    arr = array(STREAM_DTYPE, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return zlib.compress(arr.tobytes(), 6)
+
+
+def _decode(blob: bytes, dtype: str) -> array:
+    arr = array(dtype)
+    arr.frombytes(zlib.decompress(blob))
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def save_streams(user_id: int, workout_id: int, streams: Dict[str, Sequence[float]]) -> Dict[str, int]:
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    counts: Dict[str, int] = {}
+    for stream_type, values in streams.items():
+        counts[stream_type] = len(values)
+        for chunk_index, start in enumerate(range(0, len(values), STREAM_CHUNK_SAMPLES)):
+            chunk = values[start : start + STREAM_CHUNK_SAMPLES]
+            rows.append((workout_id, user_id, stream_type, chunk_index, start, len(chunk), STREAM_DTYPE, _encode(chunk), now))
+
+    with _conn() as conn:
+        placeholders = ",".join(["?"] * len(streams))
+        if streams:
+            conn.execute(
+                f"DELETE FROM workout_streams WHERE workout_id = ? AND user_id = ? AND stream_type IN ({placeholders})",
+                (workout_id, user_id, *streams.keys()),
+            )
+        conn.executemany(
+            """
+            INSERT INTO workout_streams (
+                workout_id, user_id, stream_type, chunk_index, start_offset, sample_count, dtype, data, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return counts
+
+
+def stream_summary(user_id: int, workout_id: int) -> Dict[str, Dict[str, int]]:
+    with _conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT stream_type, SUM(sample_count) AS samples, SUM(length(data)) AS stored_bytes
+            FROM workout_streams
+            WHERE workout_id = ? AND user_id = ?
+            GROUP BY stream_type
+            """,
+            (workout_id, user_id),
+        ).fetchall()
+    return {r["stream_type"]: {"samples": int(r["samples"]), "stored_bytes": int(r["stored_bytes"])} for r in rows}
+
+
+def read_stream_window(
+    user_id: int,
+    workout_id: int,
+    stream_types: Iterable[str],
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Dict[str, array]:
+    # Only the chunks overlapping [start, end) are fetched and decompressed; slices are appended to
+    # typed arrays so a 10 h stream never becomes a list of Python floats.
+    types = list(stream_types)
+    if not types:
+        return {}
+    placeholders = ",".join(["?"] * len(types))
+    query = f"""
+        SELECT stream_type, start_offset, sample_count, dtype, data
+        FROM workout_streams
+        WHERE workout_id = ? AND user_id = ? AND stream_type IN ({placeholders})
+          AND start_offset + sample_count > ?
+    """
+    params: List[object] = [workout_id, user_id, *types, start]
+    if end is not None:
+        query += " AND start_offset < ?"
+        params.append(end)
+    query += " ORDER BY stream_type, chunk_index"
+    with _conn() as conn:
+        rows = conn.execute(query, tuple(params)).fetchall()
+
+    out: Dict[str, array] = {}
+    for row in rows:
+        values = _decode(row["data"], row["dtype"])
+        lo = max(0, start - row["start_offset"])
+        hi = len(values) if end is None else min(len(values), end - row["start_offset"])
+        out.setdefault(row["stream_type"], array(row["dtype"])).extend(values[lo:hi])
+    return out
+
+
+def read_streams(user_id: int, workout_id: int, stream_types: Iterable[str]) -> Dict[str, array]:
+    return read_stream_window(user_id, workout_id, stream_types)
+
+
+def delete_streams(user_id: int, workout_id: int) -> None:
+    with _conn() as conn:
+        conn.execute("DELETE FROM workout_streams WHERE workout_id = ? AND user_id = ?", (workout_id, user_id))
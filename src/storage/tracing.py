@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.observability.metrics import counter
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+# Plans are re-captured at most this often per fingerprint.
+PLAN_TTL_S = 300.0
+MAX_FINGERPRINTS = 2048
+
+_SLOW = counter("sqlite_slow_queries_total", "Statements slower than SLOW_QUERY_MS by calling storage function", ("function",))
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with", "replace")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> Tuple[str, str]:
+    # Literals become ?, placeholder lists of any length collapse to (...), so `IN (?, ?, ?)` built
+    # for three ids and for three hundred share one fingerprint.
+    text = _SPACE.sub(" ", sql).strip()
+    text = _NUMBERS.sub("?", _STRINGS.sub("?", text))
+    text = _PLACEHOLDER_LIST.sub("(...)", text)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], text
+
+
+class QueryTrace:
+    __slots__ = ("tracer", "fingerprint", "function", "seconds", "rows", "entry")
+
+    def __init__(self, tracer: "QueryTracer", fp: str, function: str, seconds: float, rows: int) -> None:
+        self.tracer = tracer
+        self.fingerprint = fp
+        self.function = function
+        self.seconds = seconds
+        self.rows = rows
+        self.entry: Optional[Dict[str, Any]] = None
+
+    def fetched(self, conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float, rows: int) -> None:
+        # SELECT cost is spread over the fetches; a statement can cross the threshold late.
+        self.seconds += seconds
+        self.rows += rows
+        self.tracer.account(self, conn, sql, parameters, seconds, rows)
+
+
+class _Stats:
+    __slots__ = ("text", "calls", "seconds", "max_seconds", "rows", "functions")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.functions: set = set()
+
+
+class QueryTracer:
+    # Aggregates every statement by fingerprint and keeps the most recent slow ones, each with its
+    # EXPLAIN QUERY PLAN. Parameters are used for EXPLAIN but never stored.
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, log_size: int = SLOW_QUERY_LOG_SIZE) -> None:
+        self.threshold_s = threshold_ms / 1000.0
+        self._stats: Dict[str, _Stats] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=max(1, log_size))
+        self._plans: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, conn: sqlite3.Connection, sql: str, parameters: Any, function: str, seconds: float, rows: int) -> QueryTrace:
+        fp, text = fingerprint(sql)
+        trace = QueryTrace(self, fp, function, seconds, max(rows, 0))
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None and len(self._stats) < MAX_FINGERPRINTS:
+                stats = self._stats[fp] = _Stats(text)
+            if stats is not None:
+                stats.calls += 1
+                stats.functions.add(function)
+        self.account(trace, conn, sql, parameters, seconds, trace.rows)
+        return trace
+
+    def account(self, trace: QueryTrace, conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float, rows: int) -> None:
+        with self._lock:
+            stats = self._stats.get(trace.fingerprint)
+            if stats is not None:
+                stats.seconds += seconds
+                stats.rows += rows
+                stats.max_seconds = max(stats.max_seconds, trace.seconds)
+            if trace.entry is not None:
+                trace.entry["duration_ms"] = round(trace.seconds * 1000, 2)
+                trace.entry["rows"] = trace.rows
+                return
+            if trace.seconds < self.threshold_s:
+                return
+            trace.entry = {
+                "fingerprint": trace.fingerprint,
+                "sql": stats.text if stats is not None else fingerprint(sql)[1],
+                "function": trace.function,
+                "duration_ms": round(trace.seconds * 1000, 2),
+                "rows": trace.rows,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "plan": None,
+            }
+            self._slow.append(trace.entry)
+            plan = self._plans.get(trace.fingerprint)
+            fresh = plan is not None and plan[0] > time.monotonic()
+        _SLOW.inc(function=trace.function)
+        trace.entry["plan"] = plan[1] if fresh else self._explain(trace.fingerprint, conn, sql, parameters)
+
+    def _explain(self, fp: str, conn: sqlite3.Connection, sql: str, parameters: Any) -> Optional[List[str]]:
+        if parameters is None or not sql.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        try:
+            # Base-class execute: the plan query itself is not traced.
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+        except sqlite3.Error as exc:
+            return [f"EXPLAIN failed: {exc}"]
+        plan = [str(row[3]) for row in rows]
+        with self._lock:
+            self._plans[fp] = (time.monotonic() + PLAN_TTL_S, plan)
+        return plan
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [dict(e) for e in self._slow]
+        return sorted(entries, key=lambda e: e["duration_ms"], reverse=True)[:limit]
+
+    def top_fingerprints(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(fp, s.text, s.calls, s.seconds, s.max_seconds, s.rows, sorted(s.functions)) for fp, s in self._stats.items()]
+        items.sort(key=lambda item: item[3], reverse=True)
+        return [
+            {
+                "fingerprint": fp,
+                "sql": text,
+                "calls": calls,
+                "total_ms": round(seconds * 1000, 2),
+                "mean_ms": round(seconds * 1000 / calls, 3) if calls else 0.0,
+                "max_ms": round(max_seconds * 1000, 2),
+                "rows": rows,
+                "functions": functions,
+            }
+            for fp, text, calls, seconds, max_seconds, rows, functions in items[:limit]
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self._plans.clear()
+
+
+tracer = QueryTracer()
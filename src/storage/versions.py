@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable
+
+from src.storage.db import connect
+
+# Per-user resource names whose version counters back the read endpoints' ETags.
+FOODS = "foods"
+PROFILE = "profile"
+WORKOUTS = "workouts"
+INTEGRATIONS = "integrations"
+
+
+def _conn() -> sqlite3.Connection:
+    return connect()
+
+
+def init_versions_db() -> None:
+    with _conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resource_versions (
+                user_id INTEGER NOT NULL,
+                resource TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, resource)
+            ) WITHOUT ROWID
+            """
+        )
+
+
+def bump_version(conn: sqlite3.Connection, user_id: int, resource: str) -> None:
+    # Runs on the writer's connection so the bump commits (or rolls back) with the write itself.
+    conn.execute(
+        """
+        INSERT INTO resource_versions (user_id, resource, version) VALUES (?, ?, 1)
+        ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1
+        """,
+        (user_id, resource),
+    )
+
+
+def get_versions(user_id: int, resources: Iterable[str]) -> Dict[str, int]:
+    names = list(resources)
+    with _conn() as conn:
+        rows = conn.execute(
+            f"SELECT resource, version FROM resource_versions WHERE user_id = ? AND resource IN ({', '.join('?' * len(names))})",
+            (user_id, *names),
+        ).fetchall()
+    found = {r["resource"]: int(r["version"]) for r in rows}
+    return {name: found.get(name, 0) for name in names}
+
+
+def get_resource_versions(user_ids: Iterable[int], resource: str) -> Dict[int, int]:
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    with _conn() as conn:
+        rows = conn.execute(
+            f"SELECT user_id, version FROM resource_versions WHERE resource = ? AND user_id IN ({', '.join('?' * len(ids))})",
+            (resource, *ids),
+        ).fetchall()
+    found = {int(r["user_id"]): int(r["version"]) for r in rows}
+    return {user_id: found.get(user_id, 0) for user_id in ids}
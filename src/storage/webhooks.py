@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from src.storage.db import connect
+
+
+def _conn() -> sqlite3.Connection:
+    return connect()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def init_webhooks_db() -> None:
+    with _conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                provider TEXT NOT NULL,
+                owner_id TEXT NOT NULL,
+                object_type TEXT NOT NULL,
+                object_id TEXT NOT NULL,
+                aspect_type TEXT NOT NULL,
+                updates_json TEXT,
+                event_time INTEGER,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL,
+                error TEXT,
+                received_at TEXT NOT NULL,
+                processed_at TEXT
+            )
+            """
+        )
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(webhook_events)").fetchall()}
+        if "next_attempt_at" not in cols:
+            conn.execute("ALTER TABLE webhook_events ADD COLUMN next_attempt_at REAL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_webhook_events_status ON webhook_events (status, id)")
+
+
+def enqueue_webhook_event(provider: str, event: Dict[str, Any]) -> int:
+    with _conn() as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO webhook_events (
+                provider, owner_id, object_type, object_id, aspect_type, updates_json, event_time, received_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                provider,
+                str(event.get("owner_id")),
+                str(event.get("object_type")),
+                str(event.get("object_id")),
+                str(event.get("aspect_type")),
+                json.dumps(event.get("updates") or {}),
+                event.get("event_time"),
+                _now(),
+            ),
+        )
+        return int(cursor.lastrowid)
+
+
+def claim_webhook_events(provider: str, limit: int = 200) -> List[Dict[str, Any]]:
+    with _conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            """
+            SELECT * FROM webhook_events
+            WHERE provider = ? AND status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+            ORDER BY id ASC LIMIT ?
+            """,
+            (provider, time.time(), limit),
+        ).fetchall()
+        if rows:
+            ids = [r["id"] for r in rows]
+            placeholders = ",".join(["?"] * len(ids))
+            conn.execute(
+                f"UPDATE webhook_events SET status = 'processing', attempts = attempts + 1 WHERE id IN ({placeholders})",
+                tuple(ids),
+            )
+    out = []
+    for r in rows:
+        item = dict(r)
+        # A corrupt row must not fail the whole claimed batch; it is applied without its updates.
+        try:
+            updates = json.loads(item.pop("updates_json") or "{}")
+        except ValueError:
+            updates = {}
+        item["updates"] = updates if isinstance(updates, dict) else {}
+        out.append(item)
+    return out
+
+
+def complete_webhook_events(event_ids: List[int], status: str = "done", error: str | None = None) -> None:
+    if not event_ids:
+        return
+    placeholders = ",".join(["?"] * len(event_ids))
+    with _conn() as conn:
+        conn.execute(
+            f"UPDATE webhook_events SET status = ?, error = ?, processed_at = ? WHERE id IN ({placeholders})",
+            (status, error, _now(), *event_ids),
+        )
+
+
+def release_webhook_events(
+    event_ids: List[int],
+    error: str,
+    max_attempts: int = 5,
+    backoff_s: float = 30.0,
+    max_backoff_s: float = 3600.0,
+) -> None:
+    # Transient failures go back to the queue until they run out of attempts, each retry waiting
+    # twice as long as the previous one (next_attempt_at is a Unix timestamp).
+    if not event_ids:
+        return
+    placeholders = ",".join(["?"] * len(event_ids))
+    with _conn() as conn:
+        conn.execute(
+            f"""
+            UPDATE webhook_events
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?,
+                next_attempt_at = ? + MIN(?, ? * (1 << MIN(MAX(attempts - 1, 0), 20)))
+            WHERE id IN ({placeholders})
+            """,
+            (max_attempts, error, time.time(), max_backoff_s, backoff_s, *event_ids),
+        )
+
+
+def requeue_processing_webhook_events() -> None:
+    with _conn() as conn:
+        conn.execute("UPDATE webhook_events SET status = 'pending' WHERE status = 'processing'")
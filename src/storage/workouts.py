@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import heapq
+import json
 import sqlite3
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from src.storage.db import get_db_path
+from src.core.dedupe import (
+    MAX_WORKOUT_SECONDS,
+    ZERO_LENGTH_MATCH_S,
+    epoch_range,
+    is_duplicate,
+    merged_fields,
+    pick_canonical,
+)
+from src.storage.db import connect
+from src.storage.versions import WORKOUTS, bump_version
 
 
 def _conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect()
 
 
 def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
@@ -46,13 +55,33 @@ def init_workout_db() -> None:
                 temperature_c REAL,
                 humidity_pct REAL,
                 notes TEXT,
+                intensity_factor REAL,
+                time_in_zones_json TEXT,
+                metrics_computed_at TEXT,
+                start_epoch INTEGER,
+                end_epoch INTEGER,
+                duplicate_of INTEGER,
                 updated_at TEXT,
                 created_at TEXT NOT NULL
             )
             """
         )
-        if not _column_exists(conn, "workouts", "updated_at"):
-            conn.execute("ALTER TABLE workouts ADD COLUMN updated_at TEXT")
+        for column, col_type in (
+            ("updated_at", "TEXT"),
+            ("intensity_factor", "REAL"),
+            ("time_in_zones_json", "TEXT"),
+            ("metrics_computed_at", "TEXT"),
+            ("start_epoch", "INTEGER"),
+            ("end_epoch", "INTEGER"),
+            ("duplicate_of", "INTEGER"),
+        ):
+            if not _column_exists(conn, "workouts", column):
+                conn.execute(f"ALTER TABLE workouts ADD COLUMN {column} {col_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_workouts_external ON workouts (user_id, source, external_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_workouts_interval ON workouts (user_id, start_epoch)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workouts_duplicate_of ON workouts (duplicate_of) WHERE duplicate_of IS NOT NULL"
+        )
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS workout_fueling_events (
@@ -65,60 +94,308 @@ def init_workout_db() -> None:
                 carbs_g REAL NOT NULL DEFAULT 0,
                 fluid_ml REAL NOT NULL DEFAULT 0,
                 sodium_mg REAL NOT NULL DEFAULT 0,
+                caffeine_mg REAL NOT NULL DEFAULT 0,
                 notes TEXT,
                 created_at TEXT NOT NULL
             )
             """
         )
-
-
-def add_workout(user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not _column_exists(conn, "workout_fueling_events", "caffeine_mg"):
+            conn.execute("ALTER TABLE workout_fueling_events ADD COLUMN caffeine_mg REAL NOT NULL DEFAULT 0")
+
+
+_WORKOUT_INSERT_COLUMNS = (
+    "source",
+    "external_id",
+    "sport",
+    "status",
+    "start_time",
+    "duration_minutes",
+    "intensity_rpe",
+    "avg_heart_rate_bpm",
+    "max_heart_rate_bpm",
+    "avg_power_watts",
+    "normalized_power_watts",
+    "avg_cadence",
+    "distance_km",
+    "elevation_gain_m",
+    "tss",
+    "completed_carbs_g",
+    "completed_fluids_ml",
+    "completed_sodium_mg",
+    "temperature_c",
+    "humidity_pct",
+    "notes",
+    "start_epoch",
+    "end_epoch",
+    "updated_at",
+    "created_at",
+)
+_WORKOUT_INSERT_SQL = (
+    f"INSERT INTO workouts (user_id, {', '.join(_WORKOUT_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * (len(_WORKOUT_INSERT_COLUMNS) + 1))})"
+)
+
+
+def _workout_defaults(payload: Dict[str, Any], now: str) -> Dict[str, Any]:
     data = dict(payload)
     data.setdefault("source", "manual")
     data.setdefault("status", "completed")
-    data.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+    data.setdefault("created_at", now)
     data.setdefault("updated_at", data["created_at"])
+    data["start_epoch"], data["end_epoch"] = epoch_range(data.get("start_time"), data.get("duration_minutes"))
+    return data
+
+
+def _workout_params(user_id: int, data: Dict[str, Any]) -> tuple:
+    return (user_id, *(data.get(col) for col in _WORKOUT_INSERT_COLUMNS))
+
 
+def add_workout(user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    data = _workout_defaults(payload, datetime.now(timezone.utc).isoformat())
     with _conn() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO workouts (
-                user_id, source, external_id, sport, status, start_time, duration_minutes,
-                intensity_rpe, avg_heart_rate_bpm, max_heart_rate_bpm, avg_power_watts,
-                normalized_power_watts, avg_cadence, distance_km, elevation_gain_m, tss,
-                completed_carbs_g, completed_fluids_ml, completed_sodium_mg, temperature_c,
-                humidity_pct, notes, updated_at, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                user_id,
-                data.get("source"),
-                data.get("external_id"),
-                data.get("sport"),
-                data.get("status"),
-                data.get("start_time"),
-                data.get("duration_minutes"),
-                data.get("intensity_rpe"),
-                data.get("avg_heart_rate_bpm"),
-                data.get("max_heart_rate_bpm"),
-                data.get("avg_power_watts"),
-                data.get("normalized_power_watts"),
-                data.get("avg_cadence"),
-                data.get("distance_km"),
-                data.get("elevation_gain_m"),
-                data.get("tss"),
-                data.get("completed_carbs_g"),
-                data.get("completed_fluids_ml"),
-                data.get("completed_sodium_mg"),
-                data.get("temperature_c"),
-                data.get("humidity_pct"),
-                data.get("notes"),
-                data.get("updated_at"),
-                data.get("created_at"),
-            ),
-        )
+        cursor = conn.execute(_WORKOUT_INSERT_SQL, _workout_params(user_id, data))
         wid = cursor.lastrowid
-    return {"id": wid, **data}
+        canonical = _resolve_duplicates(conn, user_id, wid)
+        bump_version(conn, user_id, WORKOUTS)
+    return {"id": wid, **data, "duplicate_of": canonical if canonical != wid else None}
+
+
+def add_workouts(user_id: int, payloads: Iterable[Dict[str, Any]], chunk_size: int = 500) -> int:
+    # Bulk ingest for provider syncs: rows are consumed lazily and written in chunked transactions
+    # over a single connection. Rows with an external id are upserted on (source, external_id), so
+    # backfills, `full=true` syncs and Garmin re-pulls refresh already-imported activities in place.
+    now = datetime.now(timezone.utc).isoformat()
+    written = 0
+    conn = _conn()
+    try:
+        batch: List[Dict[str, Any]] = []
+        for payload in payloads:
+            batch.append(_workout_defaults(payload, now))
+            if len(batch) >= chunk_size:
+                written += _upsert_workout_chunk(conn, user_id, batch, now)
+                batch = []
+        if batch:
+            written += _upsert_workout_chunk(conn, user_id, batch, now)
+    finally:
+        conn.close()
+    return written
+
+
+# Provider-supplied columns an upsert refreshes; like upsert_external_workout, missing values keep
+# what is stored (user-entered RPE and intake, stream-derived metrics).
+_WORKOUT_REFRESH_COLUMNS = (
+    "sport",
+    "status",
+    "start_time",
+    "duration_minutes",
+    "avg_heart_rate_bpm",
+    "max_heart_rate_bpm",
+    "avg_power_watts",
+    "normalized_power_watts",
+    "avg_cadence",
+    "distance_km",
+    "elevation_gain_m",
+    "tss",
+    "notes",
+    "start_epoch",
+    "end_epoch",
+)
+_WORKOUT_REFRESH_SQL = (
+    "UPDATE workouts SET "
+    + ", ".join(f"{col} = COALESCE(?, {col})" for col in _WORKOUT_REFRESH_COLUMNS)
+    + ", updated_at = ? WHERE id = ? AND user_id = ?"
+)
+
+
+def _upsert_workout_chunk(conn: sqlite3.Connection, user_id: int, rows: List[Dict[str, Any]], now: str) -> int:
+    fresh: List[Dict[str, Any]] = []
+    keyed: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for data in rows:
+        if data.get("external_id") is None:
+            fresh.append(data)
+        else:
+            # The last copy of an activity repeated within the chunk wins.
+            keyed[(data["source"], str(data["external_id"]))] = data
+    with conn:
+        existing: Dict[Tuple[str, str], int] = {}
+        if keyed:
+            external_ids = sorted({external_id for _, external_id in keyed})
+            placeholders = ",".join(["?"] * len(external_ids))
+            # Highest id first, so the oldest row per key wins, as in get_workout_by_external_id.
+            for row in conn.execute(
+                f"SELECT id, source, external_id FROM workouts WHERE user_id = ? AND external_id IN ({placeholders}) ORDER BY id DESC",
+                (user_id, *external_ids),
+            ).fetchall():
+                existing[(row["source"], row["external_id"])] = row["id"]
+        refreshed = [(existing[key], data) for key, data in keyed.items() if key in existing]
+        fresh.extend(data for key, data in keyed.items() if key not in existing)
+
+        touched: List[int] = []
+        if refreshed:
+            conn.executemany(
+                _WORKOUT_REFRESH_SQL,
+                [(*(data.get(col) for col in _WORKOUT_REFRESH_COLUMNS), now, wid, user_id) for wid, data in refreshed],
+            )
+            touched.extend(wid for wid, _ in refreshed)
+        if fresh:
+            conn.executemany(_WORKOUT_INSERT_SQL, [_workout_params(user_id, data) for data in fresh])
+            # One executemany inside one write transaction gets a contiguous AUTOINCREMENT range.
+            last_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+            touched.extend(range(last_id - len(fresh) + 1, last_id + 1))
+        resolved: set = set()
+        for wid in touched:
+            if wid not in resolved:
+                _resolve_duplicates(conn, user_id, wid, resolved)
+        bump_version(conn, user_id, WORKOUTS)
+    return len(touched)
+
+
+def _streams_present(conn: sqlite3.Connection, ids: List[int]) -> List[int]:
+    placeholders = ",".join(["?"] * len(ids))
+    try:
+        rows = conn.execute(
+            f"SELECT DISTINCT workout_id FROM workout_streams WHERE workout_id IN ({placeholders})", tuple(ids)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # Stream storage not initialised (standalone scripts).
+        return []
+    return [r[0] for r in rows]
+
+
+def _apply_canonical(conn: sqlite3.Connection, user_id: int, cluster: List[Dict[str, Any]], with_streams: List[int]) -> int:
+    canonical = pick_canonical(cluster, with_streams)
+    others = [r for r in cluster if r["id"] != canonical["id"]]
+    updates = merged_fields(canonical, others)
+    updates["duplicate_of"] = None
+    set_clause = ", ".join(f"{k} = ?" for k in updates)
+    conn.execute(
+        f"UPDATE workouts SET {set_clause} WHERE id = ? AND user_id = ?",
+        (*updates.values(), canonical["id"], user_id),
+    )
+    if others:
+        placeholders = ",".join(["?"] * len(others))
+        conn.execute(
+            f"UPDATE workouts SET duplicate_of = ? WHERE user_id = ? AND id IN ({placeholders})",
+            (canonical["id"], user_id, *(r["id"] for r in others)),
+        )
+    return int(canonical["id"])
+
+
+def _resolve_duplicates(
+    conn: sqlite3.Connection,
+    user_id: int,
+    workout_id: int,
+    resolved: Optional[set] = None,
+) -> Optional[int]:
+    # Indexed overlap lookup: starts within [start - MAX_WORKOUT_SECONDS, end) and ending after
+    # our start. Returns the canonical id of the workout's cluster; `resolved` collects every id
+    # already placed so a bulk insert does not re-cluster the same group.
+    row = conn.execute("SELECT * FROM workouts WHERE id = ? AND user_id = ?", (workout_id, user_id)).fetchone()
+    if row is None:
+        return None
+    new = dict(row)
+    if new["start_epoch"] is None or new["status"] != "completed":
+        return workout_id
+    candidates = conn.execute(
+        """
+        SELECT * FROM workouts
+        WHERE user_id = ? AND start_epoch >= ? AND start_epoch <= ? AND end_epoch >= ?
+          AND id != ? AND status = 'completed'
+        """,
+        (
+            user_id,
+            new["start_epoch"] - MAX_WORKOUT_SECONDS,
+            new["end_epoch"] + ZERO_LENGTH_MATCH_S,
+            new["start_epoch"] - ZERO_LENGTH_MATCH_S,
+            workout_id,
+        ),
+    ).fetchall()
+    matches = [dict(c) for c in candidates if is_duplicate(new, dict(c))]
+    if not matches:
+        if new["duplicate_of"] is not None:
+            conn.execute("UPDATE workouts SET duplicate_of = NULL WHERE id = ?", (workout_id,))
+        return workout_id
+
+    cluster = {workout_id: new, **{m["id"]: m for m in matches}}
+    # Pull in the canonical records (and their other duplicates) of anything we matched.
+    roots = {m["duplicate_of"] for m in matches if m["duplicate_of"] is not None} | {m["id"] for m in matches}
+    placeholders = ",".join(["?"] * len(roots))
+    for extra in conn.execute(
+        f"""
+        SELECT * FROM workouts WHERE user_id = ? AND id IN ({placeholders})
+        UNION ALL
+        SELECT * FROM workouts WHERE user_id = ? AND duplicate_of IN ({placeholders})
+        """,
+        (user_id, *roots, user_id, *roots),
+    ).fetchall():
+        cluster.setdefault(extra["id"], dict(extra))
+    if resolved is not None:
+        resolved.update(cluster)
+    return _apply_canonical(conn, user_id, list(cluster.values()), _streams_present(conn, list(cluster)))
+
+
+def dedupe_all_workouts(user_id: int, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    # Backfill: fill start/end epochs for legacy rows, then a sweep over start-sorted workouts
+    # clusters overlaps in O(n log n) instead of one overlap query per row.
+    with _conn() as conn:
+        legacy = conn.execute(
+            "SELECT id, start_time, duration_minutes FROM workouts WHERE user_id = ? AND start_epoch IS NULL AND start_time IS NOT NULL",
+            (user_id,),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE workouts SET start_epoch = ?, end_epoch = ? WHERE id = ?",
+            [(*epoch_range(r["start_time"], r["duration_minutes"]), r["id"]) for r in legacy],
+        )
+        rows = [
+            dict(r)
+            for r in conn.execute(
+                """
+                SELECT * FROM workouts
+                WHERE user_id = ? AND status = 'completed' AND start_epoch IS NOT NULL
+                ORDER BY start_epoch ASC, id ASC
+                """,
+                (user_id,),
+            ).fetchall()
+        ]
+        with_streams = _streams_present(conn, [r["id"] for r in rows]) if rows else []
+
+    parent = {r["id"]: r["id"] for r in rows}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    active: List[Tuple[int, int, Dict[str, Any]]] = []
+    for idx, row in enumerate(rows):
+        while active and active[0][0] < row["start_epoch"] - ZERO_LENGTH_MATCH_S:
+            heapq.heappop(active)
+        for _, _, other in active:
+            if is_duplicate(row, other):
+                parent[find(row["id"])] = find(other["id"])
+        heapq.heappush(active, (row["end_epoch"], row["id"], row))
+        if progress is not None and (idx + 1) % 1000 == 0:
+            progress(idx + 1, 0)
+
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        clusters.setdefault(find(row["id"]), []).append(row)
+    duplicates = 0
+    with _conn() as conn:
+        conn.execute(
+            "UPDATE workouts SET duplicate_of = NULL WHERE user_id = ? AND duplicate_of IS NOT NULL",
+            (user_id,),
+        )
+        for cluster in clusters.values():
+            if len(cluster) > 1:
+                _apply_canonical(conn, user_id, cluster, with_streams)
+                duplicates += len(cluster) - 1
+        bump_version(conn, user_id, WORKOUTS)
+    if progress is not None:
+        progress(len(rows), duplicates)
+    return {"scanned": len(rows), "clusters": sum(1 for c in clusters.values() if len(c) > 1), "duplicates": duplicates}
 
 
 def get_workout(user_id: int, workout_id: int) -> Optional[Dict[str, Any]]:
@@ -150,6 +427,7 @@ def update_workout(user_id: int, workout_id: int, payload: Dict[str, Any]) -> Op
         "notes",
         "start_time",
         "status",
+        "sport",
     }
     updates = {k: v for k, v in payload.items() if k in allowed}
     if not updates:
@@ -165,9 +443,104 @@ def update_workout(user_id: int, workout_id: int, payload: Dict[str, Any]) -> Op
         )
         if cur.rowcount == 0:
             return None
+        if updates.keys() & {"start_time", "duration_minutes", "sport", "status"}:
+            row = conn.execute("SELECT start_time, duration_minutes FROM workouts WHERE id = ?", (workout_id,)).fetchone()
+            conn.execute(
+                "UPDATE workouts SET start_epoch = ?, end_epoch = ? WHERE id = ?",
+                (*epoch_range(row["start_time"], row["duration_minutes"]), workout_id),
+            )
+            _resolve_duplicates(conn, user_id, workout_id)
+        bump_version(conn, user_id, WORKOUTS)
     return get_workout(user_id, workout_id)
 
 
+def set_workout_stream_metrics(user_id: int, workout_id: int, metrics: Dict[str, Any]) -> bool:
+    # Stream-derived NP/IF/TSS/zones replace client-supplied values; the averages only fill gaps so
+    # provider summaries (which see the full-resolution file) win.
+    now = datetime.now(timezone.utc).isoformat()
+    zones = metrics.get("time_in_zones_s")
+    with _conn() as conn:
+        cur = conn.execute(
+            """
+            UPDATE workouts
+            SET normalized_power_watts = COALESCE(?, normalized_power_watts),
+                intensity_factor = COALESCE(?, intensity_factor),
+                tss = COALESCE(?, tss),
+                time_in_zones_json = COALESCE(?, time_in_zones_json),
+                avg_power_watts = COALESCE(avg_power_watts, ?),
+                avg_heart_rate_bpm = COALESCE(avg_heart_rate_bpm, ?),
+                max_heart_rate_bpm = COALESCE(max_heart_rate_bpm, ?),
+                avg_cadence = COALESCE(avg_cadence, ?),
+                metrics_computed_at = ?,
+                updated_at = ?
+            WHERE id = ? AND user_id = ?
+            """,
+            (
+                metrics.get("normalized_power_watts"),
+                metrics.get("intensity_factor"),
+                metrics.get("tss"),
+                json.dumps(zones) if zones is not None else None,
+                metrics.get("avg_power_watts"),
+                metrics.get("avg_heart_rate_bpm"),
+                metrics.get("max_heart_rate_bpm"),
+                metrics.get("avg_cadence"),
+                now,
+                now,
+                workout_id,
+                user_id,
+            ),
+        )
+        if cur.rowcount == 0:
+            return False
+        bump_version(conn, user_id, WORKOUTS)
+        return True
+
+
+def get_workout_by_external_id(user_id: int, source: str, external_id: str) -> Optional[Dict[str, Any]]:
+    with _conn() as conn:
+        row = conn.execute(
+            "SELECT * FROM workouts WHERE user_id = ? AND source = ? AND external_id = ? ORDER BY id ASC LIMIT 1",
+            (user_id, source, external_id),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def upsert_external_workout(user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    existing = get_workout_by_external_id(user_id, payload["source"], str(payload["external_id"]))
+    if existing is None:
+        return add_workout(user_id, payload)
+    updated = update_workout(user_id, existing["id"], {k: v for k, v in payload.items() if v is not None})
+    return updated or existing
+
+
+def delete_external_workout(user_id: int, source: str, external_id: str) -> bool:
+    with _conn() as conn:
+        ids = [
+            r["id"]
+            for r in conn.execute(
+                "SELECT id FROM workouts WHERE user_id = ? AND source = ? AND external_id = ?",
+                (user_id, source, external_id),
+            ).fetchall()
+        ]
+        orphans: List[int] = []
+        for wid in ids:
+            conn.execute("DELETE FROM workout_fueling_events WHERE workout_id = ? AND user_id = ?", (wid, user_id))
+            conn.execute("DELETE FROM workout_streams WHERE workout_id = ? AND user_id = ?", (wid, user_id))
+            conn.execute("DELETE FROM workouts WHERE id = ? AND user_id = ?", (wid, user_id))
+            orphans.extend(
+                r["id"]
+                for r in conn.execute("SELECT id FROM workouts WHERE user_id = ? AND duplicate_of = ?", (user_id, wid))
+            )
+        # Duplicates of a deleted canonical record regroup among themselves.
+        for wid in orphans:
+            conn.execute("UPDATE workouts SET duplicate_of = NULL WHERE id = ?", (wid,))
+        for wid in orphans:
+            _resolve_duplicates(conn, user_id, wid)
+        if ids:
+            bump_version(conn, user_id, WORKOUTS)
+    return bool(ids)
+
+
 def list_workout_fueling_events(user_id: int, workout_id: int) -> List[Dict[str, Any]]:
     with _conn() as conn:
         rows = conn.execute(
@@ -193,6 +566,7 @@ def add_workout_fueling_event(user_id: int, workout_id: int, payload: Dict[str,
         "carbs_g": float(payload.get("carbs_g") or 0),
         "fluid_ml": float(payload.get("fluid_ml") or 0),
         "sodium_mg": float(payload.get("sodium_mg") or 0),
+        "caffeine_mg": float(payload.get("caffeine_mg") or 0),
         "notes": payload.get("notes"),
         "created_at": now,
     }
@@ -201,8 +575,8 @@ def add_workout_fueling_event(user_id: int, workout_id: int, payload: Dict[str,
             """
             INSERT INTO workout_fueling_events (
                 user_id, workout_id, minute_offset, event_time_iso, food_name,
-                carbs_g, fluid_ml, sodium_mg, notes, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                carbs_g, fluid_ml, sodium_mg, caffeine_mg, notes, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 user_id,
@@ -213,6 +587,7 @@ def add_workout_fueling_event(user_id: int, workout_id: int, payload: Dict[str,
                 data["carbs_g"],
                 data["fluid_ml"],
                 data["sodium_mg"],
+                data["caffeine_mg"],
                 data["notes"],
                 data["created_at"],
             ),
@@ -256,6 +631,7 @@ def recalc_workout_fueling_totals(user_id: int, workout_id: int) -> None:
             """,
             (row["carbs_g"], row["fluid_ml"], row["sodium_mg"], now, workout_id, user_id),
         )
+        bump_version(conn, user_id, WORKOUTS)
 
 
 def list_workouts(
@@ -263,9 +639,12 @@ def list_workouts(
     limit: int = 100,
     status: Optional[str] = None,
     source: Optional[str] = None,
+    include_duplicates: bool = False,
 ) -> List[Dict[str, Any]]:
     query = "SELECT * FROM workouts WHERE user_id = ?"
     params: List[Any] = [user_id]
+    if not include_duplicates:
+        query += " AND duplicate_of IS NULL"
     if status:
         query += " AND status = ?"
         params.append(status)
@@ -293,7 +672,8 @@ def analytics_summary(user_id: int, days: int = 30) -> Dict[str, Any]:
                 SUM(distance_km) AS total_distance_km,
                 SUM(completed_carbs_g) AS total_carbs_g
             FROM workouts
-            WHERE user_id = ? AND status = 'completed' AND datetime(created_at) >= datetime('now', ?)
+            WHERE user_id = ? AND status = 'completed' AND duplicate_of IS NULL
+              AND datetime(created_at) >= datetime('now', ?)
             """,
             (user_id, f"-{days} days"),
         ).fetchone()
@@ -317,7 +697,7 @@ def analytics_chart_series(user_id: int, days: int = 30) -> Dict[str, Any]:
                 SUM(completed_carbs_g) as carbs_g,
                 SUM(distance_km) as distance_km
             FROM workouts
-            WHERE user_id = ? AND datetime(created_at) >= datetime('now', ?)
+            WHERE user_id = ? AND duplicate_of IS NULL AND datetime(created_at) >= datetime('now', ?)
             GROUP BY d
             ORDER BY d ASC
             """,
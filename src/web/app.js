@@ -107,6 +107,19 @@ async function sendJson(url, payload, auth = false, method = "POST") {
   });
 }
 
+// One round trip for several authenticated GETs; resolves to the bodies in request order.
+async function batchGet(paths) {
+  const data = await sendJson(
+    "/api/v1/batch",
+    { requests: paths.map((path) => ({ method: "GET", path })) },
+    true
+  );
+  return data.responses.map((r) => {
+    if (r.status >= 400) throw new Error((r.body && r.body.detail) || `Request failed (${r.status}): ${r.id}`);
+    return r.body;
+  });
+}
+
 function setTab(tab) {
   document.querySelectorAll(".tab-btn").forEach((btn) => {
     btn.classList.toggle("active", btn.dataset.tab === tab);
@@ -447,8 +460,8 @@ function renderFoodPicker() {
   });
 }
 
-async function loadFoods() {
-  const data = await getJson("/api/v1/foods?scope=all", true);
+async function loadFoods(prefetched) {
+  const data = prefetched || (await getJson("/api/v1/foods?scope=all", true));
   foodsCache = data.items || [];
   foodsCache.forEach((f) => {
     if (!selectedFoodIds.size && f.is_builtin && ["gel", "drink"].includes(f.category)) selectedFoodIds.add(f.id);
@@ -474,8 +487,8 @@ async function addCustomFood() {
   await loadFoods();
 }
 
-async function refreshIntegrations() {
-  const data = await getJson("/api/v1/integrations", true);
+async function refreshIntegrations(prefetched) {
+  const data = prefetched || (await getJson("/api/v1/integrations", true));
   const items = data.items || [];
   const strava = items.find((i) => i.provider === "strava");
   const garmin = items.find((i) => i.provider === "garmin_connect");
@@ -504,7 +517,14 @@ async function connectProvider(provider) {
 
 async function syncProvider(provider, kind) {
   const data = await sendJson(`/api/v1/integrations/${provider}/sync?kind=${kind}`, {}, true);
-  setInfo("integrationsStatus", `Synced ${data.synced} ${provider} ${kind} workouts.`);
+  let job = data.job;
+  while (job.status === "queued" || job.status === "running") {
+    setInfo("integrationsStatus", `Syncing ${provider} ${kind} workouts... ${job.synced}/${job.fetched || "?"}`);
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+    job = (await getJson(`/api/v1/integrations/sync/jobs/${job.id}`, true)).job;
+  }
+  if (job.status === "failed") throw new Error(`Integration sync failed: ${job.error}`);
+  setInfo("integrationsStatus", `Synced ${job.synced} ${provider} ${kind} workouts.`);
   await Promise.all([loadWorkouts(), refreshAnalytics()]);
 }
 
@@ -562,8 +582,8 @@ async function saveWorkout() {
   await Promise.all([loadWorkouts(), refreshAnalytics()]);
 }
 
-async function loadWorkouts() {
-  const data = await getJson("/api/v1/workouts?limit=25", true);
+async function loadWorkouts(prefetched) {
+  const data = prefetched || (await getJson("/api/v1/workouts?limit=25", true));
   workoutsCache = data.items || [];
   const rows = workoutsCache
     .map((w) => `
@@ -660,11 +680,11 @@ async function saveWorkoutTotals() {
   await Promise.all([loadWorkouts(), refreshAnalytics()]);
 }
 
-async function refreshAnalytics() {
-  const [summaryData, chartData] = await Promise.all([
+async function refreshAnalytics(prefetched) {
+  const [summaryData, chartData] = prefetched || (await Promise.all([
     getJson("/api/v1/analytics/summary?days=30", true),
     getJson("/api/v1/analytics/charts?days=30", true),
-  ]);
+  ]));
 
   const s = summaryData.summary || {};
   byId("summaryKpis").innerHTML = `
@@ -725,8 +745,7 @@ async function registerUser() {
   setAuth(data.access_token, data.user.email);
   currentProfile = data.profile || {};
   fillSettings(currentProfile);
-  await Promise.all([loadFoods(), refreshIntegrations(), loadWorkouts(), refreshAnalytics()]);
-  await loadFuelEvents();
+  await loadAll();
 }
 
 async function loginUser() {
@@ -735,7 +754,23 @@ async function loginUser() {
   setAuth(data.access_token, data.user.email);
   currentProfile = data.profile || {};
   fillSettings(currentProfile);
-  await Promise.all([loadFoods(), refreshIntegrations(), loadWorkouts(), refreshAnalytics()]);
+  await loadAll();
+}
+
+async function loadAll() {
+  const [foods, integrations, workouts, summary, charts] = await batchGet([
+    "/api/v1/foods?scope=all",
+    "/api/v1/integrations",
+    "/api/v1/workouts?limit=25",
+    "/api/v1/analytics/summary?days=30",
+    "/api/v1/analytics/charts?days=30",
+  ]);
+  await Promise.all([
+    loadFoods(foods),
+    refreshIntegrations(integrations),
+    loadWorkouts(workouts),
+    refreshAnalytics([summary, charts]),
+  ]);
   await loadFuelEvents();
 }
 
@@ -749,8 +784,7 @@ async function bootstrap() {
   const me = await getJson("/api/v1/auth/me", true);
   currentProfile = me.profile || {};
   fillSettings(currentProfile);
-  await Promise.all([loadFoods(), refreshIntegrations(), loadWorkouts(), refreshAnalytics()]);
-  await loadFuelEvents();
+  await loadAll();
 }
 
 function bind(id, fn) {
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(autouse=True)
+def db_path(tmp_path, monkeypatch):
+    # Every test gets its own SQLite file; connect() reads DB_PATH on each call.
+    path = tmp_path / "test.sqlite3"
+    monkeypatch.setenv("DB_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def storage(db_path):
+    # Schema for tests that call storage functions directly, without the app's startup hook.
+    from src.storage.foods import init_food_db
+    from src.storage.jobs import init_jobs_db
+    from src.storage.streams import init_streams_db
+    from src.storage.versions import init_versions_db
+    from src.storage.webhooks import init_webhooks_db
+    from src.storage.workouts import init_workout_db
+
+    init_versions_db()
+    init_workout_db()
+    init_food_db()
+    init_jobs_db()
+    init_streams_db()
+    init_webhooks_db()
+    return db_path
+
+
+@pytest.fixture
+def client():
+    from src.api.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def register(client) -> Callable[[str], Dict[str, str]]:
+    def _register(email: str = "athlete@example.com") -> Dict[str, str]:
+        resp = client.post("/api/v1/auth/register", json={"email": email, "password": "correct-horse-battery"})
+        assert resp.status_code == 200, resp.text
+        return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    return _register
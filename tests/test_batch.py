@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+GEL = {"name": "Gel Pack", "category": "gel", "serving_desc": "1 gel", "carbs_g": 25, "sodium_mg": 40, "fluid_ml": 0}
+
+
+def _custom_foods(client, headers):
+    return client.get("/api/v1/foods?scope=custom", headers=headers).json()["items"]
+
+
+def test_batch_requires_auth(client):
+    resp = client.post("/api/v1/batch", json={"requests": [{"method": "GET", "path": "/api/v1/profile"}]})
+    assert resp.status_code == 401
+
+
+def test_sub_requests_run_as_the_batch_user(client, register):
+    alice = register("alice@example.com")
+    bob = register("bob@example.com")
+    bob_token = bob["Authorization"]
+
+    resp = client.post(
+        "/api/v1/batch",
+        headers=alice,
+        json={
+            "requests": [
+                # An Authorization header on an item is not forwarded: the write lands on Alice.
+                {"id": "create", "method": "POST", "path": "/api/v1/foods", "body": GEL, "headers": {"Authorization": bob_token}},
+                {"id": "me", "method": "GET", "path": "/api/v1/auth/me"},
+                {"id": "foods", "method": "GET", "path": "/api/v1/foods?scope=custom"},
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    items = {item["id"]: item for item in resp.json()["responses"]}
+    assert items["create"]["status"] == 200
+    assert items["me"]["body"]["user"]["email"] == "alice@example.com"
+    assert [f["name"] for f in items["foods"]["body"]["items"]] == ["Gel Pack"]
+
+    assert [f["name"] for f in _custom_foods(client, alice)] == ["Gel Pack"]
+    assert _custom_foods(client, bob) == []
+
+
+def test_batch_user_state_cannot_be_set_by_a_plain_request(client):
+    # The trusted scope state only exists on internally dispatched sub-requests.
+    resp = client.get("/api/v1/auth/me", headers={"batch_user": '{"id": 1}', "state": "batch_user"})
+    assert resp.status_code == 401
+
+
+def test_rejected_sub_request_paths(client, register):
+    headers = register()
+    resp = client.post(
+        "/api/v1/batch",
+        headers=headers,
+        json={
+            "requests": [
+                {"id": "nested", "method": "POST", "path": "/api/v1/batch", "body": {"requests": []}},
+                {"id": "external", "method": "GET", "path": "https://example.com/api/v1/profile"},
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    assert [item["status"] for item in resp.json()["responses"]] == [400, 400]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import msgpack
+
+MSGPACK = "application/msgpack"
+
+
+def _get(client, headers, accept="application/json", etag=None):
+    extra = {"Accept": accept}
+    if etag:
+        extra["If-None-Match"] = etag
+    return client.get("/api/v1/foods", headers={**headers, **extra})
+
+
+def test_etag_and_304_per_negotiated_media_type(client, register):
+    headers = register()
+
+    first = _get(client, headers)
+    assert first.status_code == 200
+    json_tag = first.headers["etag"]
+    assert _get(client, headers, etag=json_tag).status_code == 304
+
+    # A tag held for the JSON body must not earn a 304 for the MessagePack representation.
+    packed = _get(client, headers, accept=MSGPACK, etag=json_tag)
+    assert packed.status_code == 200
+    assert packed.headers["content-type"].startswith(MSGPACK)
+    msgpack_tag = packed.headers["etag"]
+    assert msgpack_tag != json_tag
+    assert msgpack.unpackb(packed.content)["items"] == first.json()["items"]
+
+    cached = _get(client, headers, accept=MSGPACK, etag=msgpack_tag)
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == msgpack_tag
+    assert _get(client, headers, etag=msgpack_tag).status_code == 200
+
+
+def test_write_invalidates_every_representation(client, register):
+    headers = register()
+    json_tag = _get(client, headers).headers["etag"]
+    msgpack_tag = _get(client, headers, accept=MSGPACK).headers["etag"]
+
+    created = client.post(
+        "/api/v1/foods",
+        headers=headers,
+        json={"name": "Gel Pack", "category": "gel", "serving_desc": "1 gel", "carbs_g": 25, "sodium_mg": 40, "fluid_ml": 0},
+    )
+    assert created.status_code == 200
+
+    assert _get(client, headers, etag=json_tag).status_code == 200
+    assert _get(client, headers, accept=MSGPACK, etag=msgpack_tag).status_code == 200
+
+
+def test_tags_are_per_user(client, register):
+    alice = register("alice@example.com")
+    bob = register("bob@example.com")
+    alice_tag = _get(client, alice).headers["etag"]
+    assert _get(client, bob, etag=alice_tag).status_code == 200
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+from src.storage.foods import food_dedupe_key, import_custom_foods, list_foods
+
+FOOD = {"category": "gel", "carbs_g": 25, "sodium_mg": 50, "fluid_ml": 0}
+
+
+def _food(name: str, serving: str = "1 gel") -> dict:
+    return {"name": name, "serving_desc": serving, **FOOD}
+
+
+def test_dedupe_key_normalizes_case_and_whitespace():
+    assert food_dedupe_key("  Energy   GEL ", "1  Gel") == food_dedupe_key("energy gel", "1 gel")
+    assert food_dedupe_key("Energy Gel", "2 gels") != food_dedupe_key("Energy Gel", "1 gel")
+
+
+def test_import_dedupes_within_file_against_catalog_and_across_imports(storage):
+    rows = [
+        _food("Energy Gel X"),
+        _food("energy  gel x"),
+        _food("Energy Gel X", "2 gels"),
+        _food("banana medium", "1 Banana"),
+    ]
+    assert import_custom_foods(1, iter(rows), chunk_size=2) == {"inserted": 2, "duplicates": 2}
+    assert import_custom_foods(1, iter(rows), chunk_size=2) == {"inserted": 0, "duplicates": 4}
+    # Another user's custom foods are not part of this user's catalog.
+    assert import_custom_foods(2, iter(rows[:1])) == {"inserted": 1, "duplicates": 0}
+
+    custom = list_foods(1, scope="custom")
+    assert sorted((f["name"], f["serving_desc"]) for f in custom) == [("Energy Gel X", "1 gel"), ("Energy Gel X", "2 gels")]
+
+
+def test_import_endpoint_reports_duplicates_and_invalid_rows(client, register):
+    headers = register()
+    csv_body = (
+        "name,category,serving_desc,carbs_g,sodium_mg,fluid_ml\n"
+        "Chews Pack,chews,1 pack,45,80,0\n"
+        "CHEWS  pack,chews,1 Pack,45,80,0\n"
+        "X,chews,1 pack,45,80,0\n"
+    )
+    resp = client.post(
+        "/api/v1/foods/import", headers=headers, files={"file": ("foods.csv", csv_body.encode(), "text/csv")}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["received"], body["inserted"], body["duplicates"], body["invalid"]) == (3, 1, 1, 1)
+    assert body["errors"][0]["row"] == 3
+
+    json_body = json.dumps([_food("Chews Pack", "1 pack"), _food("Bar Half", "1/2 bar")]).encode()
+    resp = client.post(
+        "/api/v1/foods/import", headers=headers, files={"file": ("foods.json", json_body, "application/json")}
+    )
+    assert (resp.json()["inserted"], resp.json()["duplicates"]) == (1, 1)
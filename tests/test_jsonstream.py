@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.core.jsonstream import iter_json_array
+
+DOC = [
+    {"name": "Café crème", "values": [1, 2.5, -3e2], "nested": {"ok": True, "none": None}},
+    12345678901234567890,
+    -0.000125,
+    "escaped \" quote \\ and é",
+    [],
+    {},
+    False,
+]
+
+
+def _split(raw: bytes, size: int):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64])
+def test_chunk_boundaries_inside_tokens(size):
+    raw = json.dumps(DOC, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array(_split(raw, size))) == DOC
+
+
+def test_number_split_across_chunks_is_not_truncated():
+    assert list(iter_json_array([b"[12", b"34", b"5, 6", b".75]"])) == [12345, 6.75]
+
+
+def test_multibyte_character_split_across_chunks():
+    raw = json.dumps(["été"], ensure_ascii=False).encode("utf-8")
+    cut = raw.index("é".encode("utf-8")) + 1
+    assert list(iter_json_array([raw[:cut], raw[cut:]])) == ["été"]
+
+
+def test_str_chunks_and_whitespace():
+    assert list(iter_json_array(["  [ 1 ,", "\n 2 ", "]  "])) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "chunks, message",
+    [
+        ([b'{"a": 1}'], "Expected a JSON array"),
+        ([b""], "Expected a JSON array"),
+        ([b"[1, 2"], "Unterminated JSON array"),
+        ([b"[1, {", b'"a": }]'], "Invalid JSON array element"),
+    ],
+)
+def test_malformed_input(chunks, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_json_array(chunks))
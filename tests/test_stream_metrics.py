@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from src.core.stream_metrics import compute_stream_metrics, normalized_power
+
+PROFILE = {"bike_ftp_w": 250, "bike_lt1_hr_bpm": 130, "bike_lt2_hr_bpm": 160, "run_ftp_w": 300}
+
+
+def _steady(seconds: int, watts: float = 250.0):
+    return [watts] * seconds
+
+
+def test_steady_hour_at_ftp_is_100_tss():
+    out = compute_stream_metrics({"power": _steady(3600)}, "ride", PROFILE)
+    assert out["normalized_power_watts"] == 250.0
+    assert out["intensity_factor"] == 1.0
+    assert out["tss"] == 100.0
+
+
+def test_pause_changes_neither_np_nor_tss():
+    # Thirty minutes at FTP, a 20 minute stop recorded as NaN, thirty more minutes.
+    paused = _steady(1800) + [math.nan] * 1200 + _steady(1800)
+    out = compute_stream_metrics({"power": paused}, "ride", PROFILE)
+    assert out["normalized_power_watts"] == 250.0
+    assert out["avg_power_watts"] == 250.0
+    assert out["tss"] == 100.0
+
+
+def test_coasting_zeros_still_count():
+    coasting = _steady(1800) + [0.0] * 1200 + _steady(1800)
+    out = compute_stream_metrics({"power": coasting}, "ride", PROFILE)
+    assert out["normalized_power_watts"] < 250.0
+    # Recorded time includes the coasting: 4800 s.
+    expected = 4800 * out["normalized_power_watts"] ** 2 / (250.0**2 * 3600) * 100
+    assert out["tss"] == pytest.approx(expected, abs=0.2)
+
+
+def test_windows_spanning_a_pause_are_skipped():
+    power = np.array([100.0] * 30 + [math.nan] + [300.0] * 30)
+    # Only the two complete windows count: (100**4 + 300**4) / 2.
+    assert normalized_power(power) == pytest.approx(((100.0**4 + 300.0**4) / 2) ** 0.25)
+
+
+@pytest.mark.parametrize("power", [[250.0] * 29, [250.0, math.nan] * 60])
+def test_no_complete_window_means_no_np(power):
+    assert normalized_power(np.array(power)) is None
+    out = compute_stream_metrics({"power": power}, "ride", PROFILE)
+    assert "normalized_power_watts" not in out
+    assert "tss" not in out
+
+
+@pytest.mark.parametrize("sport, ftp", [("virtualride", 250), ("hyrox", 250), ("trailrun", 300)])
+def test_thresholds_follow_sport_family(sport, ftp):
+    out = compute_stream_metrics({"power": _steady(3600, ftp)}, sport, PROFILE)
+    assert out["intensity_factor"] == 1.0
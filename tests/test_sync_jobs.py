@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlite3
+
+from src.storage.integrations import upsert_token
+from src.storage.jobs import claim_job, enqueue_job, finish_job, requeue_interrupted_jobs
+from src.storage.workouts import add_workouts, list_workouts
+
+
+def test_active_job_coalesces_repeated_requests(storage):
+    job, created = enqueue_job(1, "provider_sync", "strava", "completed", params={"full": False})
+    assert created
+    again, created = enqueue_job(1, "provider_sync", "strava", "completed", params={"full": True})
+    assert not created
+    assert again["id"] == job["id"]
+    assert again["params"] == {"full": False}
+
+    # Still coalesced while running; other kinds, providers and users get their own job.
+    claim_job(job["id"])
+    assert enqueue_job(1, "provider_sync", "strava", "completed")[0]["id"] == job["id"]
+    assert enqueue_job(1, "provider_sync", "garmin_connect", "completed")[1]
+    assert enqueue_job(1, "provider_sync", "strava", "planned")[1]
+    assert enqueue_job(2, "provider_sync", "strava", "completed")[1]
+
+    finish_job(job["id"], "done", result={"synced": 0})
+    follow_up, created = enqueue_job(1, "provider_sync", "strava", "completed")
+    assert created
+    assert follow_up["id"] != job["id"]
+
+
+def test_sync_endpoint_reports_coalesced_jobs(client, register, monkeypatch):
+    from src.api import main
+
+    # Keep the job queued instead of calling Strava.
+    monkeypatch.setattr(main.job_runner, "submit", lambda job_id: None)
+    headers = register()
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["user"]["id"]
+    upsert_token(user_id=user_id, provider="strava", access_token="token", refresh_token=None, expires_at=None)
+
+    first = client.post("/api/v1/integrations/strava/sync", headers=headers)
+    second = client.post("/api/v1/integrations/strava/sync", headers=headers)
+    assert (first.status_code, second.status_code) == (202, 202)
+    assert first.json()["coalesced"] is False
+    assert second.json()["coalesced"] is True
+    assert second.json()["job"]["id"] == first.json()["job"]["id"]
+
+    job = client.get(f"/api/v1/integrations/sync/jobs/{first.json()['job']['id']}", headers=headers)
+    assert job.status_code == 200
+    assert job.json()["job"]["status"] == "queued"
+
+
+def test_only_stale_running_jobs_are_requeued(storage, db_path):
+    stale, _ = enqueue_job(1, "provider_sync", "strava", "completed")
+    live, _ = enqueue_job(2, "provider_sync", "strava", "completed")
+    claim_job(stale["id"])
+    claim_job(live["id"])
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE sync_jobs SET updated_at = '2020-01-01T00:00:00+00:00' WHERE id = ?", (stale["id"],))
+    assert requeue_interrupted_jobs(stale_after_s=120) == [stale["id"]]
+    rows = dict(conn.execute("SELECT id, status FROM sync_jobs").fetchall())
+    conn.close()
+    assert rows == {stale["id"]: "queued", live["id"]: "running"}
+
+
+def test_resync_updates_imported_activities_in_place(storage):
+    def pulled(distance):
+        return [
+            {"source": "strava", "external_id": str(i), "sport": "ride", "status": "completed",
+             "start_time": f"2026-04-0{i + 1}T07:00:00Z", "duration_minutes": 60, "distance_km": distance}
+            for i in range(3)
+        ]
+
+    assert add_workouts(1, pulled(30.0), chunk_size=2) == 3
+    assert add_workouts(1, pulled(31.5), chunk_size=2) == 3
+    workouts = list_workouts(1, include_duplicates=True)
+    assert len(workouts) == 3
+    assert {w["distance_km"] for w in workouts} == {31.5}
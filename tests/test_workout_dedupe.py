@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sqlite3
+
+from src.core.dedupe import is_duplicate, merged_fields, overlap_ratio, pick_canonical
+from src.storage.workouts import add_workout, add_workouts, dedupe_all_workouts, get_workout, list_workouts
+
+
+def _span(start: int, end: int, **extra):
+    return {"status": "completed", "sport": "ride", "start_epoch": start, "end_epoch": end, **extra}
+
+
+def test_overlap_is_measured_against_the_shorter_workout():
+    assert overlap_ratio(_span(0, 7200), _span(60, 7140)) == 1.0
+    assert overlap_ratio(_span(0, 3600), _span(2700, 6300)) == 0.25
+    assert overlap_ratio(_span(0, 0), _span(30, 30)) == 1.0
+    assert overlap_ratio(_span(0, 0), _span(120, 120)) == 0.0
+
+
+def test_duplicates_need_same_family_and_completed_status():
+    assert is_duplicate(_span(0, 3600, sport="ride"), _span(0, 3600, sport="virtualride"))
+    assert not is_duplicate(_span(0, 3600, sport="ride"), _span(0, 3600, sport="run"))
+    assert not is_duplicate(_span(0, 3600), _span(0, 3600, status="planned"))
+
+
+def test_richest_record_wins_and_inherits_missing_fields():
+    manual = {"id": 1, "duration_minutes": 60, "intensity_rpe": 7, "notes": "felt strong"}
+    strava = {"id": 2, "duration_minutes": 61, "avg_power_watts": 210, "avg_heart_rate_bpm": 140}
+    assert pick_canonical([manual, strava])["id"] == 2
+    # Streams outweigh summary columns.
+    assert pick_canonical([manual, strava], with_streams=[1])["id"] == 1
+    assert merged_fields(strava, [manual]) == {"intensity_rpe": 7, "notes": "felt strong"}
+
+
+MANUAL = {
+    "source": "manual",
+    "sport": "cycling",
+    "status": "completed",
+    "start_time": "2026-03-01T08:00:00Z",
+    "duration_minutes": 90,
+    "intensity_rpe": 6,
+    "completed_carbs_g": 120,
+}
+STRAVA = {
+    "source": "strava",
+    "external_id": "999",
+    "sport": "ride",
+    "status": "completed",
+    "start_time": "2026-03-01T08:02:00Z",
+    "duration_minutes": 87,
+    "distance_km": 45.0,
+    "avg_power_watts": 205,
+    "avg_heart_rate_bpm": 138,
+}
+
+
+def test_insert_clusters_cross_source_duplicates(storage):
+    manual = add_workout(1, MANUAL)
+    assert add_workouts(1, [STRAVA]) == 1
+    other_day = add_workout(1, {**MANUAL, "start_time": "2026-03-02T08:00:00Z"})
+
+    visible = list_workouts(1)
+    canonical = next(w for w in visible if w["source"] == "strava")
+    assert sorted(w["id"] for w in visible) == sorted([canonical["id"], other_day["id"]])
+    assert canonical["intensity_rpe"] == 6
+    assert canonical["completed_carbs_g"] == 120
+    assert get_workout(1, manual["id"])["duplicate_of"] == canonical["id"]
+    assert len(list_workouts(1, include_duplicates=True)) == 3
+
+
+def test_backfill_sweep_merges_legacy_rows(storage, db_path):
+    first = add_workout(1, MANUAL)
+    second = add_workout(1, {**STRAVA, "start_time": "2026-03-05T08:00:00Z"})
+    conn = sqlite3.connect(db_path)
+    with conn:
+        # Rows written before the overlap columns existed: no epochs, no cluster.
+        conn.execute("UPDATE workouts SET start_epoch = NULL, end_epoch = NULL, duplicate_of = NULL")
+        conn.execute("UPDATE workouts SET start_time = ? WHERE id = ?", ("2026-03-01T08:02:00Z", second["id"]))
+    conn.close()
+
+    result = dedupe_all_workouts(1)
+    assert result == {"scanned": 2, "clusters": 1, "duplicates": 1}
+    assert get_workout(1, first["id"])["duplicate_of"] == second["id"]
+    assert get_workout(1, second["id"])["intensity_rpe"] == 6
+    assert [w["id"] for w in list_workouts(1)] == [second["id"]]